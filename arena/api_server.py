@@ -1,31 +1,40 @@
 from __future__ import annotations
+import asyncio
+import json
 import os
-import shutil
+import re
+import secrets
 import tempfile
+import time
+import weakref
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional
 
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, Query, Request
+from pydantic import BaseModel, Field
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 
-from .logging_config import logger
-from .controllers import MatchController, load_bot_callable
-from .filestorage import (
-    list_games, list_bots, get_leaderboard,
-    update_leaderboard, save_match_log, BOTS_DIR
-)
-from .core import Player, Result
-
-# Import available games into a registry
-from .games.tic_tac_toe import TicTacToe
-from .games.eleven_sticks import ElevenSticks
-
-GAME_REGISTRY = {
-    TicTacToe.code: TicTacToe,
-    ElevenSticks.code: ElevenSticks,
-}
+from .logging_config import logger, debug_sampled
+from .controllers import MatchController, warm_up_bots
+from .filestorage import save_match_log, read_json, write_json_atomic, BOTS_DIR, MATCHES_DIR, TOURNAMENTS_DIR
+from .matchstore import get_match_store, parse_time
+from .backup import RESTORE_MAX_BYTES, iter_backup, restore
+from .metadata import METADATA
+from .leaderboard import get_store, record_match
+from .ratings import ranked, head_to_head_rows
+from .metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS
+from .match_executor import BoundedExecutor, Reservation, Saturated
+from .tournament import MAX_REPETITIONS, MAX_ROUNDS, MAX_WORKERS, TournamentSpec, run_tournament
+from .sandbox import SANDBOX_ENABLED, get_sandbox_pool, load_bot, shutdown_sandbox_pool
+from .timecontrol import MAX_MOVE_SECONDS, TimeControl, parse_request as parse_time_control, \
+    resolve as resolve_time_control
+from .writer import get_writer_client
+from .games import GAME_REGISTRY, GamePluginError
 
 APP_DIR = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = APP_DIR / "frontend"
@@ -34,8 +43,28 @@ FRONTEND_DIR = APP_DIR / "frontend"
 LOG_DIR = APP_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
+# ---------- Match execution ----------
+MATCH_EXECUTOR = BoundedExecutor()
+REGISTRY.gauge("arena_match_executor_pending", "Matches running or queued in the match executor.",
+               fn=lambda: MATCH_EXECUTOR.pending)
+
 # ---------- FastAPI app ----------
-app = FastAPI(title="Arena API", version="0.3.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    n = warm_up_bots(BOTS_DIR, METADATA.all_bots())
+    logger.info(f"Warmed up {n} bot modules")
+    if SANDBOX_ENABLED:
+        get_sandbox_pool(warm=sorted({(BOTS_DIR, b["file"]) for b in METADATA.all_bots() if b.get("file")}))
+    logger.info(
+        f"Match executor: {MATCH_EXECUTOR.max_workers} concurrent, "
+        f"{MATCH_EXECUTOR.queue_depth} queued"
+    )
+    yield
+    MATCH_EXECUTOR.shutdown()
+    shutdown_sandbox_pool()
+
+
+app = FastAPI(title="Arena API", version="0.3.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,6 +74,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # label by route template, not raw path, to keep the label set bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method, route=getattr(route, "path", "unmatched"), status=str(status),
+        )
+
+
 # Serve static frontend
 if FRONTEND_DIR.is_dir():
     app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
@@ -53,71 +99,61 @@ if FRONTEND_DIR.is_dir():
 @app.get("/")
 async def root():
     index_path = FRONTEND_DIR / "index.html"
-    logger.debug("Serving index.html")
+    debug_sampled("Serving index.html")
     return FileResponse(index_path)
 
 
+def _cached_json(request: Request, data: Any, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(data, headers=headers)
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/games")
-async def games():
-    games = list_games()
-    logger.info(f"Loaded {len(games)} games")
-    return JSONResponse(games)
+async def games(request: Request):
+    games, etag = METADATA.games()
+    return _cached_json(request, games, etag)
 
 
 @app.get("/bots")
-async def bots(game: str = Query(...)):
-    bots = list_bots(game)
-    logger.info(f"Listed {len(bots)} bots for game={game}")
-    return JSONResponse(bots)
+async def bots(request: Request, game: str = Query(...)):
+    bots, etag = METADATA.bots(game)
+    return _cached_json(request, bots, etag)
 
 
 @app.get("/leaderboard")
 async def leaderboard(game: str = Query(...)):
-    lb = get_leaderboard(game)
-    logger.info(f"Leaderboard request for game={game}")
+    lb = get_store().get(game)
+    debug_sampled("Leaderboard request for game={}", game)
     return JSONResponse(lb)
 
 
-@app.get("/play")
-async def play(
-    game: str = Query(...),
-    bot0: str = Query(...),
-    bot1: str = Query(...)
-) -> Dict[str, Any]:
-    logger.info(f"New match: {game} | {bot0} (X) vs {bot1} (O)")
-
-    GameClass = GAME_REGISTRY.get(game)
-    if not GameClass:
-        logger.error(f"Unsupported game requested: {game}")
-        return JSONResponse({"error": f"Game {game} not supported"}, status_code=400)
+@app.get("/ratings")
+async def ratings(game: str = Query(...)):
+    store = get_store()
+    return JSONResponse({
+        "ratings": ranked(store.get_ratings(game)),
+        "head_to_head": head_to_head_rows(store.get_head_to_head(game)),
+    })
 
-    bots_meta = list_bots(game)
-    meta_by_id = {b["id"]: b for b in bots_meta}
-    if bot0 not in meta_by_id or bot1 not in meta_by_id:
-        logger.error(f"Unknown bot id: {bot0} or {bot1}")
-        return JSONResponse({"error": "Unknown bot id."}, status_code=400)
 
-    bot0_fn = load_bot_callable(BOTS_DIR, meta_by_id[bot0]["file"])
-    bot1_fn = load_bot_callable(BOTS_DIR, meta_by_id[bot1]["file"])
+def _make_controller(GameClass: type, bot0: str, bot1: str, meta_by_id: Dict[str, Dict[str, Any]],
+                     time_control: TimeControl) -> MatchController:
+    bot0_fn = load_bot(BOTS_DIR, meta_by_id[bot0]["file"])
+    bot1_fn = load_bot(BOTS_DIR, meta_by_id[bot1]["file"])
+    return MatchController(GameClass(), bot0_fn, bot1_fn, bot_ids=(bot0, bot1), time_control=time_control)
 
-    game_impl = GameClass()
-    controller = MatchController(game_impl, bot0_fn, bot1_fn, time_limit=0.5)
-    result = controller.run()
 
+def _finish_match(game: str, bot0: str, bot1: str, result: Dict[str, Any]) -> Dict[str, Any]:
     winner = result["winner"]
-    logger.success(f"Match finished: Winner={winner}")
-
-    # update leaderboard
-    if winner == "draw":
-        update_leaderboard(game, bot0, Result.DRAW.value)
-        update_leaderboard(game, bot1, Result.DRAW.value)
-    elif winner == Player.X.value:
-        update_leaderboard(game, bot0, Result.WIN.value)
-        update_leaderboard(game, bot1, Result.LOSS.value)
-    else:
-        update_leaderboard(game, bot1, Result.WIN.value)
-        update_leaderboard(game, bot0, Result.LOSS.value)
-
     payload = {
         "game": game,
         "bot0": bot0,
@@ -126,17 +162,338 @@ async def play(
         "moves": result["moves"],
         "final_board": result["final_state"].board,
         "winning_line": result.get("winning_line", []),
+        "fallbacks": result.get("fallbacks", {}),
+        "time_control": result.get("time_control"),
     }
-    log_path = save_match_log(payload)
-    logger.debug(f"Match log saved to {log_path}")
+    writer = get_writer_client()
+    if writer is not None:
+        # multi-worker mode: the writer process batches match-log and leaderboard writes
+        match_id = writer.record(payload)
+    else:
+        # update leaderboard (both results in one atomic delta)
+        record_match(game, bot0, bot1, winner)
+        match_id = save_match_log(payload)
+    # the one INFO record per match; everything else on this path is sampled DEBUG
+    logger.info("Match finished: {} | {} (X) vs {} (O) → {} [{}]", game, bot0, bot1, winner, match_id)
+    payload["id"] = match_id
+    return payload
+
+
+def _play_match(GameClass: type, game: str, bot0: str, bot1: str, meta_by_id: Dict[str, Dict[str, Any]],
+                time_control: TimeControl) -> Dict[str, Any]:
+    # runs in the match executor: bot calls, leaderboard and match-log writes all block
+    controller = _make_controller(GameClass, bot0, bot1, meta_by_id, time_control)
+    return _finish_match(game, bot0, bot1, controller.run())
+
+
+def _saturated_response(e: Saturated) -> JSONResponse:
+    logger.warning("Rejecting match, executor saturated ({} pending)", MATCH_EXECUTOR.pending)
+    return JSONResponse(
+        {"error": "Server busy, try again later."},
+        status_code=503,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _plugin_error_response(game: str, e: GamePluginError) -> JSONResponse:
+    logger.error("Game {} cannot be loaded: {}", game, e)
+    return JSONResponse({"error": f"Game {game} is unavailable."}, status_code=503)
+
+
+async def _resolve_match(game: str, bot0: str, bot1: str, tc: Optional[str] = None):
+    """Returns (GameClass, meta_by_id, time_control) or an error response."""
+    GameClass = GAME_REGISTRY.loaded(game)
+    if GameClass is None:
+        # discovery and the first import of a game module block: keep them off the event loop
+        try:
+            GameClass = await run_in_threadpool(GAME_REGISTRY.get, game)
+        except GamePluginError as e:
+            return _plugin_error_response(game, e)
+    if not GameClass:
+        logger.error("Unsupported game requested: {}", game)
+        return JSONResponse({"error": f"Game {game} not supported"}, status_code=400)
+
+    meta_by_id = METADATA.bot_index(game)
+    if bot0 not in meta_by_id or bot1 not in meta_by_id:
+        logger.error("Unknown bot id: {} or {}", bot0, bot1)
+        return JSONResponse({"error": "Unknown bot id."}, status_code=400)
+    try:
+        time_control = resolve_time_control(tc, METADATA.game(game), limit=MAX_MOVE_SECONDS)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return GameClass, meta_by_id, time_control
+
+
+@app.get("/play")
+async def play(
+    game: str = Query(...),
+    bot0: str = Query(...),
+    bot1: str = Query(...),
+    tc: Optional[str] = Query(None, description="time control, e.g. fixed:0.5, fischer:5+0.1, nodes:20000"),
+) -> Dict[str, Any]:
+    debug_sampled("New match: {} | {} (X) vs {} (O)", game, bot0, bot1)
+    resolved = await _resolve_match(game, bot0, bot1, tc)
+    if isinstance(resolved, JSONResponse):
+        return resolved
+    GameClass, meta_by_id, time_control = resolved
 
+    try:
+        payload = await MATCH_EXECUTOR.submit(_play_match, GameClass, game, bot0, bot1, meta_by_id, time_control)
+    except Saturated as e:
+        return _saturated_response(e)
     return JSONResponse(payload)
 
 
+# ---------- Streaming (Server-Sent Events) ----------
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _live_events(slot: Reservation, GameClass: type, game: str, bot0: str, bot1: str,
+                       meta_by_id: Dict[str, Dict[str, Any]], time_control: TimeControl) -> AsyncIterator[str]:
+    moves = None
+    try:
+        controller = await slot.run(_make_controller, GameClass, bot0, bot1, meta_by_id, time_control)
+        moves = controller.iter_moves()
+        yield _sse("start", {"game": game, "bot0": bot0, "bot1": bot1, "live": True,
+                             "time_control": time_control.spec})
+        ply = 0
+        while True:
+            record = await slot.run(next, moves, None)
+            if record is None:
+                break
+            ply += 1
+            yield _sse("move", {"ply": ply, **record})
+        payload = await slot.run(_finish_match, game, bot0, bot1, controller.result)
+        yield _sse("result", payload)
+    finally:
+        if moves is not None:
+            try:
+                moves.close()  # client went away: abort the match, free bot workers
+            except ValueError:
+                pass  # still running a move in the executor; it is closed when collected
+        slot.close()  # the slot itself stays taken until that move returns
+
+
+@app.get("/play/stream")
+async def play_stream(
+    game: str = Query(...),
+    bot0: str = Query(...),
+    bot1: str = Query(...),
+    tc: Optional[str] = Query(None, description="time control, e.g. fixed:0.5, fischer:5+0.1, nodes:20000"),
+):
+    """Plays a match and streams it as SSE: a `start` event, one `move` event per
+    move (with think_ms and clock) and a final `result` event with the full payload."""
+    debug_sampled("New streamed match: {} | {} (X) vs {} (O)", game, bot0, bot1)
+    resolved = await _resolve_match(game, bot0, bot1, tc)
+    if isinstance(resolved, JSONResponse):
+        return resolved
+    GameClass, meta_by_id, time_control = resolved
+    try:
+        slot = MATCH_EXECUTOR.reserve()
+    except Saturated as e:
+        return _saturated_response(e)
+    events = _live_events(slot, GameClass, game, bot0, bot1, meta_by_id, time_control)
+    # the generator's finally only runs if it was started: also free the slot
+    # after the response, and if the generator is dropped without running
+    weakref.finalize(events, slot.close)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS,
+                             background=BackgroundTask(slot.close))
+
+
+def _load_match(match_id: str) -> Optional[Dict[str, Any]]:
+    record = get_match_store().read(match_id)
+    if record is not None:
+        return record
+    # legacy per-file logs: a bare file name inside arena_data/matches
+    if os.path.basename(match_id) == match_id and match_id.endswith(".json"):
+        path = os.path.join(MATCHES_DIR, match_id)
+        if os.path.exists(path):
+            record = read_json(path, None)
+            if record:
+                record["id"] = match_id
+                return record
+    return None
+
+
+async def _replay_events(record: Dict[str, Any], speed: float) -> AsyncIterator[str]:
+    yield _sse("start", {"game": record.get("game"), "bot0": record.get("bot0"),
+                         "bot1": record.get("bot1"), "id": record["id"], "live": False})
+    for ply, move in enumerate(record.get("moves", []), start=1):
+        if speed > 0:
+            await asyncio.sleep(1.0 / speed)
+        yield _sse("move", {"ply": ply, **move})
+    yield _sse("result", record)
+
+
+@app.get("/replay")
+async def replay(
+    id: str = Query(..., description="match id from the match log, or a legacy match file name"),
+    speed: float = Query(1.0, ge=0, description="moves per second, 0 = as fast as possible"),
+):
+    record = await run_in_threadpool(_load_match, id)
+    if record is None:
+        return JSONResponse({"error": f"Match {id} not found"}, status_code=404)
+    return StreamingResponse(_replay_events(record, speed),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _query_matches(filters: Dict[str, Any], full: bool) -> Dict[str, Any]:
+    rows, next_cursor = get_match_store().query(full=full, **filters)
+    return {"matches": rows, "next_cursor": next_cursor}
+
+
+@app.get("/matches")
+async def matches(
+    game: Optional[str] = None,
+    bot: Optional[str] = Query(None, description="either side"),
+    opponent: Optional[str] = Query(None, description="the other side, with bot"),
+    result: Optional[str] = Query(None, description="win, loss or draw, from bot's side"),
+    bot0: Optional[str] = None,
+    bot1: Optional[str] = None,
+    winner: Optional[str] = Query(None, description="X, O or draw"),
+    since: Optional[str] = Query(None, description="epoch seconds or ISO 8601 time"),
+    until: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("desc", description="desc = newest first"),
+    full: bool = Query(False, description="include the move lists and final boards"),
+):
+    try:
+        filters = {
+            "game": game, "bot": bot, "opponent": opponent, "result": result, "bot0": bot0, "bot1": bot1,
+            "winner": winner, "cursor": cursor, "limit": limit, "order": order,
+            "since": parse_time(since) if since is not None else None,
+            "until": parse_time(until) if until is not None else None,
+        }
+        return JSONResponse(await run_in_threadpool(_query_matches, filters, full))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+class TournamentRequest(BaseModel):
+    game: str
+    bots: Optional[List[str]] = None   # default: every bot of the game
+    format: str = "round_robin"
+    repetitions: int = Field(1, ge=1, le=MAX_REPETITIONS)
+    rounds: Optional[int] = Field(None, ge=1, le=MAX_ROUNDS)
+    workers: Optional[int] = Field(None, ge=1, le=MAX_WORKERS)
+    time_control: Optional[str] = None  # default: the game's, then ARENA_TIME_CONTROL
+    commit: bool = True
+
+
+# Tournament jobs run in the match executor after POST /tournaments has answered.
+# Their state is a JSON file per job, so any API worker can answer GET /tournaments/{id}.
+_JOB_ID = re.compile(r"[0-9a-f]{16}")
+_RUNNING_JOBS: set = set()  # keeps the asyncio tasks alive until they finish
+
+
+def _job_path(job_id: str) -> str:
+    return os.path.join(TOURNAMENTS_DIR, f"{job_id}.json")
+
+
+def _save_job(job: Dict[str, Any]) -> None:
+    os.makedirs(TOURNAMENTS_DIR, exist_ok=True)
+    write_json_atomic(_job_path(job["id"]), job)
+
+
+def _run_tournament_job(job: Dict[str, Any], spec: TournamentSpec, commit: bool) -> None:
+    try:
+        result = run_tournament(spec, commit=commit)
+    except Exception as e:
+        logger.exception("Tournament {} failed", job["id"])
+        job.update(status="failed", error=str(e))
+    else:
+        job.update(status="done", result=result.to_dict())
+    job["finished"] = time.time()
+    _save_job(job)
+
+
+async def _tournament_job(slot: Reservation, job: Dict[str, Any], spec: TournamentSpec, commit: bool) -> None:
+    try:
+        await slot.run(_run_tournament_job, job, spec, commit)
+    finally:
+        slot.close()
+
+
+@app.post("/tournaments", status_code=202)
+async def tournaments(req: TournamentRequest):
+    """Starts a tournament and answers 202 with its job id; poll GET /tournaments/{id}."""
+    bots = req.bots or list(METADATA.bot_index(req.game))
+    spec = TournamentSpec(
+        game=req.game, bots=bots, format=req.format, repetitions=req.repetitions,
+        rounds=req.rounds, workers=req.workers, time_control=req.time_control,
+    )
+    try:
+        if req.time_control:
+            parse_time_control(req.time_control)  # the server's per-move maximum applies to requests
+        await run_in_threadpool(spec.validate)  # may import the game module
+    except GamePluginError as e:
+        return _plugin_error_response(req.game, e)
+    except ValueError as e:
+        logger.error(f"Invalid tournament request: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        slot = MATCH_EXECUTOR.reserve()
+    except Saturated as e:
+        return _saturated_response(e)
+    job = {"id": secrets.token_hex(8), "status": "running", "game": req.game,
+           "format": req.format, "bots": bots, "commit": req.commit, "started": time.time()}
+    try:
+        await run_in_threadpool(_save_job, dict(job))
+    except BaseException:
+        slot.close()
+        raise
+    task = asyncio.create_task(_tournament_job(slot, job, spec, req.commit))
+    _RUNNING_JOBS.add(task)
+    task.add_done_callback(_RUNNING_JOBS.discard)
+    location = f"/tournaments/{job['id']}"
+    return JSONResponse({"id": job["id"], "status": "running", "url": location},
+                        status_code=202, headers={"Location": location})
+
+
+@app.get("/tournaments/{job_id}")
+async def tournament_job(job_id: str):
+    if not _JOB_ID.fullmatch(job_id) or not os.path.exists(_job_path(job_id)):
+        return JSONResponse({"error": f"Tournament {job_id} not found"}, status_code=404)
+    return JSONResponse(await run_in_threadpool(read_json, _job_path(job_id), None))
+
+
 @app.get("/backup")
-def download_backup():
-    tmpdir = tempfile.mkdtemp()
-    zip_path = Path(tmpdir) / "arena_backup.zip"
-    shutil.make_archive(str(zip_path).replace(".zip", ""), "zip", APP_DIR / "arena_data")
-    logger.info("Backup created and ready for download")
-    return FileResponse(zip_path, filename="arena_backup.zip", media_type="application/zip")
+async def download_backup(since: Optional[str] = Query(None), segment: Optional[int] = Query(None)):
+    # the archive is generated chunk by chunk in a worker thread while it is sent
+    try:
+        since_ts = parse_time(since) if since is not None else None
+    except ValueError as e:
+        return JSONResponse({"error": f"since: {e}"}, status_code=400)
+    kind = "incremental" if since_ts is not None or segment is not None else "full"
+    return StreamingResponse(
+        iter_backup(since_ts, segment),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="arena_backup_{kind}.zip"'},
+    )
+
+
+@app.post("/restore")
+async def restore_backup(request: Request, results: bool = Query(True)):
+    """Imports a backup archive sent as the raw request body."""
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > RESTORE_MAX_BYTES:
+                return JSONResponse({"error": "Backup archive too large."}, status_code=413)
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            summary = await run_in_threadpool(restore, spool, results)
+        except ValueError as e:
+            logger.error("Rejected backup archive: {}", e)
+            return JSONResponse({"error": str(e)}, status_code=400)
+    finally:
+        spool.close()
+    return JSONResponse(summary)
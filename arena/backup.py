@@ -0,0 +1,297 @@
+"""Streaming backups of arena_data and their restore.
+
+A backup is a zip archive generated chunk by chunk (nothing is staged on
+disk), so it can be sent while it is being written:
+
+    manifest.json      format, kind, match count, last_ts / last_segment
+    matches.jsonl      one match record per line (match log + legacy files)
+    leaderboard.json   stats snapshot                    (full backups only)
+    ratings.json       ratings and head-to-head snapshot (full backups only)
+    games/, bots/      configuration and bot sources     (full backups only)
+
+An incremental backup (`since` epoch seconds and/or `from_segment`) holds
+only the manifest and the matches selected; feed the previous manifest's
+`last_ts` back as `since` to chain them. Restoring validates the whole
+archive first, then appends the matches the store does not have yet and
+counts their results on the leaderboard and ratings. Bot sources and
+configuration are never restored, since they are code.
+
+    python -m arena.backup create out.zip [--since TS] [--from-segment N]
+    python -m arena.backup restore in.zip [--no-results]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+import zipfile
+import zlib
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from .logging_config import logger
+from .filestorage import BOTS_DIR, GAMES_DIR, MATCHES_DIR
+from .leaderboard import get_store
+from .matchstore import get_match_store, legacy_records
+from .ratings import head_to_head_rows
+
+FORMAT = "arena-backup"
+VERSION = 1
+CHUNK_SIZE = 64 * 1024
+IMPORT_BATCH = 1000
+RESTORE_MAX_BYTES = int(os.environ.get("ARENA_RESTORE_MAX_MB", "512")) * 1024 * 1024
+WINNERS = ("X", "O", "draw")
+
+MatchKey = Tuple[float, str, str, str, str]
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object collecting the zip output between yields."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _dumps(obj: Any) -> bytes:
+    return (json.dumps(obj, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _config_files() -> Iterator[Tuple[str, str]]:
+    for src, prefix in ((GAMES_DIR, "games"), (BOTS_DIR, "bots")):
+        for dirpath, dirnames, filenames in os.walk(src):
+            dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                yield path, "/".join([prefix, os.path.relpath(path, src).replace(os.sep, "/")])
+
+
+def _snapshots() -> Iterator[Tuple[str, Any]]:
+    store = get_store()
+    stats = store.get_all()
+    yield "leaderboard.json", stats
+    yield "ratings.json", {
+        game: {
+            "ratings": {bot: r.to_dict() for bot, r in store.get_ratings(game).items()},
+            "head_to_head": head_to_head_rows(store.get_head_to_head(game)),
+        }
+        for game in stats
+    }
+
+
+def _records(since: Optional[float], from_segment: Optional[int]) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    """(segment, record) for the selected matches; legacy files not yet imported
+    into the match log come first with segment None."""
+    store = get_match_store()
+    if from_segment is None:
+        for record in legacy_records(MATCHES_DIR, skip=store.legacy_files_imported()):
+            if since is None or record["ts"] >= since:
+                yield None, record
+    for record in store.iter_matches(since=since, from_segment=from_segment):
+        seg = int(record.pop("id").split(":")[0])
+        yield seg, record
+
+
+def iter_backup(since: Optional[float] = None, from_segment: Optional[int] = None,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields a backup zip archive in chunks of roughly `chunk_size` bytes."""
+    sink = _ChunkSink()
+    incremental = since is not None or from_segment is not None
+    manifest: Dict[str, Any] = {
+        "format": FORMAT, "version": VERSION, "kind": "incremental" if incremental else "full",
+        "created": time.time(), "since": since, "from_segment": from_segment,
+        "matches": 0, "last_ts": None, "last_segment": None, "games": [],
+    }
+    games = set()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if not incremental:
+            for name, data in _snapshots():
+                zf.writestr(name, json.dumps(data, indent=2, ensure_ascii=False))
+            for path, arcname in _config_files():
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, zf.open(info, "w") as dst:
+                    while True:
+                        block = src.read(chunk_size)
+                        if not block:
+                            break
+                        dst.write(block)
+                        if sink.size >= chunk_size:
+                            yield sink.drain()
+
+        info = zipfile.ZipInfo("matches.jsonl", date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, "w", force_zip64=True) as out:
+            for seg, record in _records(since, from_segment):
+                out.write(_dumps(record))
+                manifest["matches"] += 1
+                if manifest["last_ts"] is None or record["ts"] > manifest["last_ts"]:
+                    manifest["last_ts"] = record["ts"]
+                if seg is not None:
+                    manifest["last_segment"] = seg
+                games.add(record.get("game"))
+                if sink.size >= chunk_size:
+                    yield sink.drain()
+
+        manifest["games"] = sorted(g for g in games if g)
+        zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+    yield sink.drain()
+    logger.info(
+        "Backup streamed: {} matches ({}, since={}, from_segment={})",
+        manifest["matches"], manifest["kind"], since, from_segment,
+    )
+
+
+# ---------- restore ----------
+
+def _validate(record: Any, line_no: int) -> Dict[str, Any]:
+    if not isinstance(record, dict):
+        raise ValueError(f"matches.jsonl line {line_no}: not an object")
+    ts = record.get("ts")
+    if isinstance(ts, bool) or not isinstance(ts, (int, float)):
+        raise ValueError(f"matches.jsonl line {line_no}: missing or invalid ts")
+    for key in ("game", "bot0", "bot1"):
+        if not isinstance(record.get(key), str) or not record[key]:
+            raise ValueError(f"matches.jsonl line {line_no}: missing or invalid {key}")
+    if record.get("winner") not in WINNERS:
+        raise ValueError(f"matches.jsonl line {line_no}: winner must be one of {', '.join(WINNERS)}")
+    if not isinstance(record.get("moves", []), list):
+        raise ValueError(f"matches.jsonl line {line_no}: moves must be a list")
+    return record
+
+
+def _key(r: Dict[str, Any]) -> MatchKey:
+    return (float(r["ts"]), r["game"], r["bot0"], r["bot1"], r["winner"])
+
+
+def _iter_archive_matches(zf: zipfile.ZipFile) -> Iterator[Dict[str, Any]]:
+    with zf.open("matches.jsonl") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"matches.jsonl line {line_no}: invalid JSON") from None
+            yield _validate(record, line_no)
+
+
+def read_manifest(zf: zipfile.ZipFile) -> Dict[str, Any]:
+    names = set(zf.namelist())
+    if "manifest.json" not in names or "matches.jsonl" not in names:
+        raise ValueError("Not an arena backup (manifest.json or matches.jsonl missing)")
+    try:
+        manifest = json.loads(zf.read("manifest.json"))
+    except ValueError:
+        raise ValueError("manifest.json is not valid JSON") from None
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT:
+        raise ValueError("manifest.json is not an arena backup manifest")
+    if manifest.get("version") != VERSION:
+        raise ValueError(f"Unsupported backup version {manifest.get('version')}, expected {VERSION}")
+    return manifest
+
+
+def _record_results(batch: List[Dict[str, Any]]) -> None:
+    by_game: Dict[str, List[Tuple[str, str, str]]] = {}
+    for r in batch:
+        by_game.setdefault(r["game"], []).append((r["bot0"], r["bot1"], r["winner"]))
+    store = get_store()
+    for game, results in by_game.items():
+        store.record_results(game, results)
+
+
+def restore(fileobj: IO[bytes], apply_results: bool = True) -> Dict[str, Any]:
+    """Validates a backup archive and imports its matches; raises ValueError
+    (before anything is written) if the archive is invalid."""
+    try:
+        zf = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise ValueError("Not a zip archive") from None
+    with zf:
+        manifest = read_manifest(zf)
+        count, min_ts, max_ts = 0, None, None
+        try:
+            for record in _iter_archive_matches(zf):
+                count += 1
+                min_ts = record["ts"] if min_ts is None else min(min_ts, record["ts"])
+                max_ts = record["ts"] if max_ts is None else max(max_ts, record["ts"])
+        except (zipfile.BadZipFile, EOFError, zlib.error) as e:
+            raise ValueError(f"Corrupt archive: {e}") from None
+        if count != manifest.get("matches", count):
+            raise ValueError(f"manifest.json lists {manifest.get('matches')} matches, archive has {count}")
+
+        store = get_match_store()
+        seen = set()
+        if count:
+            seen = {_key(e) for e in store.iter_index(since=min_ts, until=max_ts + 1)}
+        # legacy files still on disk are already counted, imported or not
+        known_legacy = store.legacy_files_imported()
+        if os.path.isdir(MATCHES_DIR):
+            known_legacy.update(os.listdir(MATCHES_DIR))
+        imported = skipped = 0
+        batch: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            store.append_many(batch)
+            if apply_results:
+                _record_results(batch)
+            batch.clear()
+
+        for record in _iter_archive_matches(zf):
+            key = _key(record)
+            if key in seen or record.get("legacy_file") in known_legacy:
+                skipped += 1
+                continue
+            seen.add(key)
+            record.pop("id", None)
+            batch.append(record)
+            imported += 1
+            if len(batch) >= IMPORT_BATCH:
+                flush()
+        if batch:
+            flush()
+
+    logger.info("Backup restored: {} matches imported, {} already present ({})",
+                imported, skipped, manifest["kind"])
+    return {"kind": manifest["kind"], "matches": count, "imported": imported,
+            "skipped": skipped, "results_applied": apply_results}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backup and restore arena data.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_create = sub.add_parser("create", help="write a backup archive")
+    p_create.add_argument("out")
+    p_create.add_argument("--since", type=float, help="only matches from this epoch time on")
+    p_create.add_argument("--from-segment", type=int, help="only matches from this match-log segment on")
+    p_restore = sub.add_parser("restore", help="import the matches of a backup archive")
+    p_restore.add_argument("src")
+    p_restore.add_argument("--no-results", action="store_true",
+                           help="do not count imported matches on the leaderboard and ratings")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "create":
+        with open(args.out, "wb") as f:
+            for chunk in iter_backup(args.since, args.from_segment):
+                f.write(chunk)
+        print(f"Wrote {args.out}")
+    else:
+        with open(args.src, "rb") as f:
+            print(json.dumps(restore(f, apply_results=not args.no_results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,288 @@
 
 from __future__ import annotations
+import ctypes
 import importlib.util
 import os
 import threading
 import queue
 import time
-from typing import Callable, Dict, Any, List, Optional
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from .logging_config import logger
 from .core import State, Player, Move
 from .game_base import Game
+from .metrics import BOT_MOVE_SECONDS, BOT_FALLBACKS, NEXT_STATE_CALLS, NEXT_STATE_SECONDS, MATCHES
+from .timecontrol import FixedTime, TimeControl, wants_context
 
-def load_bot_callable(bots_dir: str, file_name: str) -> Callable[[State, List[Move], Player, Game], Move]:
-    path = os.path.join(bots_dir, file_name)
+# Loaded bots keyed by absolute path -> ((mtime_ns, size), choose_move).
+# Keeping the callable keeps its module alive, so tables a bot builds at import
+# time (or caches lazily) survive across matches.
+_BOT_CACHE: Dict[str, Tuple[Tuple[int, int], Callable]] = {}
+_BOT_CACHE_LOCK = threading.Lock()
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _import_bot(path: str, file_name: str) -> Callable[[State, List[Move], Player, Game], Move]:
     spec = importlib.util.spec_from_file_location("arena_bot_" + os.path.splitext(file_name)[0], path)
     if spec is None or spec.loader is None:
         raise RuntimeError(f"Cannot load bot from {file_name}")
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)  # type: ignore
     if not hasattr(module, "choose_move"):
-        raise RuntimeError(f"Bot {file_name} must define choose_move(state, legal_moves, player, game)")
+        raise RuntimeError(f"Bot {file_name} must define choose_move(state, legal_moves, player, game[, ctx])")
     return getattr(module, "choose_move")
 
+
+def load_bot_callable(bots_dir: str, file_name: str) -> Callable[[State, List[Move], Player, Game], Move]:
+    """Returns the bot's choose_move, importing the file only if it changed
+    (mtime or size) since it was last loaded."""
+    path = os.path.abspath(os.path.join(bots_dir, file_name))
+    try:
+        sig = _file_signature(path)
+    except OSError:
+        raise RuntimeError(f"Cannot load bot from {file_name}")
+    cached = _BOT_CACHE.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    with _BOT_CACHE_LOCK:
+        cached = _BOT_CACHE.get(path)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+        fn = _import_bot(path, file_name)
+        _BOT_CACHE[path] = (sig, fn)
+    logger.info(f"{'Reloaded' if cached else 'Loaded'} bot module {file_name}")
+    return fn
+
+
+def warm_up_bots(bots_dir: str, bots_meta: List[Dict[str, Any]]) -> int:
+    """Imports every bot listed in metadata so the first match pays no import cost."""
+    loaded = 0
+    for file_name in sorted({b["file"] for b in bots_meta if b.get("file")}):
+        try:
+            load_bot_callable(bots_dir, file_name)
+            loaded += 1
+        except Exception as e:
+            logger.error(f"Failed to warm up bot {file_name}: {e}")
+    return loaded
+
+
+class BotTimeout(BaseException):
+    """Raised inside a bot thread to cancel a move that ran over its time limit."""
+
+
+def _raise_in_thread(thread_id: int, exc_type: type) -> bool:
+    # Asynchronously raises exc_type in the target thread (delivered at its next bytecode).
+    res = ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), ctypes.py_object(exc_type))
+    return res == 1
+
+
+class BotWorker:
+    """Long-lived thread that executes bot calls, reused across moves and matches.
+
+    A call that exceeds its time limit is cancelled by raising BotTimeout inside
+    the worker thread. If the bot does not unwind within `grace` seconds (e.g. it
+    is stuck in C code) the worker is marked unhealthy and the pool replaces it.
+    """
+
+    def __init__(self, grace: float = 0.05):
+        self.grace = grace
+        self.healthy = True
+        self._jobs: "queue.SimpleQueue[Optional[Tuple[int, Callable, tuple]]]" = queue.SimpleQueue()
+        self._results: "queue.SimpleQueue[Tuple[int, Any, Optional[BaseException]]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._busy: Optional[int] = None  # token of the call currently running
+        self._token = 0
+        self.last_error: Optional[BaseException] = None  # raised by the last call that ended in "error"
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="arena-bot-worker")
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                token, fn, args = job
+                try:
+                    try:
+                        out = (token, fn(*args), None)
+                    finally:
+                        with self._lock:
+                            self._busy = None
+                except BaseException as e:  # bot errors and BotTimeout
+                    out = (token, None, e)
+                self._results.put(out)
+            except BotTimeout:
+                continue  # cancellation delivered after the call had already returned
+
+    def call(self, fn: Callable, args: tuple, timeout: float) -> Tuple[Optional[Move], float, str]:
+        """Runs fn(*args). Returns (move, elapsed seconds, status) where status is
+        "ok", "error" or "timeout"."""
+        self._token += 1
+        token = self._token
+        with self._lock:
+            self._busy = token
+        start = time.perf_counter()
+        self._jobs.put((token, fn, args))
+        deadline = start + timeout
+        while True:
+            try:
+                got, move, err = self._results.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if got == token:  # older tokens are late answers of cancelled calls
+                elapsed = time.perf_counter() - start
+                if err is not None:
+                    self.last_error = err
+                    return None, elapsed, "error"
+                return move, elapsed, "ok"
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if self._busy == token:
+                _raise_in_thread(self._thread.ident, BotTimeout)
+        try:
+            while self._results.get(timeout=self.grace)[0] != token:
+                pass
+        except queue.Empty:
+            self.healthy = False
+            self._jobs.put(None)  # thread exits once the runaway call returns
+        return None, elapsed, "timeout"
+
+
+class BotWorkerPool:
+    def __init__(self):
+        self._idle: List[BotWorker] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> BotWorker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker._thread.is_alive():
+                    return worker
+        return BotWorker()
+
+    def _after_fork(self) -> None:
+        # a forked child inherits the idle workers but not their threads
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def release(self, worker: BotWorker) -> None:
+        if not worker.healthy:
+            logger.warning("Discarding bot worker stuck in a timed-out move")
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+
+WORKER_POOL = BotWorkerPool()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=WORKER_POOL._after_fork)
+
+
+class IsolatedBot(ABC):
+    """A bot that runs somewhere else (e.g. arena.sandbox.SandboxedBot) and
+    enforces its own time limit instead of using a BotWorker thread. `args`
+    always carries the MoveContext as its fifth element."""
+
+    @abstractmethod
+    def call(self, args: tuple, timeout: float) -> Tuple[Optional[Move], float, str]:
+        """Returns (move, elapsed seconds, status) like BotWorker.call."""
+
+
 class MatchController:
-    def __init__(self, game: Game, bot0_fn: Callable, bot1_fn: Callable, time_limit: float = 0.5):
+    """Plays one match. Each side has its own clock under `time_control`
+    (default: `time_limit` seconds per move); bots taking a fifth argument
+    receive the move's arena.timecontrol.MoveContext."""
+
+    def __init__(self, game: Game, bot0_fn: Callable, bot1_fn: Callable, time_limit: float = 0.5,
+                 bot_ids: Tuple[str, str] = ("X", "O"), time_control: Optional[TimeControl] = None):
         self.game = game
         self.bot_fns = {Player.X: bot0_fn, Player.O: bot1_fn}
-        self.time_limit = time_limit
-
-    def _call_with_timeout(self, fn: Callable, args: tuple, legal_moves: List[Move]) -> Move:
-        q: "queue.Queue[Optional[Move]]" = queue.Queue()
+        self.bot_ids = {Player.X: bot_ids[0], Player.O: bot_ids[1]}  # metric labels
+        self.time_control = time_control or FixedTime(time_limit)
+        self._workers: Dict[Player, BotWorker] = {}
+        self.result: Optional[Dict[str, Any]] = None
 
-        def target():
-            try:
-                mv = fn(*args)
-                q.put(mv)
-            except Exception:
-                q.put(None)
-
-        t = threading.Thread(target=target, daemon=True)
-        t.start()
-        t.join(self.time_limit)
-        if t.is_alive():
-            return legal_moves[0]  # fallback: first legal move
-        result = q.get()
-        if result is None or result not in legal_moves:
-            return legal_moves[0]  # fallback on invalid result
-        return result
+    def _call_with_timeout(self, player: Player, args: tuple, legal_moves: List[Move]) -> Tuple[Move, float, str]:
+        fn = self.bot_fns[player]
+        budget = args[4].budget
+        if isinstance(fn, IsolatedBot):
+            move, elapsed, status = fn.call(args, budget)
+        else:
+            worker = self._workers[player]
+            if not worker.healthy:
+                WORKER_POOL.release(worker)
+                worker = self._workers[player] = WORKER_POOL.acquire()
+            move, elapsed, status = worker.call(fn, args if wants_context(fn) else args[:4], budget)
+        if status == "ok" and move not in legal_moves:
+            status = "invalid"
+        if status != "ok":
+            return legal_moves[0], elapsed, status  # fallback: first legal move
+        return move, elapsed, status
 
-    def run(self) -> Dict[str, Any]:
-        state = self.game.initial_state()
+    def iter_moves(self) -> Iterator[Dict[str, Any]]:
+        """Plays the match, yielding each move record as soon as it is made.
+        Once exhausted, `self.result` holds the same dict run() returns.
+        Closing the generator early aborts the match and frees its workers."""
+        game = self.game
+        state = game.initial_state()
         moves: List[Dict[str, Any]] = []
+        fallbacks = {p.value: 0 for p in self.bot_fns}
+        self.result = None
+        next_state_calls, next_state_time = 0, 0.0
+        clocks = {p: self.time_control.new_clock() for p in self.bot_fns}
 
-        while not self.game.is_terminal(state):
-            player = state.to_move
-            legal = self.game.legal_moves(state, player)
-            if not legal:
-                break
-            fn = self.bot_fns[player]
-            move = self._call_with_timeout(fn, (state.copy(), legal.copy(), player, self.game), legal)
-            state = self.game.next_state(state, move, player)
-            moves.append({"player": player.value, "move": move})
+        self._workers = {p: WORKER_POOL.acquire() for p, fn in self.bot_fns.items()
+                         if not isinstance(fn, IsolatedBot)}
+        try:
+            while not game.is_terminal(state):
+                player = state.to_move
+                legal = game.legal_moves(state, player)
+                if not legal:
+                    break
+                ctx = clocks[player].context(len(moves))
+                args = (state.copy(), legal.copy(), player, game, ctx)
+                move, elapsed, status = self._call_with_timeout(player, args, legal)
+                bot_id = self.bot_ids[player]
+                BOT_MOVE_SECONDS.observe(elapsed, game=game.code, bot=bot_id)
+                t0 = time.perf_counter()
+                state = game.next_state(state, move, player)
+                next_state_time += time.perf_counter() - t0
+                next_state_calls += 1
+                record = {"player": player.value, "move": move, "think_ms": round(elapsed * 1000, 3),
+                          "clock": clocks[player].charge(elapsed)}
+                if status != "ok":
+                    record["fallback"] = status
+                    fallbacks[player.value] += 1
+                    BOT_FALLBACKS.inc(game=game.code, bot=bot_id, reason=status)
+                    logger.warning("Bot {} fell back to the first legal move ({})", bot_id, status)
+                moves.append(record)
+                yield record
+        finally:
+            for w in self._workers.values():
+                WORKER_POOL.release(w)
+            self._workers = {}
+            NEXT_STATE_CALLS.inc(next_state_calls, game=game.code)
+            NEXT_STATE_SECONDS.inc(next_state_time, game=game.code)
 
-        winner = self.game.winner(state)
-        return {
+        winner = game.winner(state)
+        MATCHES.inc(game=game.code, winner=winner.value if winner else "draw")
+        self.result = {
             "final_state": state,
             "moves": moves,
             "winner": winner.value if winner else "draw",
-            "winning_line": state.winning_line or []
+            "winning_line": state.winning_line or [],
+            "fallbacks": fallbacks,
+            "time_control": self.time_control.spec,
         }
+
+    def run(self) -> Dict[str, Any]:
+        for _ in self.iter_moves():
+            pass
+        return self.result
@@ -2,7 +2,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Sequence, Tuple
 
 class Player(str, Enum):
     X = "X"
@@ -25,6 +25,76 @@ class State:
     def copy(self) -> "State":
         return State(board=self.board.copy(), to_move=self.to_move, winner=self.winner, moves_played=self.moves_played, winning_line=list(self.winning_line) if self.winning_line else None)
 
+    def freeze(self) -> "FrozenState":
+        return FrozenState(self.board, self.to_move, self.winner, self.moves_played, self.winning_line)
+
+
+class FrozenState:
+    """Immutable State with a tuple board. The hash is computed once, so frozen
+    states can be used directly as dict keys (caches, transposition tables)
+    and shared without copying. copy() returns a plain mutable State, which is
+    what bots are handed. Games opt in with `Game.frozen_states`."""
+    __slots__ = ("board", "to_move", "winner", "moves_played", "winning_line", "_hash")
+
+    board: Tuple[Any, ...]
+    to_move: Player
+    winner: Optional[Player]
+    moves_played: int
+    winning_line: Optional[Tuple[int, ...]]
+
+    def __init__(self, board: Sequence[Any], to_move: Player, winner: Optional[Player] = None,
+                 moves_played: int = 0, winning_line: Optional[Sequence[int]] = None):
+        _set_board(self, tuple(board))
+        _set_to_move(self, to_move)
+        _set_winner(self, winner)
+        _set_moves_played(self, moves_played)
+        _set_winning_line(self, tuple(winning_line) if winning_line else None)
+        _set_hash(self, None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FrozenState is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("FrozenState is immutable")
+
+    def __hash__(self) -> int:
+        h = self._hash
+        if h is None:  # computed on first use, most states are never hashed
+            h = hash((self.board, self.to_move, self.winner, self.moves_played))
+            _set_hash(self, h)
+        return h
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, FrozenState):
+            return NotImplemented
+        return (self.board == other.board and self.to_move == other.to_move
+                and self.winner == other.winner and self.moves_played == other.moves_played)
+
+    def __reduce__(self):
+        # slots + blocked __setattr__ need an explicit pickle recipe (process pools)
+        return (FrozenState, (self.board, self.to_move, self.winner, self.moves_played, self.winning_line))
+
+    def __repr__(self) -> str:
+        return (f"FrozenState(board={self.board!r}, to_move={self.to_move!r}, winner={self.winner!r}, "
+                f"moves_played={self.moves_played!r}, winning_line={self.winning_line!r})")
+
+    def copy(self) -> State:
+        return self.thaw()
+
+    def thaw(self) -> State:
+        return State(board=list(self.board), to_move=self.to_move, winner=self.winner,
+                     moves_played=self.moves_played,
+                     winning_line=list(self.winning_line) if self.winning_line else None)
+
+
+# slot setters that bypass the blocked __setattr__ (faster than object.__setattr__)
+(_set_board, _set_to_move, _set_winner, _set_moves_played, _set_winning_line, _set_hash) = (
+    FrozenState.__dict__[name].__set__ for name in FrozenState.__slots__
+)
+
+
 @dataclass
 class BotSpec:
     id: str
@@ -1,15 +1,14 @@
 from __future__ import annotations
-import os, json, datetime
-from typing import Any, Dict, List
-from .logging_config import logger
-
-
-from .core import Result
+import os, json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+from .logging_config import logger, debug_sampled
 
 DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "arena_data"))
 BOTS_DIR = os.path.join(DATA_DIR, "bots")
 GAMES_DIR = os.path.join(DATA_DIR, "games")
 MATCHES_DIR = os.path.join(DATA_DIR, "matches")
+TOURNAMENTS_DIR = os.path.join(DATA_DIR, "tournaments")
 LEADERBOARD_PATH = os.path.join(DATA_DIR, "leaderboard.json")
 BOTS_METADATA = os.path.join(BOTS_DIR, "metadata.json")
 
@@ -38,36 +37,74 @@ def read_json(path: str, default: Any) -> Any:
 def write_json(path: str, data: Any) -> None:
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
-    logger.success(f"Saved JSON → {path}")
+    logger.debug("Saved JSON → {}", path)
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    # write to a sibling temp file and rename, so readers never see a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    debug_sampled("Saved JSON → {}", path)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive inter-process lock held on `path` (created if missing)."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
 
 def list_games() -> List[Dict[str, Any]]:
     ensure_dirs()
     games = []
     for name in os.listdir(GAMES_DIR):
-        logger.debug(f"Found file in games dir: {name}")  # log every file seen
+        logger.debug("Found file in games dir: {}", name)
         if not name.endswith(".json"):
-            logger.debug(f"Skipping non-JSON file: {name}")
+            logger.debug("Skipping non-JSON file: {}", name)
             continue
         if "Zone.Identifier" in name:
-            logger.debug(f"Skipping junk file: {name}")
+            logger.debug("Skipping junk file: {}", name)
             continue
 
         p = os.path.join(GAMES_DIR, name)
-        logger.debug(f"Trying to load game JSON: {p}")
+        logger.debug("Trying to load game JSON: {}", p)
         meta = read_json(p, {})
         if meta:
-            logger.success(f"Loaded game OK: {meta.get('code')} ({name})")
+            logger.debug("Loaded game OK: {} ({})", meta.get("code"), name)
             games.append(meta)
         else:
             logger.error(f"Failed or empty JSON for: {name}")
 
-    logger.info(f"Total games loaded: {len(games)}")
+    logger.info("Total games loaded: {}", len(games))
     return games
 
+def list_all_bots() -> List[Dict[str, Any]]:
+    ensure_dirs()
+    return read_json(BOTS_METADATA, [])
+
+
 def list_bots(game_code: str) -> List[Dict[str, Any]]:
     ensure_dirs()
-    logger.debug(f"Looking for bots metadata at {BOTS_METADATA}")
+    logger.debug("Looking for bots metadata at {}", BOTS_METADATA)
 
     if not os.path.exists(BOTS_METADATA):
         logger.warning("metadata.json not found")
@@ -77,61 +114,35 @@ def list_bots(game_code: str) -> List[Dict[str, Any]]:
         logger.warning("Ignoring Zone.Identifier metadata junk")
         return []
 
-    logger.debug(f"Trying to load metadata.json")
+    logger.debug("Trying to load metadata.json")
     meta = read_json(BOTS_METADATA, [])
     if not meta:
         logger.error("metadata.json is empty or invalid")
         return []
 
     bots = [b for b in meta if b.get("game") == game_code]
-    logger.info(f"Listed {len(bots)} bots for game={game_code}")
+    logger.info("Listed {} bots for game={}", len(bots), game_code)
     for b in bots:
-        logger.debug(f" → Bot loaded: {b.get('id')} ({b.get('name')})")
+        logger.debug(" → Bot loaded: {} ({})", b.get("id"), b.get("name"))
     return bots
 
 
 def get_leaderboard(game_code: str) -> Dict[str, Any]:
-    ensure_dirs()
-    lb = read_json(LEADERBOARD_PATH, {})
-    logger.debug(f"Fetched leaderboard for {game_code}")
-    return lb.get(game_code, {})
-
-
-def _init_stat() -> Dict[str, Any]:
-    return {"wins": 0, "losses": 0, "draws": 0, "games": 0}
+    from .leaderboard import get_store
+    return get_store().get(game_code)
 
 
 def update_leaderboard(game_code: str, bot_id: str, result: str) -> None:
-    ensure_dirs()
-    lb = read_json(LEADERBOARD_PATH, {})
-    game_lb = lb.get(game_code, {})
-    stats = game_lb.get(bot_id, _init_stat())
-
-    if result == Result.WIN.value:
-        stats["wins"] += 1
-    elif result == Result.LOSS.value:
-        stats["losses"] += 1
-    else:
-        stats["draws"] += 1
-    stats["games"] += 1
-
-    game_lb[bot_id] = stats
-    lb[game_code] = game_lb
-    write_json(LEADERBOARD_PATH, lb)
-
-    logger.success(
-        f"Updated leaderboard: game={game_code}, bot={bot_id}, "
-        f"result={result}, stats={stats}"
-    )
+    from .leaderboard import get_store, result_delta
+    get_store().apply_deltas(game_code, {bot_id: result_delta(result)})
 
 
 def save_match_log(payload: Dict[str, Any]) -> str:
-    ensure_dirs()
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    path = os.path.join(MATCHES_DIR, f"{payload.get('game','game')}_{ts}.json")
-    write_json(path, payload)
-    logger.info(
-        f"Saved match log: game={payload.get('game')}, "
-        f"bots={payload.get('bot0')} vs {payload.get('bot1')} → winner={payload.get('winner')}"
+    """Appends the match to the segmented match log and returns its id."""
+    from .matchstore import get_match_store
+    match_id = get_match_store().append(payload)
+    debug_sampled(
+        "Saved match log {}: game={}, bots={} vs {} → winner={}",
+        match_id, payload.get("game"), payload.get("bot0"), payload.get("bot1"), payload.get("winner"),
     )
-    return path
+    return match_id
@@ -1,12 +1,27 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
-from .core import State, Player, Move
+from typing import List, Optional, Dict, Any, Sequence, Union
+from .core import State, FrozenState, Player, Move
+
+AnyState = Union[State, FrozenState]
 
 class Game(ABC):
     code: str  # short identifier (e.g., "tic_tac_toe")
     name: str
+    # opt in to immutable FrozenState (tuple board, cached hash); such games build
+    # every state through make_state instead of mutating a copy. Bots still get a
+    # mutable State: the controller hands them state.copy()
+    frozen_states: bool = False
+    # bump when the rules change, so tables cached by arena.solver are rebuilt
+    rules_version: int = 1
+
+    def make_state(self, board: Sequence[Any], to_move: Player, winner: Optional[Player] = None,
+                   moves_played: int = 0, winning_line: Optional[Sequence[int]] = None) -> AnyState:
+        if self.frozen_states:
+            return FrozenState(board, to_move, winner, moves_played, winning_line)
+        return State(board=list(board), to_move=to_move, winner=winner, moves_played=moves_played,
+                     winning_line=list(winning_line) if winning_line else None)
 
     @abstractmethod
     def initial_state(self) -> State: ...
@@ -24,6 +39,51 @@ class Game(ABC):
     def players(self) -> List[Player]:
         return [Player.X, Player.O]
 
+    def encode_state(self, state: AnyState) -> bytes:
+        """Compact key identifying a position (used by arena.solver). Two states
+        with the same encoding must have the same legal moves and outcome.
+        Games should override this with a fixed-size encoding."""
+        winner = state.winner.value if state.winner else ""
+        return repr((list(state.board), state.to_move.value, winner)).encode()
+
+    # ---------- batched simulation (optional, see arena.batch) ----------
+    # Batches hold n games as NumPy arrays; moves are action indices in [0, num_actions).
+    # Games that implement the hooks below set supports_batch; arena.batch checks
+    # the flag instead of calling a hook and catching NotImplementedError.
+    supports_batch: bool = False
+    num_actions: int = 0
+
+    def move_to_action(self, move: Move) -> int:
+        return move
+
+    def action_to_move(self, action: int) -> Move:
+        return action
+
+    def initial_states(self, n: int) -> Any:
+        raise NotImplementedError(f"{type(self).__name__} has no batched simulation")
+
+    def legal_mask(self, batch: Any) -> Any:
+        """(n, num_actions) bool array; all False for finished games."""
+        raise NotImplementedError(f"{type(self).__name__} has no batched simulation")
+
+    def step(self, batch: Any, actions: Any) -> Any:
+        """Applies one action per running game (ignored for finished games)."""
+        raise NotImplementedError(f"{type(self).__name__} has no batched simulation")
+
+    def terminal(self, batch: Any) -> Any:
+        return batch.done
+
+    def winners(self, batch: Any) -> Any:
+        """(n,) player codes (arena.batch.X / O), NONE for draws and running games."""
+        return batch.winner
+
+    def batch_to_state(self, batch: Any, i: int) -> AnyState:
+        raise NotImplementedError(f"{type(self).__name__} has no batched simulation")
+
     def validate(self) -> None:
         s = self.initial_state()
         assert s.to_move in self.players(), "Invalid initial player"
+        if self.supports_batch:
+            hooks = ("initial_states", "legal_mask", "step", "batch_to_state")
+            missing = [h for h in hooks if getattr(type(self), h) is getattr(Game, h)]
+            assert not missing, f"supports_batch without {', '.join(missing)}"
@@ -1,7 +1,3 @@
-from .tic_tac_toe import TicTacToe
-from .eleven_sticks import ElevenSticks
+from .registry import GAME_REGISTRY, GameRegistry, GamePluginError
 
-GAME_REGISTRY = {
-    TicTacToe.code: TicTacToe,
-    ElevenSticks.code: ElevenSticks,
-}
+__all__ = ["GAME_REGISTRY", "GameRegistry", "GamePluginError"]
@@ -2,6 +2,9 @@ from __future__ import annotations
 from typing import List, Optional
 from ..game_base import Game
 from ..core import State, Player, Move
+from ..batch import BatchState, np, require_numpy, X, O, CODE_PLAYERS, PLAYER_CODES
+
+STICKS = 11
 
 class ElevenSticks(Game):
     code = "eleven_sticks"
@@ -10,7 +13,7 @@ class ElevenSticks(Game):
     def initial_state(self) -> State:
         # use board[0] to store the count of sticks
         return State(
-            board=[11],              # <-- hack: board[0] = number of sticks
+            board=[STICKS],          # <-- hack: board[0] = number of sticks
             to_move=Player.X,
             winner=None,
             moves_played=0,
@@ -44,6 +47,10 @@ class ElevenSticks(Game):
             ns.to_move = player.other
         return ns
 
+    def encode_state(self, state: State) -> bytes:
+        # sticks left + side to move (with no sticks left, to_move took the last one and lost)
+        return bytes([self._get_sticks(state), PLAYER_CODES[state.to_move]])
+
     def is_terminal(self, state: State) -> bool:
         return self._get_sticks(state) == 0 or state.winner is not None
 
@@ -52,3 +59,50 @@ class ElevenSticks(Game):
 
     def render(self, state: State) -> str:
         return "|" * self._get_sticks(state)
+
+    # ---------- batched simulation ----------
+    # board: (n, 1) int16 sticks left; action i = take i + 1 sticks
+    supports_batch = True
+    num_actions = 3
+
+    def move_to_action(self, move: Move) -> int:
+        return move - 1
+
+    def action_to_move(self, action: int) -> Move:
+        return action + 1
+
+    def initial_states(self, n: int) -> BatchState:
+        require_numpy()
+        return BatchState(
+            board=np.full((n, 1), STICKS, dtype=np.int16),
+            to_move=np.full(n, X, dtype=np.int8),
+            winner=np.zeros(n, dtype=np.int8),
+            done=np.zeros(n, dtype=bool),
+            moves_played=np.zeros(n, dtype=np.int16),
+        )
+
+    def legal_mask(self, batch: BatchState) -> "np.ndarray":
+        return (batch.board >= np.arange(1, 4)) & ~batch.done[:, None]
+
+    def step(self, batch: BatchState, actions: "np.ndarray") -> BatchState:
+        rows = np.flatnonzero(~batch.done)
+        take = np.asarray(actions)[rows] + 1
+        sticks = batch.board[rows, 0]
+        if ((take < 1) | (take > 3) | (take > sticks)).any():
+            raise ValueError("Illegal move")
+        sticks = sticks - take
+        batch.board[rows, 0] = sticks
+        batch.moves_played[rows] += 1
+        player = batch.to_move[rows]
+        other = np.where(player == X, O, X).astype(np.int8)
+        empty = sticks == 0
+        # player who took the last stick loses
+        batch.winner[rows[empty]] = other[empty]
+        batch.done[rows[empty]] = True
+        batch.to_move[rows[~empty]] = other[~empty]
+        return batch
+
+    def batch_to_state(self, batch: BatchState, i: int) -> State:
+        winner = CODE_PLAYERS.get(int(batch.winner[i]))
+        return State(board=[int(batch.board[i, 0])], to_move=CODE_PLAYERS[int(batch.to_move[i])],
+                     winner=winner, moves_played=int(batch.moves_played[i]), winning_line=None)
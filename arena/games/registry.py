@@ -0,0 +1,229 @@
+"""Game plugin registry.
+
+A game is its metadata file `arena_data/games/<code>.json` plus a Game
+subclass. The class is found, in order, through:
+
+    "module" in the JSON      "package.module:ClassName" (or just the module)
+    an entry point            group "arena.games", name <code>, value "package.module:ClassName"
+    the games package         arena/games/<code>.py
+
+Discovery reads only the JSON files and the entry-point table; a game's
+module is imported the first time the game is looked up, so adding games
+does not slow down startup. When the class is loaded it is validated against
+its metadata (a Game subclass whose `code` matches the JSON). A module that
+holds a single game needs no class name: the Game subclass with the right
+`code` is picked.
+
+GAME_REGISTRY maps codes to classes like a dict:
+
+    GameClass = GAME_REGISTRY["tic_tac_toe"]      # imports arena.games.tic_tac_toe
+    "eleven_sticks" in GAME_REGISTRY              # no import
+
+`python -m arena.games [--check]` lists the games and, with
+--check, loads and validates every one of them.
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import importlib.metadata
+import importlib.util
+import os
+import re
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..logging_config import logger
+from ..filestorage import GAMES_DIR, read_json
+from ..game_base import Game
+
+ENTRY_POINT_GROUP = "arena.games"
+CODE_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+class GamePluginError(RuntimeError):
+    """A registered game whose class cannot be loaded or does not match its metadata."""
+
+
+class GameSpec:
+    """A discovered game: its metadata and where its class lives (not imported yet)."""
+
+    def __init__(self, code: str, meta: Dict[str, Any], target: str, source: str):
+        self.code = code
+        self.meta = meta
+        self.target = target    # "package.module" or "package.module:ClassName"
+        self.source = source    # "metadata", "entry point" or "package"
+        self._cls: Optional[type] = None
+
+    def load(self) -> type:
+        if self._cls is None:
+            module_name, _, class_name = self.target.partition(":")
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as e:
+                raise GamePluginError(f"Game {self.code}: cannot import {module_name}: {e}") from e
+            if class_name:
+                cls = getattr(module, class_name, None)
+            else:
+                found = [c for c in vars(module).values() if isinstance(c, type) and issubclass(c, Game)
+                         and getattr(c, "code", None) == self.code and c.__module__ == module.__name__]
+                cls = found[0] if len(found) == 1 else None
+            self._cls = self._validate(cls)
+            logger.debug("Loaded game {} from {}", self.code, self.target)
+        return self._cls
+
+    def _validate(self, cls: Any) -> type:
+        if not (isinstance(cls, type) and issubclass(cls, Game)):
+            raise GamePluginError(f"Game {self.code}: {self.target} is not a Game subclass "
+                                  f"(or does not hold exactly one with code {self.code!r})")
+        if getattr(cls, "code", None) != self.code:
+            raise GamePluginError(f"Game {self.code}: {cls.__name__}.code is {getattr(cls, 'code', None)!r}")
+        return cls
+
+
+def _valid_meta(file_name: str, meta: Any) -> Optional[str]:
+    """Error message for an unusable game metadata file, or None."""
+    if not isinstance(meta, dict) or not meta:
+        return "not a JSON object"
+    code = meta.get("code")
+    if not isinstance(code, str) or not CODE_PATTERN.match(code):
+        return f"invalid code {code!r}"
+    if file_name != f"{code}.json":
+        return f"code {code!r} does not match the file name"
+    if not isinstance(meta.get("name"), str) or not meta["name"]:
+        return "missing name"
+    if "module" in meta and not isinstance(meta["module"], str):
+        return "module must be a string"
+    return None
+
+
+def _entry_points() -> Dict[str, str]:
+    try:
+        return {ep.name: ep.value for ep in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP)}
+    except Exception as e:
+        logger.error(f"Cannot read {ENTRY_POINT_GROUP} entry points: {e}")
+        return {}
+
+
+def _package_module(code: str) -> Optional[str]:
+    name = f"{__package__}.{code}"
+    try:
+        return name if importlib.util.find_spec(name) is not None else None
+    except (ImportError, ValueError):
+        return None
+
+
+def discover(games_dir: str = GAMES_DIR) -> Dict[str, GameSpec]:
+    """Games with valid metadata and a known class location; imports no game module."""
+    specs: Dict[str, GameSpec] = {}
+    if not os.path.isdir(games_dir):
+        return specs
+    entry_points = None
+    for file_name in sorted(os.listdir(games_dir)):
+        if not file_name.endswith(".json"):
+            continue
+        meta = read_json(os.path.join(games_dir, file_name), None)
+        error = _valid_meta(file_name, meta)
+        if error:
+            logger.error(f"Skipping game metadata {file_name}: {error}")
+            continue
+        code = meta["code"]
+        if meta.get("module"):
+            specs[code] = GameSpec(code, meta, meta["module"], "metadata")
+            continue
+        if entry_points is None:
+            entry_points = _entry_points()
+        if code in entry_points:
+            specs[code] = GameSpec(code, meta, entry_points[code], "entry point")
+            continue
+        module = _package_module(code)
+        if module is None:
+            logger.warning(f"Game {code} has metadata but no implementation; not playable")
+            continue
+        specs[code] = GameSpec(code, meta, module, "package")
+    return specs
+
+
+class GameRegistry(Mapping):
+    """Read-only mapping code -> Game subclass, discovered on first use and
+    importing each game's module on first lookup."""
+
+    def __init__(self, games_dir: str = GAMES_DIR):
+        self.games_dir = games_dir
+        self._specs: Optional[Dict[str, GameSpec]] = None
+        self._lock = threading.RLock()  # a game module may look up another game while it loads
+
+    def specs(self) -> Dict[str, GameSpec]:
+        specs = self._specs
+        if specs is None:
+            with self._lock:
+                if self._specs is None:
+                    self._specs = discover(self.games_dir)
+                    logger.info("Game registry: {} games ({})", len(self._specs), ", ".join(self._specs))
+                specs = self._specs
+        return specs
+
+    def reload(self) -> None:
+        """Discovers the games again; already imported modules stay imported."""
+        with self._lock:
+            self._specs = None
+
+    def __getitem__(self, code: str) -> type:
+        spec = self.specs()[code]
+        if spec._cls is not None:
+            return spec._cls
+        with self._lock:
+            return spec.load()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.specs())
+
+    def __len__(self) -> int:
+        return len(self.specs())
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.specs()
+
+    def metadata(self, code: str) -> Dict[str, Any]:
+        return self.specs()[code].meta
+
+    def loaded(self, code: str) -> Optional[type]:
+        """The class if it is already imported, else None; never imports or reads files."""
+        specs = self._specs
+        spec = specs.get(code) if specs is not None else None
+        return spec._cls if spec is not None else None
+
+    def check(self) -> List[Tuple[str, Optional[str]]]:
+        """Loads every game; returns (code, error or None) pairs."""
+        results = []
+        for code in self:
+            try:
+                self[code]
+                results.append((code, None))
+            except GamePluginError as e:
+                results.append((code, str(e)))
+        return results
+
+
+GAME_REGISTRY = GameRegistry()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="List the registered games.")
+    parser.add_argument("--check", action="store_true", help="import and validate every game")
+    args = parser.parse_args(argv)
+
+    specs = GAME_REGISTRY.specs()
+    errors = dict(GAME_REGISTRY.check()) if args.check else {}
+    for code, spec in specs.items():
+        status = ""
+        if args.check:
+            status = f"  ERROR: {errors[code]}" if errors[code] else "  ok"
+        print(f"{code:<24}{spec.target:<40}{spec.source}{status}")
+    if any(errors.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List, Optional
 from ..game_base import Game
 from ..core import State, Player, Move, render_board
+from ..batch import BatchState, np, require_numpy, NONE, X, O, CODE_PLAYERS, PLAYER_CODES
 
 WIN_LINES = [
     [0,1,2],[3,4,5],[6,7,8],  # rows
@@ -10,12 +11,15 @@ WIN_LINES = [
     [0,4,8],[2,4,6]           # diagonals
 ]
 
+_CELL_CODES = {"": NONE, "X": X, "O": O}
+
 class TicTacToe(Game):
     code = "tic_tac_toe"
     name = "Tic-Tac-Toe"
+    frozen_states = True
 
     def initial_state(self) -> State:
-        return State(board=[""]*9, to_move=Player.X, winner=None, moves_played=0, winning_line=None)
+        return self.make_state([""]*9, Player.X)
 
     def legal_moves(self, state: State, player: Player) -> List[Move]:
         if self.is_terminal(state):
@@ -37,20 +41,21 @@ class TicTacToe(Game):
         return None
 
     def next_state(self, state: State, move: Move, player: Player) -> State:
-        ns = state.copy()
-        if ns.board[move] != "":
+        if state.board[move] != "":
             raise ValueError("Illegal move")
-        ns.board[move] = player.value
-        ns.moves_played += 1
-        w = self._check_winner(ns.board)
-        if w:
-            ns.winner = w
-            ns.winning_line = self._winning_line(ns.board)
-        elif ns.moves_played >= 9:
-            ns.winner = None  # draw
-        else:
-            ns.to_move = player.other
-        return ns
+        board = list(state.board)
+        board[move] = player.value
+        moves_played = state.moves_played + 1
+        line = self._winning_line(board)
+        if line:
+            return self.make_state(board, player, Player(board[line[0]]), moves_played, line)
+        if moves_played >= 9:
+            return self.make_state(board, player, None, moves_played)  # draw
+        return self.make_state(board, player.other, None, moves_played)
+
+    def encode_state(self, state: State) -> bytes:
+        # 9 cells + side to move; the winner follows from the board
+        return bytes([*map(_CELL_CODES.__getitem__, state.board), PLAYER_CODES[state.to_move]])
 
     def is_terminal(self, state: State) -> bool:
         if state.winner is not None:
@@ -64,3 +69,48 @@ class TicTacToe(Game):
 
     def render(self, state: State) -> str:
         return render_board(state.board)
+
+    # ---------- batched simulation ----------
+    # board: (n, 9) int8 of player codes; action = cell index
+    supports_batch = True
+    num_actions = 9
+
+    def initial_states(self, n: int) -> BatchState:
+        require_numpy()
+        return BatchState(
+            board=np.zeros((n, 9), dtype=np.int8),
+            to_move=np.full(n, X, dtype=np.int8),
+            winner=np.zeros(n, dtype=np.int8),
+            done=np.zeros(n, dtype=bool),
+            moves_played=np.zeros(n, dtype=np.int16),
+        )
+
+    def legal_mask(self, batch: BatchState) -> "np.ndarray":
+        return (batch.board == NONE) & ~batch.done[:, None]
+
+    def step(self, batch: BatchState, actions: "np.ndarray") -> BatchState:
+        rows = np.flatnonzero(~batch.done)
+        cells = np.asarray(actions)[rows]
+        if (batch.board[rows, cells] != NONE).any():
+            raise ValueError("Illegal move")
+        player = batch.to_move[rows]
+        batch.board[rows, cells] = player
+        batch.moves_played[rows] += 1
+
+        lines = batch.board[rows][:, _WIN_LINES_ARR]          # (k, 8, 3)
+        won = (lines == player[:, None, None]).all(axis=2).any(axis=1)
+        batch.winner[rows[won]] = player[won]
+        finished = won | (batch.moves_played[rows] >= 9)
+        batch.done[rows[finished]] = True
+        running = rows[~finished]
+        batch.to_move[running] = np.where(batch.to_move[running] == X, O, X)
+        return batch
+
+    def batch_to_state(self, batch: BatchState, i: int) -> State:
+        board = ["" if c == NONE else CODE_PLAYERS[int(c)].value for c in batch.board[i]]
+        winner = CODE_PLAYERS.get(int(batch.winner[i]))
+        return self.make_state(board, CODE_PLAYERS[int(batch.to_move[i])], winner,
+                               int(batch.moves_played[i]), self._winning_line(board) if winner else None)
+
+
+_WIN_LINES_ARR = np.array(WIN_LINES) if np is not None else None
@@ -0,0 +1,145 @@
+"""Bitboard Tic-Tac-Toe for search-heavy bots.
+
+The board is two 9-bit integers (bit i set = cell i taken by X / O). Win
+detection and legal move generation are table lookups precomputed for all
+512 masks, and states are small immutable tuples, so next_state does no list
+copying and no line scanning.
+
+    game = BitboardTicTacToe()
+    bb = game.from_state(state)        # State -> BitBoard
+    ...search on bb with game.legal_moves / game.next_state...
+    game.to_state(bb)                  # BitBoard -> State (lossless)
+"""
+from __future__ import annotations
+from typing import List, NamedTuple, Optional, Tuple
+
+from ..core import State, Player, Move, render_board
+from .tic_tac_toe import TicTacToe, WIN_LINES
+
+FULL_MASK = 0x1FF
+WIN_MASKS: Tuple[int, ...] = tuple(sum(1 << i for i in line) for line in WIN_LINES)
+
+
+def _first_line(mask: int) -> Optional[Tuple[int, ...]]:
+    for line, wm in zip(WIN_LINES, WIN_MASKS):
+        if mask & wm == wm:
+            return tuple(line)
+    return None
+
+
+# mask -> first completed line (in WIN_LINES order) or None
+WIN_LINE_BY_MASK: Tuple[Optional[Tuple[int, ...]], ...] = tuple(_first_line(m) for m in range(FULL_MASK + 1))
+IS_WIN: Tuple[bool, ...] = tuple(line is not None for line in WIN_LINE_BY_MASK)
+# occupied mask -> empty cells in ascending order
+EMPTY_CELLS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(i for i in range(9) if not occ >> i & 1) for occ in range(FULL_MASK + 1)
+)
+POPCOUNT: Tuple[int, ...] = tuple(bin(m).count("1") for m in range(FULL_MASK + 1))
+
+# The 8 symmetries of the board (rotations and reflections) as cell permutations:
+# cell i of the transformed board is cell SYMMETRIES[k][i] of the original.
+_ROTATE = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+_MIRROR = (2, 1, 0, 5, 4, 3, 8, 7, 6)
+
+
+def _compose(p: Tuple[int, ...], q: Tuple[int, ...]) -> Tuple[int, ...]:
+    return tuple(p[q[i]] for i in range(9))
+
+
+def _symmetries() -> List[Tuple[int, ...]]:
+    syms, p = [], tuple(range(9))
+    for _ in range(4):
+        syms += [p, _compose(p, _MIRROR)]
+        p = _compose(p, _ROTATE)
+    return syms
+
+
+SYMMETRIES: List[Tuple[int, ...]] = _symmetries()
+# SYM_MASK[k][mask] = mask transformed by symmetry k
+SYM_MASK: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(sum(1 << i for i in range(9) if m >> perm[i] & 1) for m in range(FULL_MASK + 1))
+    for perm in SYMMETRIES
+)
+
+
+class BitBoard(NamedTuple):
+    x: int
+    o: int
+    to_move: Player
+    winner: Optional[Player] = None
+
+    @property
+    def moves_played(self) -> int:
+        return POPCOUNT[self.x | self.o]
+
+    @property
+    def board(self) -> List[str]:
+        return [("X" if self.x >> i & 1 else "O" if self.o >> i & 1 else "") for i in range(9)]
+
+    @property
+    def winning_line(self) -> Optional[List[int]]:
+        if self.winner is None:
+            return None
+        line = WIN_LINE_BY_MASK[self.x if self.winner == Player.X else self.o]
+        return list(line) if line else None
+
+
+def canonical_key(state: BitBoard) -> Tuple[int, int, Player]:
+    """Key shared by all 8 symmetric variants of a position (for transposition tables)."""
+    x, o = state[0], state[1]
+    return min((t[x], t[o]) for t in SYM_MASK) + (state[2],)
+
+
+_new = tuple.__new__  # skips NamedTuple's Python-level __new__ on the hot path
+_OTHER = {Player.X: Player.O, Player.O: Player.X}
+
+
+class BitboardTicTacToe(TicTacToe):
+    """Same rules as TicTacToe, operating on BitBoard states."""
+
+    def initial_state(self) -> BitBoard:  # type: ignore[override]
+        return BitBoard(0, 0, Player.X)
+
+    def legal_moves(self, state: BitBoard, player: Player) -> List[Move]:  # type: ignore[override]
+        if state.winner is not None:
+            return []
+        return list(EMPTY_CELLS[state.x | state.o])
+
+    def next_state(self, state: BitBoard, move: Move, player: Player) -> BitBoard:  # type: ignore[override]
+        x, o = state[0], state[1]
+        bit = 1 << move
+        if (x | o) & bit:
+            raise ValueError("Illegal move")
+        if player is Player.X:
+            x |= bit
+            mine = x
+        else:
+            o |= bit
+            mine = o
+        if IS_WIN[mine]:
+            return _new(BitBoard, (x, o, player, player))
+        return _new(BitBoard, (x, o, _OTHER[player] if (x | o) != FULL_MASK else player, None))
+
+    def is_terminal(self, state: BitBoard) -> bool:  # type: ignore[override]
+        return state.winner is not None or (state.x | state.o) == FULL_MASK
+
+    def winner(self, state: BitBoard) -> Optional[Player]:  # type: ignore[override]
+        return state.winner
+
+    def render(self, state: BitBoard) -> str:  # type: ignore[override]
+        return render_board(state.board)
+
+    # ---------- conversion ----------
+
+    @staticmethod
+    def from_state(state: State) -> BitBoard:
+        x = o = 0
+        for i, v in enumerate(state.board):
+            if v == "X":
+                x |= 1 << i
+            elif v == "O":
+                o |= 1 << i
+        return BitBoard(x, o, state.to_move, state.winner)
+
+    def to_state(self, bb: BitBoard) -> State:
+        return self.make_state(bb.board, bb.to_move, bb.winner, bb.moves_played, bb.winning_line)
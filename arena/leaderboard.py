@@ -0,0 +1,379 @@
+"""Leaderboard backends.
+
+Both results of a match are applied as one atomic delta. The default backend is
+SQLite in WAL mode (safe with several uvicorn workers writing concurrently);
+`ARENA_LEADERBOARD_BACKEND=json` keeps the legacy leaderboard.json file, now
+updated under an inter-process lock with an atomic rename.
+
+The SQLite store imports an existing leaderboard.json the first time it is
+created, and `python -m arena.leaderboard export` writes it back in the legacy
+JSON format.
+
+Matches are recorded through `record_results`, which also updates the Elo /
+Glicko-2 ratings and head-to-head tables (see arena.ratings) in the same
+commit.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .logging_config import logger, debug_sampled
+from .metrics import STORE_WRITE_SECONDS
+from .core import Player, Result
+from .filestorage import (
+    DATA_DIR, LEADERBOARD_PATH, ensure_dirs, read_json, write_json_atomic, file_lock,
+)
+from .ratings import (
+    MatchResult, Rating, matchup_key, replay, update_head_to_head, update_ratings,
+)
+
+LEADERBOARD_DB = os.path.join(DATA_DIR, "leaderboard.db")
+RATINGS_PATH = os.path.join(DATA_DIR, "ratings.json")  # JSON backend only
+BACKEND = os.environ.get("ARENA_LEADERBOARD_BACKEND", "sqlite")
+
+STAT_KEYS = ("wins", "losses", "draws", "games")
+
+Deltas = Dict[str, Dict[str, int]]  # bot_id -> {"wins", "losses", "draws", "games"}
+
+
+def result_delta(result: str) -> Dict[str, int]:
+    d = {k: 0 for k in STAT_KEYS}
+    if result == Result.WIN.value:
+        d["wins"] = 1
+    elif result == Result.LOSS.value:
+        d["losses"] = 1
+    else:
+        d["draws"] = 1
+    d["games"] = 1
+    return d
+
+
+def match_deltas(bot0: str, bot1: str, winner: str) -> Deltas:
+    """Deltas for one match; `winner` is "X", "O" or "draw" (bot0 plays X)."""
+    if winner == Player.X.value:
+        r0, r1 = Result.WIN.value, Result.LOSS.value
+    elif winner == Player.O.value:
+        r0, r1 = Result.LOSS.value, Result.WIN.value
+    else:
+        r0 = r1 = Result.DRAW.value
+    if bot0 == bot1:  # mirror match: both results go to the same bot
+        d0, d1 = result_delta(r0), result_delta(r1)
+        return {bot0: {k: d0[k] + d1[k] for k in STAT_KEYS}}
+    return {bot0: result_delta(r0), bot1: result_delta(r1)}
+
+
+def results_deltas(results: Iterable[MatchResult]) -> Deltas:
+    total: Deltas = {}
+    for bot0, bot1, winner in results:
+        for bot_id, d in match_deltas(bot0, bot1, winner).items():
+            acc = total.setdefault(bot_id, {k: 0 for k in STAT_KEYS})
+            for k in STAT_KEYS:
+                acc[k] += d[k]
+    return total
+
+
+H2H = Dict[Tuple[str, str], List[int]]
+
+
+class LeaderboardStore(ABC):
+    @abstractmethod
+    def get(self, game_code: str) -> Dict[str, Dict[str, int]]: ...
+    @abstractmethod
+    def get_all(self) -> Dict[str, Dict[str, Dict[str, int]]]: ...
+    @abstractmethod
+    def apply_deltas(self, game_code: str, deltas: Deltas) -> None: ...
+    @abstractmethod
+    def record_results(self, game_code: str, results: List[MatchResult]) -> None:
+        """Applies win/loss counts, ratings and head-to-head for matches in order, atomically."""
+    @abstractmethod
+    def get_ratings(self, game_code: str) -> Dict[str, Rating]: ...
+    @abstractmethod
+    def get_head_to_head(self, game_code: str) -> H2H: ...
+    @abstractmethod
+    def rebuild_ratings(self, game_code: str, results: Iterable[MatchResult]) -> int:
+        """Replaces the game's ratings and head-to-head tables with those replayed
+        from `results` (streamed once); returns the number of matches."""
+
+    def record_match(self, game_code: str, bot0: str, bot1: str, winner: str) -> None:
+        with STORE_WRITE_SECONDS.time(store="leaderboard"):
+            self.record_results(game_code, [(bot0, bot1, winner)])
+
+    def export_json(self, path: str = LEADERBOARD_PATH) -> str:
+        write_json_atomic(path, self.get_all())
+        return path
+
+
+def _counted(results: Iterable[MatchResult], counter: List[int]) -> Iterable[MatchResult]:
+    for r in results:
+        counter[0] += 1
+        yield r
+
+
+class JsonLeaderboardStore(LeaderboardStore):
+    def __init__(self, path: str = LEADERBOARD_PATH, ratings_path: str = RATINGS_PATH):
+        self.path = path
+        self.ratings_path = ratings_path
+        self.lock_path = path + ".lock"
+
+    def get(self, game_code: str) -> Dict[str, Dict[str, int]]:
+        return self.get_all().get(game_code, {})
+
+    def get_all(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        ensure_dirs()
+        return read_json(self.path, {})
+
+    def _apply(self, game_code: str, deltas: Deltas) -> None:
+        lb = read_json(self.path, {})
+        game_lb = lb.setdefault(game_code, {})
+        for bot_id, delta in deltas.items():
+            stats = game_lb.setdefault(bot_id, {k: 0 for k in STAT_KEYS})
+            for k in STAT_KEYS:
+                stats[k] = stats.get(k, 0) + delta.get(k, 0)
+        write_json_atomic(self.path, lb)
+
+    def apply_deltas(self, game_code: str, deltas: Deltas) -> None:
+        ensure_dirs()
+        with file_lock(self.lock_path):
+            self._apply(game_code, deltas)
+        debug_sampled("Leaderboard delta applied: game={}, bots={}", game_code, list(deltas))
+
+    # ratings.json: {game: {"ratings": {bot: Rating fields}, "head_to_head": [[a, b, wins_a, wins_b, draws]]}}
+
+    def _load_ratings(self, data: Dict, game_code: str) -> Tuple[Dict[str, Rating], H2H]:
+        entry = data.get(game_code, {})
+        ratings = {bot: Rating(**r) for bot, r in entry.get("ratings", {}).items()}
+        h2h = {(a, b): [wa, wb, d] for a, b, wa, wb, d in entry.get("head_to_head", [])}
+        return ratings, h2h
+
+    @staticmethod
+    def _dump_ratings(data: Dict, game_code: str, ratings: Dict[str, Rating], h2h: H2H) -> None:
+        data[game_code] = {
+            "ratings": {bot: vars(r) for bot, r in ratings.items()},
+            "head_to_head": [[a, b, *row] for (a, b), row in sorted(h2h.items())],
+        }
+
+    def record_results(self, game_code: str, results: List[MatchResult]) -> None:
+        ensure_dirs()
+        with file_lock(self.lock_path):
+            data = read_json(self.ratings_path, {})
+            ratings, h2h = self._load_ratings(data, game_code)
+            for bot0, bot1, winner in results:
+                update_ratings(ratings, bot0, bot1, winner)
+                update_head_to_head(h2h, bot0, bot1, winner)
+            self._dump_ratings(data, game_code, ratings, h2h)
+            # ratings first: a crash in between leaves counts behind, never double-counted ratings
+            write_json_atomic(self.ratings_path, data)
+            self._apply(game_code, results_deltas(results))
+        debug_sampled("Recorded {} match(es): game={}", len(results), game_code)
+
+    def get_ratings(self, game_code: str) -> Dict[str, Rating]:
+        return self._load_ratings(read_json(self.ratings_path, {}), game_code)[0]
+
+    def get_head_to_head(self, game_code: str) -> H2H:
+        return self._load_ratings(read_json(self.ratings_path, {}), game_code)[1]
+
+    def rebuild_ratings(self, game_code: str, results: Iterable[MatchResult]) -> int:
+        counter = [0]
+        ratings, h2h = replay(_counted(results, counter))
+        ensure_dirs()
+        with file_lock(self.lock_path):
+            data = read_json(self.ratings_path, {})
+            self._dump_ratings(data, game_code, ratings, h2h)
+            write_json_atomic(self.ratings_path, data)
+        return counter[0]
+
+    def export_json(self, path: str = LEADERBOARD_PATH) -> str:
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            return path
+        return super().export_json(path)
+
+
+class SQLiteLeaderboardStore(LeaderboardStore):
+    def __init__(self, path: str = LEADERBOARD_DB, import_from: Optional[str] = LEADERBOARD_PATH):
+        self.path = path
+        self._local = threading.local()
+        ensure_dirs()
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stats ("
+                " game TEXT NOT NULL, bot TEXT NOT NULL,"
+                " wins INTEGER NOT NULL DEFAULT 0, losses INTEGER NOT NULL DEFAULT 0,"
+                " draws INTEGER NOT NULL DEFAULT 0, games INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (game, bot))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ratings ("
+                " game TEXT NOT NULL, bot TEXT NOT NULL,"
+                " elo REAL NOT NULL, rating REAL NOT NULL, rd REAL NOT NULL, volatility REAL NOT NULL,"
+                " games INTEGER NOT NULL, PRIMARY KEY (game, bot))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS head_to_head ("
+                " game TEXT NOT NULL, bot_a TEXT NOT NULL, bot_b TEXT NOT NULL,"
+                " wins_a INTEGER NOT NULL, wins_b INTEGER NOT NULL, draws INTEGER NOT NULL,"
+                " PRIMARY KEY (game, bot_a, bot_b))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            imported = conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone()
+            if not imported:
+                if import_from and os.path.exists(import_from):
+                    for game_code, game_lb in read_json(import_from, {}).items():
+                        self._apply(conn, game_code, game_lb)
+                    logger.info(f"Imported {import_from} into {self.path}")
+                conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', '1')")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread (and per process, connections must not cross a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    class _transaction:
+        def __init__(self, conn: sqlite3.Connection):
+            self.conn = conn
+
+        def __enter__(self) -> sqlite3.Connection:
+            # IMMEDIATE takes the write lock up front, so concurrent writers queue
+            # on busy_timeout instead of failing on lock upgrade
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb) -> None:
+            self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, game_code: str, deltas: Deltas) -> None:
+        conn.executemany(
+            "INSERT INTO stats (game, bot, wins, losses, draws, games) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (game, bot) DO UPDATE SET "
+            " wins = wins + excluded.wins, losses = losses + excluded.losses,"
+            " draws = draws + excluded.draws, games = games + excluded.games",
+            [(game_code, bot_id, *(int(d.get(k, 0)) for k in STAT_KEYS)) for bot_id, d in deltas.items()],
+        )
+
+    def apply_deltas(self, game_code: str, deltas: Deltas) -> None:
+        conn = self._conn()
+        with self._transaction(conn):
+            self._apply(conn, game_code, deltas)
+        debug_sampled("Leaderboard delta applied: game={}, bots={}", game_code, list(deltas))
+
+    @staticmethod
+    def _save_ratings(conn: sqlite3.Connection, game_code: str, ratings: Dict[str, Rating], h2h: H2H) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO ratings (game, bot, elo, rating, rd, volatility, games) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(game_code, bot, r.elo, r.rating, r.rd, r.volatility, r.games) for bot, r in ratings.items()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO head_to_head (game, bot_a, bot_b, wins_a, wins_b, draws) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(game_code, a, b, *row) for (a, b), row in h2h.items()],
+        )
+
+    def record_results(self, game_code: str, results: List[MatchResult]) -> None:
+        bots = sorted({b for r in results for b in r[:2]})
+        pairs = {matchup_key(r[0], r[1]) for r in results if r[0] != r[1]}
+        conn = self._conn()
+        with self._transaction(conn):
+            # only the rows of the bots involved are read and written
+            marks = ",".join("?" * len(bots))
+            ratings = {
+                row[0]: Rating(*row[1:]) for row in conn.execute(
+                    f"SELECT bot, elo, rating, rd, volatility, games FROM ratings WHERE game = ? AND bot IN ({marks})",
+                    (game_code, *bots),
+                )
+            }
+            h2h: H2H = {}
+            for a, b in pairs:
+                row = conn.execute(
+                    "SELECT wins_a, wins_b, draws FROM head_to_head WHERE game = ? AND bot_a = ? AND bot_b = ?",
+                    (game_code, a, b),
+                ).fetchone()
+                h2h[(a, b)] = list(row) if row else [0, 0, 0]
+            for bot0, bot1, winner in results:
+                update_ratings(ratings, bot0, bot1, winner)
+                update_head_to_head(h2h, bot0, bot1, winner)
+            self._save_ratings(conn, game_code, ratings, h2h)
+            self._apply(conn, game_code, results_deltas(results))
+        debug_sampled("Recorded {} match(es): game={}", len(results), game_code)
+
+    def get_ratings(self, game_code: str) -> Dict[str, Rating]:
+        rows = self._conn().execute(
+            "SELECT bot, elo, rating, rd, volatility, games FROM ratings WHERE game = ?", (game_code,)
+        )
+        return {r[0]: Rating(*r[1:]) for r in rows}
+
+    def get_head_to_head(self, game_code: str) -> H2H:
+        rows = self._conn().execute(
+            "SELECT bot_a, bot_b, wins_a, wins_b, draws FROM head_to_head WHERE game = ?", (game_code,)
+        )
+        return {(r[0], r[1]): list(r[2:]) for r in rows}
+
+    def rebuild_ratings(self, game_code: str, results: Iterable[MatchResult]) -> int:
+        counter = [0]
+        ratings, h2h = replay(_counted(results, counter))
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute("DELETE FROM ratings WHERE game = ?", (game_code,))
+            conn.execute("DELETE FROM head_to_head WHERE game = ?", (game_code,))
+            self._save_ratings(conn, game_code, ratings, h2h)
+        return counter[0]
+
+    def get(self, game_code: str) -> Dict[str, Dict[str, int]]:
+        rows = self._conn().execute(
+            "SELECT bot, wins, losses, draws, games FROM stats WHERE game = ? ORDER BY rowid", (game_code,)
+        )
+        return {r[0]: dict(zip(STAT_KEYS, r[1:])) for r in rows}
+
+    def get_all(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        out: Dict[str, Dict[str, Dict[str, int]]] = {}
+        rows = self._conn().execute("SELECT game, bot, wins, losses, draws, games FROM stats ORDER BY rowid")
+        for r in rows:
+            out.setdefault(r[0], {})[r[1]] = dict(zip(STAT_KEYS, r[2:]))
+        return out
+
+
+_STORE: Optional[LeaderboardStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> LeaderboardStore:
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                if BACKEND == "json":
+                    _STORE = JsonLeaderboardStore()
+                elif BACKEND == "sqlite":
+                    _STORE = SQLiteLeaderboardStore()
+                else:
+                    raise RuntimeError(f"Unknown leaderboard backend: {BACKEND}")
+                logger.info(f"Leaderboard backend: {BACKEND}")
+    return _STORE
+
+
+def record_match(game_code: str, bot0: str, bot1: str, winner: str) -> None:
+    get_store().record_match(game_code, bot0, bot1, winner)
+
+
+def main(argv: Optional[list] = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if args[:1] != ["export"]:
+        print("usage: python -m arena.leaderboard export [path]")
+        sys.exit(2)
+    path = get_store().export_json(*args[1:2])
+    print(f"Leaderboard exported to {path}")
+
+
+if __name__ == "__main__":
+    main()
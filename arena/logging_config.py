@@ -1,36 +1,176 @@
+import os
+import queue
 import sys
+import threading
+import weakref
 from pathlib import Path
+from typing import Any, Dict, Optional
 from loguru import logger
 
 # Pasta de logs
 LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
-# Remove qualquer configuração default
-logger.remove()
-
-# Console colorido
-logger.add(
-    sys.stderr,
-    colorize=True,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-           "<level>{level: <8}</level> | "
-           "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-           "<level>{message}</level>",
-    level="DEBUG"  # pode trocar para INFO em produção
-)
+# Perfis de logging (ARENA_LOG_PROFILE):
+#   dev  -> DEBUG, console colorido e síncrono, arquivo
+#   prod -> INFO, JSON no console (uma linha por registro) escrito por uma thread de fundo,
+#           sem arquivo (o coletor lê o stderr), debug amostrado nos caminhos quentes
+# Cada opção pode ser sobrescrita: ARENA_LOG_LEVEL, ARENA_LOG_JSON, ARENA_LOG_ENQUEUE
+# (console via thread de fundo), ARENA_LOG_FILE (0/1), ARENA_LOG_SAMPLE (1 a cada N debugs amostrados).
+# O enqueue=True do loguru não é usado no console: ele serializa cada registro para uma fila
+# entre processos e custa mais que a própria escrita.
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "dev": {"level": "DEBUG", "json": False, "enqueue": False, "file": True, "sample": 1},
+    "prod": {"level": "INFO", "json": True, "enqueue": True, "file": False, "sample": 100},
+}
 
-# Arquivo com rotação
-logger.add(
-    LOG_DIR / "arena.log",
-    rotation="1 MB",
-    retention="7 days",
-    compression="zip",
-    level="DEBUG",
-    enqueue=True  # seguro para multiprocessos
+_CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
 )
 
-logger.info("Logger initialized")
+_settings: Dict[str, Any] = {}
+_debug_enabled = True
+_sample_every = 1
+_sample_counts: Dict[str, int] = {}
+_sample_lock = threading.Lock()
+
+
+class _BackgroundWriter:
+    """Sink que não bloqueia: as linhas já formatadas vão para uma fila e uma thread escreve."""
+
+    def __init__(self, stream: Any):
+        self._stream = stream
+        self._stopped = False
+        self._start()
+        _WRITERS.add(self)
+
+    def _start(self) -> None:
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="arena-log-writer")
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        # o filho herda o sink mas não a thread: sem isto os logs do filho ficam presos na fila.
+        # As linhas que já estavam na fila são escritas pelo pai, por isso a fila é nova.
+        if not self._stopped:
+            self._start()
+
+    def write(self, message: str) -> None:
+        self._queue.put(message)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                message = self._queue.get()
+                if message is None:
+                    break
+                self._stream.write(message)
+                if self._queue.empty():
+                    self._stream.flush()
+            self._stream.flush()
+        except (ValueError, OSError):
+            pass  # stream fechado (fim do processo, captura de testes): não há onde escrever
+
+    def stop(self) -> None:
+        # chamado pelo loguru em logger.remove() (e na saída do processo): esvazia a fila
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+_WRITERS: "weakref.WeakSet[_BackgroundWriter]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    global _sample_lock
+    _sample_lock = threading.Lock()  # pode ter sido copiado travado por outra thread
+    for writer in list(_WRITERS):
+        writer._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def settings_from_env(profile: Optional[str] = None) -> Dict[str, Any]:
+    profile = profile or os.environ.get("ARENA_LOG_PROFILE", "dev")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown log profile {profile!r}, expected one of {sorted(PROFILES)}")
+    s = dict(PROFILES[profile], profile=profile)
+    s["level"] = os.environ.get("ARENA_LOG_LEVEL", s["level"]).upper()
+    s["json"] = _env_flag("ARENA_LOG_JSON", s["json"])
+    s["enqueue"] = _env_flag("ARENA_LOG_ENQUEUE", s["enqueue"])
+    s["file"] = _env_flag("ARENA_LOG_FILE", s["file"])
+    s["sample"] = max(1, int(os.environ.get("ARENA_LOG_SAMPLE", s["sample"])))
+    return s
+
+
+def configure(profile: Optional[str] = None, sink: Any = None, **overrides: Any) -> Dict[str, Any]:
+    """(Re)configura os sinks. `sink` substitui stderr e `log_file` o arquivo (usados nos benchmarks)."""
+    global _debug_enabled, _sample_every
+    s = settings_from_env(profile)
+    s.update(overrides)
+
+    # Remove qualquer configuração anterior (e esvazia as filas dos sinks com enqueue)
+    logger.remove()
+
+    stream = sys.stderr if sink is None else sink
+    console = _BackgroundWriter(stream) if s["enqueue"] else stream
+    if s["json"]:
+        logger.add(console, serialize=True, level=s["level"])
+    else:
+        # Console colorido
+        logger.add(console, colorize=sink is None, format=_CONSOLE_FORMAT, level=s["level"])
+
+    if s["file"]:
+        # Arquivo com rotação
+        logger.add(
+            s.get("log_file") or LOG_DIR / "arena.log",
+            rotation="1 MB",
+            retention="7 days",
+            compression="zip",
+            level=s["level"],
+            serialize=s["json"],
+            enqueue=True  # seguro para multiprocessos
+        )
+
+    _debug_enabled = logger.level(s["level"]).no <= logger.level("DEBUG").no
+    _sample_every = s["sample"]
+    _settings.clear()
+    _settings.update(s)
+    return s
+
+
+def debug_enabled() -> bool:
+    return _debug_enabled
+
+
+def debug_sampled(message: str, *args: Any, **kwargs: Any) -> None:
+    """DEBUG para caminhos quentes: com ARENA_LOG_SAMPLE=N registra 1 a cada N chamadas
+    por mensagem. Use mensagens no estilo {} (formatadas só quando registradas)."""
+    if not _debug_enabled:
+        return
+    if _sample_every > 1:
+        with _sample_lock:
+            n = _sample_counts.get(message, 0)
+            _sample_counts[message] = n + 1
+        if n % _sample_every:
+            return
+    logger.opt(depth=1).debug(message, *args, **kwargs)
+
+
+configure()
+logger.info("Logger initialized (profile={}, level={})", _settings["profile"], _settings["level"])
 
 # Exporta o logger pronto
-__all__ = ["logger"]
+__all__ = ["logger", "configure", "debug_enabled", "debug_sampled"]
@@ -0,0 +1,106 @@
+"""Bounded executor that keeps blocking match work off the event loop.
+
+At most `max_workers` matches run at once and at most `queue_depth` more wait
+for a worker; anything beyond that is rejected immediately with Saturated so
+the API can answer 503 + Retry-After instead of piling up requests.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+MAX_CONCURRENT_MATCHES = int(os.environ.get("ARENA_MAX_CONCURRENT_MATCHES", str(os.cpu_count() or 4)))
+MATCH_QUEUE_DEPTH = int(os.environ.get("ARENA_MATCH_QUEUE_DEPTH", "32"))
+
+
+class Saturated(Exception):
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Match executor saturated")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers: int = MAX_CONCURRENT_MATCHES, queue_depth: int = MATCH_QUEUE_DEPTH):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="arena-match")
+        # released from pool threads when a job finishes, hence the lock
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_depth
+
+    def retry_after(self) -> int:
+        # rough estimate: one second per full round of queued matches
+        return max(1, self.pending // max(1, self.max_workers))
+
+    def acquire(self) -> None:
+        """Reserves capacity for one match (raises Saturated when full).
+        Must be paired with release()."""
+        with self._lock:
+            if self.pending >= self.capacity:
+                raise Saturated(self.retry_after())
+            self.pending += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs fn(*args) in the pool inside an already reserved slot."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs fn(*args) in its own slot. The slot is freed when the job is done,
+        not when the caller stops waiting: a cancelled request (client gone)
+        keeps counting until its thread has actually finished the match."""
+        self.acquire()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self.release()
+            raise
+        future.add_done_callback(lambda _: self.release())
+        return await asyncio.wrap_future(future)
+
+    def reserve(self) -> "Reservation":
+        """A slot for a job made of several pool calls (a streamed match); raises
+        Saturated when full. Close the reservation when done."""
+        self.acquire()
+        return Reservation(self)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class Reservation:
+    """One reserved slot. close() may be called any number of times, from any
+    thread; the slot is freed once, after the last pool call it started returns."""
+
+    def __init__(self, executor: BoundedExecutor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._last: Any = None
+        self.closed = False
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.closed:
+            raise RuntimeError("Reservation already closed")
+        future = self._executor._pool.submit(fn, *args)
+        self._last = future
+        return await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        last = self._last
+        if last is None:
+            self._executor.release()
+        else:
+            last.add_done_callback(lambda _: self._executor.release())
@@ -0,0 +1,169 @@
+"""SQLite secondary index over the match log (`match_log/index.db`).
+
+One row per match with its summary fields, indexed on game, bot0, bot1,
+winner and time, so history queries touch only the matching rows instead
+of scanning segments. The match log stays the source of truth: rows are
+added as matches are appended, a `position` (segment, byte offset) records
+how far the log has been indexed so a stale index catches up from there,
+and the whole index can be rebuilt from the raw segments
+(`python -m arena.matchstore reindex`).
+
+Query results are ordered by append sequence and paginated with an opaque
+cursor (the sequence number of the last row returned).
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+SUMMARY_FIELDS = ("id", "ts", "game", "bot0", "bot1", "winner", "n_moves")
+RESULTS = ("win", "loss", "draw")
+MAX_LIMIT = 500
+
+IndexRow = Tuple[str, float, Optional[str], Optional[str], Optional[str], Optional[str], int, Optional[str]]
+
+
+def index_row(match_id: str, record: Dict[str, Any]) -> IndexRow:
+    moves = record.get("moves")
+    return (match_id, record["ts"], record.get("game"), record.get("bot0"), record.get("bot1"),
+            record.get("winner"), len(moves) if isinstance(moves, list) else 0, record.get("legacy_file"))
+
+
+class MatchIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, ts REAL NOT NULL,"
+                " game TEXT, bot0 TEXT, bot1 TEXT, winner TEXT, n_moves INTEGER NOT NULL, legacy_file TEXT)"
+            )
+            # every index also holds the rowid (seq), so equality lookups come out in append order
+            for cols in ("game", "bot0", "bot1", "winner", "ts",
+                         "bot0, bot1", "bot0, winner", "bot1, winner"):
+                name = "matches_" + cols.replace(", ", "_")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON matches ({cols})")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ---------- writing ----------
+
+    def position(self) -> Tuple[int, int]:
+        """(segment, byte offset) up to which the match log has been indexed."""
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'position'").fetchone()
+        if row is None:
+            return 1, 0
+        seg, off = row[0].split(":")
+        return int(seg), int(off)
+
+    def add(self, rows: Sequence[IndexRow], position: Tuple[int, int]) -> None:
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.executemany(
+                "INSERT OR IGNORE INTO matches (id, ts, game, bot0, bot1, winner, n_moves, legacy_file)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows,
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('position', ?)",
+                         (f"{position[0]}:{position[1]}",))
+
+    def reset(self) -> None:
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute("DELETE FROM matches")
+            conn.execute("DELETE FROM meta WHERE key = 'position'")
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    # ---------- queries ----------
+
+    def query(self, game: Optional[str] = None, bot: Optional[str] = None, opponent: Optional[str] = None,
+              result: Optional[str] = None, bot0: Optional[str] = None, bot1: Optional[str] = None,
+              winner: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+              cursor: Optional[str] = None, limit: int = 50, order: str = "desc",
+              ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Summary rows matching every given filter, plus the cursor of the next
+        page (None on the last one). `bot` matches either side; `opponent` and
+        `result` ("win"/"loss"/"draw") are relative to `bot`."""
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        if (opponent or result) and not bot:
+            raise ValueError("opponent and result need bot")
+        if result is not None and result not in RESULTS:
+            raise ValueError(f"result must be one of {', '.join(RESULTS)}")
+
+        where: List[str] = []
+        params: List[Any] = []
+        for col, value in (("game", game), ("bot0", bot0), ("bot1", bot1), ("winner", winner)):
+            if value is not None:
+                where.append(f"{col} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+        if cursor is not None:
+            try:
+                seq = int(cursor)
+            except ValueError:
+                raise ValueError("invalid cursor") from None
+            where.append("seq < ?" if order == "desc" else "seq > ?")
+            params.append(seq)
+
+        direction = "DESC" if order == "desc" else "ASC"
+        cols = "seq, " + ", ".join(SUMMARY_FIELDS)
+        if bot is None:
+            sql = (f"SELECT {cols} FROM matches {_where(where)} ORDER BY seq {direction} LIMIT ?")
+            args = [*params, limit + 1]
+        else:
+            # one index scan per side, each stopping after a page, merged
+            parts, args = [], []
+            for side, other, win_mark, loss_mark in (("bot0", "bot1", "X", "O"), ("bot1", "bot0", "O", "X")):
+                side_where, side_params = [f"{side} = ?"], [bot]
+                if opponent is not None:
+                    side_where.append(f"{other} = ?")
+                    side_params.append(opponent)
+                if result is not None:
+                    side_where.append("winner = ?")
+                    side_params.append({"win": win_mark, "loss": loss_mark, "draw": "draw"}[result])
+                parts.append(f"SELECT * FROM (SELECT {cols} FROM matches {_where(side_where + where)}"
+                             f" ORDER BY seq {direction} LIMIT ?)")
+                args += [*side_params, *params, limit + 1]
+            sql = f"{' UNION '.join(parts)} ORDER BY seq {direction} LIMIT ?"
+            args.append(limit + 1)
+
+        rows = self._conn().execute(sql, args).fetchall()
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return [dict(zip(SUMMARY_FIELDS, r[1:])) for r in rows[:limit]], next_cursor
+
+
+def _where(conditions: List[str]) -> str:
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
@@ -0,0 +1,379 @@
+"""Append-only match log.
+
+Matches are stored as compact JSON lines in size-bounded segment files
+(`arena_data/match_log/segment_000001.jsonl`, ...). Every segment has an index
+file (`.idx`, one JSON line per match with its summary fields and byte offset)
+and, once it is sealed, a summary file (`.sum.json`: time range, games and
+bots seen) so readers can skip whole segments without opening them.
+
+A match id is "<segment>:<offset>", which is enough to read a single record
+back with one seek.
+
+The legacy one-file-per-match layout of `arena_data/matches/` can be imported
+and exported:
+    python -m arena.matchstore import-legacy [dir]
+    python -m arena.matchstore export-legacy DIR [--game tic_tac_toe]
+"""
+from __future__ import annotations
+import argparse
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .logging_config import logger
+from .metrics import STORE_WRITE_SECONDS
+from .filestorage import DATA_DIR, MATCHES_DIR, read_json, write_json, write_json_atomic, file_lock
+from .matchindex import IndexRow, MatchIndex, index_row
+
+MATCH_LOG_DIR = os.path.join(DATA_DIR, "match_log")
+SEGMENT_MAX_BYTES = int(os.environ.get("ARENA_SEGMENT_MAX_BYTES", str(8 * 1024 * 1024)))
+
+INDEX_FIELDS = ("game", "bot0", "bot1", "winner")
+_SEGMENT_RE = re.compile(r"^segment_(\d{6})\.jsonl$")
+_LEGACY_RE = re.compile(r"^(?P<game>.+)_(?P<ts>\d{8}_\d{6}_\d{6})\.json$")
+_LEGACY_TS_FORMAT = "%Y%m%d_%H%M%S_%f"
+
+
+def _dumps(obj: Any) -> bytes:
+    return (json.dumps(obj, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _matches_filters(entry: Dict[str, Any], game: Optional[str], bot: Optional[str],
+                     bot0: Optional[str], bot1: Optional[str],
+                     since: Optional[float], until: Optional[float]) -> bool:
+    if game is not None and entry["game"] != game:
+        return False
+    if bot0 is not None and entry["bot0"] != bot0:
+        return False
+    if bot1 is not None and entry["bot1"] != bot1:
+        return False
+    if bot is not None and bot not in (entry["bot0"], entry["bot1"]):
+        return False
+    if since is not None and entry["ts"] < since:
+        return False
+    if until is not None and entry["ts"] >= until:
+        return False
+    return True
+
+
+class MatchStore:
+    def __init__(self, root: str = MATCH_LOG_DIR, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.lock_path = os.path.join(root, "append.lock")
+        self._index: Optional[MatchIndex] = None
+        self._index_lock = threading.Lock()
+
+    # ---------- paths ----------
+
+    def _path(self, seg: int, ext: str) -> str:
+        return os.path.join(self.root, f"segment_{seg:06d}{ext}")
+
+    def segments(self) -> List[int]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(m.group(1)) for m in map(_SEGMENT_RE.match, os.listdir(self.root)) if m)
+
+    # ---------- writing ----------
+
+    def append(self, payload: Dict[str, Any]) -> str:
+        with STORE_WRITE_SECONDS.time(store="match_log"):
+            return self.append_many([payload])[0]
+
+    def append_many(self, payloads: List[Dict[str, Any]]) -> List[str]:
+        """Appends matches (in order) under the store's inter-process lock and
+        returns their ids. A payload without "ts" is stamped with the current time."""
+        os.makedirs(self.root, exist_ok=True)
+        index = self.index  # opened (and caught up) before taking the lock it needs
+        ids: List[str] = []
+        rows: List[IndexRow] = []
+        with file_lock(self.lock_path):
+            segs = self.segments()
+            seg = segs[-1] if segs else 1
+            data = open(self._path(seg, ".jsonl"), "ab")
+            idx = open(self._path(seg, ".idx"), "ab")
+            try:
+                for payload in payloads:
+                    record = dict(payload)
+                    record.setdefault("ts", time.time())
+                    line = _dumps(record)
+                    offset = data.tell()
+                    if offset and offset + len(line) > self.segment_max_bytes:
+                        data.close()
+                        idx.close()
+                        self._seal(seg)
+                        seg += 1
+                        data = open(self._path(seg, ".jsonl"), "ab")
+                        idx = open(self._path(seg, ".idx"), "ab")
+                        offset = 0
+                    data.write(line)
+                    match_id = f"{seg}:{offset}"
+                    entry = {"id": match_id, "ts": record["ts"], "off": offset, "len": len(line)}
+                    entry.update({k: record.get(k) for k in INDEX_FIELDS})
+                    if "legacy_file" in record:
+                        entry["legacy_file"] = record["legacy_file"]
+                    idx.write(_dumps(entry))
+                    ids.append(match_id)
+                    rows.append(index_row(match_id, record))
+                position = (seg, data.tell())
+            finally:
+                data.close()
+                idx.close()
+            # still under the lock, so the indexed position only moves forward;
+            # a failure here is repaired by the next catch-up
+            try:
+                index.add(rows, position)
+            except sqlite3.Error as e:
+                logger.warning("Match index update failed: {}", e)
+        return ids
+
+    def _seal(self, seg: int) -> None:
+        entries = list(self._read_index(seg))
+        summary = {
+            "segment": seg,
+            "count": len(entries),
+            "min_ts": min((e["ts"] for e in entries), default=None),
+            "max_ts": max((e["ts"] for e in entries), default=None),
+            "games": sorted({e["game"] for e in entries if e.get("game")}),
+            "bots": sorted({b for e in entries for b in (e.get("bot0"), e.get("bot1")) if b}),
+        }
+        write_json_atomic(self._path(seg, ".sum.json"), summary)
+        logger.info(f"Sealed match log segment {seg} ({len(entries)} matches)")
+
+    # ---------- reading ----------
+
+    def _read_index(self, seg: int) -> Iterator[Dict[str, Any]]:
+        path = self._path(seg, ".idx")
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.endswith(b"\n"):  # a torn last line is a write in progress
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # one bad line must not make the whole store unreadable
+                        logger.warning("Skipping corrupt match index line in segment {} at byte {}", seg, offset)
+                    else:
+                        yield entry
+                offset += len(line)
+
+    def _may_contain(self, seg: int, game: Optional[str], bots: List[str],
+                     since: Optional[float], until: Optional[float]) -> bool:
+        summary_path = self._path(seg, ".sum.json")
+        if not os.path.exists(summary_path):
+            return True  # open segment
+        s = read_json(summary_path, None)
+        if s is None:
+            return True
+        if not s.get("count"):
+            return False
+        if game is not None and game not in s["games"]:
+            return False
+        if any(b not in s["bots"] for b in bots):
+            return False
+        if since is not None and s["max_ts"] < since:
+            return False
+        if until is not None and s["min_ts"] >= until:
+            return False
+        return True
+
+    def iter_index(self, game: Optional[str] = None, bot: Optional[str] = None,
+                   bot0: Optional[str] = None, bot1: Optional[str] = None,
+                   since: Optional[float] = None, until: Optional[float] = None,
+                   from_segment: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yields index entries (summary fields + location) in append order.
+        `bot` matches either side; `since`/`until` are epoch seconds [since, until);
+        `from_segment` skips the segments before it."""
+        wanted_bots = [b for b in (bot, bot0, bot1) if b]
+        for seg in self.segments():
+            if from_segment is not None and seg < from_segment:
+                continue
+            if not self._may_contain(seg, game, wanted_bots, since, until):
+                continue
+            for entry in self._read_index(seg):
+                if _matches_filters(entry, game, bot, bot0, bot1, since, until):
+                    yield entry
+
+    def iter_matches(self, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Full match records for the index entries selected by `filters`."""
+        handles: Dict[int, Any] = {}
+        try:
+            for entry in self.iter_index(**filters):
+                seg = int(entry["id"].split(":")[0])
+                f = handles.get(seg)
+                if f is None:
+                    f = handles[seg] = open(self._path(seg, ".jsonl"), "rb")
+                f.seek(entry["off"])
+                record = json.loads(f.read(entry["len"]))
+                record["id"] = entry["id"]
+                yield record
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def read(self, match_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            seg_s, off_s = match_id.split(":")
+            seg, offset = int(seg_s), int(off_s)
+            with open(self._path(seg, ".jsonl"), "rb") as f:
+                f.seek(offset)
+                record = json.loads(f.readline())
+        except (ValueError, OSError):
+            return None
+        record["id"] = match_id
+        return record
+
+    # ---------- secondary index ----------
+
+    @property
+    def index(self) -> MatchIndex:
+        """The SQLite index, opened (and caught up with the log) on first use."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    os.makedirs(self.root, exist_ok=True)
+                    index = MatchIndex(os.path.join(self.root, "index.db"))
+                    self._sync_index(index)
+                    self._index = index
+        return self._index
+
+    def _sync_index(self, index: MatchIndex, batch: int = 5000) -> int:
+        """Indexes the raw segments from the index's recorded position on."""
+        added = 0
+        with file_lock(self.lock_path):
+            start_seg, start_off = index.position()
+            for seg in self.segments():
+                if seg < start_seg:
+                    continue
+                pos = start_off if seg == start_seg else 0
+                rows: List[IndexRow] = []
+                with open(self._path(seg, ".jsonl"), "rb") as f:
+                    f.seek(pos)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            rows.append(index_row(f"{seg}:{pos}", json.loads(line)))
+                        except (ValueError, KeyError):
+                            logger.warning("Skipping unreadable match record {}:{}", seg, pos)
+                        pos += len(line)
+                        if len(rows) >= batch:
+                            index.add(rows, (seg, pos))
+                            added += len(rows)
+                            rows = []
+                index.add(rows, (seg, pos))
+                added += len(rows)
+        if added:
+            logger.info(f"Indexed {added} matches into {index.path}")
+        return added
+
+    def rebuild_index(self) -> int:
+        index = self.index
+        index.reset()
+        return self._sync_index(index)
+
+    def query(self, full: bool = False, **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Index query (see MatchIndex.query); `full` adds each match's complete record."""
+        rows, cursor = self.index.query(**filters)
+        if full:
+            rows = [{**row, **(self.read(row["id"]) or {})} for row in rows]
+        return rows, cursor
+
+    # ---------- legacy per-file format ----------
+
+    def legacy_files_imported(self) -> Set[str]:
+        return {e["legacy_file"] for seg in self.segments() for e in self._read_index(seg) if "legacy_file" in e}
+
+    def import_legacy(self, src_dir: str = MATCHES_DIR) -> int:
+        pending = list(legacy_records(src_dir, skip=self.legacy_files_imported()))
+        pending.sort(key=lambda p: p["ts"])
+        for i in range(0, len(pending), 1000):
+            self.append_many(pending[i:i + 1000])
+        logger.info(f"Imported {len(pending)} legacy match files from {src_dir}")
+        return len(pending)
+
+    def export_legacy(self, dst_dir: str, **filters: Any) -> int:
+        os.makedirs(dst_dir, exist_ok=True)
+        n = 0
+        for record in self.iter_matches(**filters):
+            ts = datetime.datetime.fromtimestamp(record["ts"]).strftime(_LEGACY_TS_FORMAT)
+            name = record.get("legacy_file") or f"{record.get('game', 'game')}_{ts}.json"
+            payload = {k: v for k, v in record.items() if k not in ("id", "ts", "legacy_file")}
+            write_json(os.path.join(dst_dir, name), payload)
+            n += 1
+        return n
+
+
+def legacy_records(src_dir: str = MATCHES_DIR, skip: Iterable[str] = ()) -> Iterator[Dict[str, Any]]:
+    """Match records (with "ts" and "legacy_file") for the per-file logs in
+    `src_dir`, except the file names in `skip`."""
+    if not os.path.isdir(src_dir):
+        return
+    skip = set(skip)
+    for name in sorted(os.listdir(src_dir)):
+        m = _LEGACY_RE.match(name)
+        if not m or name in skip:
+            continue
+        payload = read_json(os.path.join(src_dir, name), None)
+        if not payload:
+            continue
+        ts = datetime.datetime.strptime(m.group("ts"), _LEGACY_TS_FORMAT).timestamp()
+        yield {**payload, "ts": payload.get("ts", ts), "legacy_file": name}
+
+
+def parse_time(value: str) -> float:
+    """Epoch seconds, or an ISO 8601 date/time (local time if naive)."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"expected epoch seconds or an ISO 8601 time, got {value!r}") from None
+
+
+_STORE: Optional[MatchStore] = None
+
+
+def get_match_store() -> MatchStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = MatchStore()
+    return _STORE
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Match log maintenance.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_imp = sub.add_parser("import-legacy", help="append per-file JSON match logs to the segment store")
+    p_imp.add_argument("src", nargs="?", default=MATCHES_DIR)
+    p_exp = sub.add_parser("export-legacy", help="write matches out as one JSON file each")
+    p_exp.add_argument("dst")
+    p_exp.add_argument("--game")
+    p_exp.add_argument("--bot")
+    sub.add_parser("stats", help="print per-segment counts")
+    sub.add_parser("reindex", help="rebuild the query index from the raw segments")
+    args = parser.parse_args(argv)
+
+    store = get_match_store()
+    if args.cmd == "import-legacy":
+        print(f"Imported {store.import_legacy(args.src)} matches")
+    elif args.cmd == "export-legacy":
+        print(f"Exported {store.export_legacy(args.dst, game=args.game, bot=args.bot)} matches")
+    elif args.cmd == "reindex":
+        print(f"Indexed {store.rebuild_index()} matches")
+    else:
+        for seg in store.segments():
+            print(f"segment {seg:06d}: {sum(1 for _ in store._read_index(seg))} matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Monte Carlo tree search for bots. Works with any Game subclass through
+legal_moves / next_state / is_terminal / winner.
+
+    from arena.mcts import MCTS
+    SEARCH = MCTS(game)                       # module level: the tree is reused between moves
+    def choose_move(state, legal_moves, player, game, ctx):   # ctx: arena.timecontrol.MoveContext
+        return SEARCH.best_move(state, player, deadline=ctx.soft_deadline, iterations=ctx.nodes)
+
+The search is anytime: with a deadline (a time.perf_counter() value) it runs
+UCT iterations (selection, expansion, random rollout, backpropagation) until
+the deadline passes and returns the most visited move; `iterations` caps the
+work instead of, or as well as, the clock.
+
+Nodes live in parallel preallocated arrays indexed by node number, and the
+children of a node occupy one contiguous block, so a node costs a few array
+slots instead of a Python object. Only the root's state is kept: a node
+stores the move that leads to it, and selection rebuilds states by replaying
+moves from the root. With `reuse=True` the subtree of the position reached
+after our move and the opponent's reply is moved to the front of the arrays
+and searched further on the next call; an unrelated position (a new match)
+starts a fresh tree. When the arrays are full the tree stops growing and
+further iterations only refine the existing nodes.
+"""
+from __future__ import annotations
+import math
+import random
+import threading
+import time
+from array import array
+from typing import Any, List, Optional
+
+from .core import Player, Move
+from .game_base import Game
+
+# outcome codes of terminal nodes; a node's mover is stored as the code of its win
+_OPEN, _X_WINS, _O_WINS, _DRAW = 0, 1, 2, 3
+_OUTCOME = {Player.X: _X_WINS, Player.O: _O_WINS, None: _DRAW}
+_PLAYER = {_X_WINS: Player.X, _O_WINS: Player.O}
+
+DEFAULT_ITERATIONS = 1000  # when neither a deadline nor iterations is given
+
+
+class MCTS:
+    def __init__(
+        self,
+        game: Game,
+        exploration: float = math.sqrt(2),
+        capacity: int = 200_000,
+        reuse: bool = True,
+        max_rollout_moves: int = 1000,
+        seed: Optional[int] = None,
+    ):
+        self.game = game
+        self.exploration = exploration
+        self.capacity = capacity
+        self.reuse = reuse
+        self.max_rollout_moves = max_rollout_moves
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.visits = array("i", [0]) * capacity
+        self.wins = array("d", [0.0]) * capacity       # for the player who moved into the node
+        self.first_child = array("i", [0]) * capacity
+        self.n_children = array("i", [0]) * capacity   # 0 = not expanded
+        self.outcome = array("b", [_OPEN]) * capacity
+        self.moves = array("q", [0]) * capacity        # the move that leads to the node
+        self.movers = array("b", [_OPEN]) * capacity   # who made it (_X_WINS / _O_WINS)
+        self.root_state: Any = None
+        self._played = 0  # root child of the move returned last, 0 = none
+        self.size = 0
+        self.iterations = 0  # run by the last best_move call
+
+    # ---------- public API ----------
+
+    def best_move(self, state: Any, player: Player, deadline: Optional[float] = None,
+                  iterations: Optional[int] = None) -> Optional[Move]:
+        legal = self.game.legal_moves(state, player)
+        if len(legal) <= 1:
+            return legal[0] if legal else None
+        if not self._lock.acquire(blocking=False):
+            # the tree belongs to another match running right now: search privately
+            private = MCTS(self.game, self.exploration, min(self.capacity, 50_000), False,
+                           self.max_rollout_moves, self._rng.randrange(1 << 30))
+            return private.best_move(state, player, deadline, iterations)
+        try:
+            self._set_root(state)
+            self._run(deadline, iterations)
+            return self._most_visited_move(legal)
+        finally:
+            self._lock.release()
+
+    def reset(self, state: Any) -> None:
+        self.size = 0
+        self.root_state = state
+        self._played = 0
+        self._new_node(state, 0, _OPEN)
+
+    # ---------- tree reuse ----------
+
+    def _set_root(self, state: Any) -> None:
+        if not self.reuse or self.size == 0:
+            self.reset(state)
+            return
+        encode = self.game.encode_state
+        key = encode(state)
+        if encode(self.root_state) == key:
+            return
+        played = self._played
+        if played:
+            # the opponent's reply to the move we returned last time
+            next_state = self.game.next_state
+            after = next_state(self.root_state, self.moves[played], _PLAYER[self.movers[played]])
+            first = self.first_child[played]
+            for reply in range(first, first + self.n_children[played]):
+                if encode(next_state(after, self.moves[reply], _PLAYER[self.movers[reply]])) == key:
+                    self._compact(reply)
+                    self.root_state = state
+                    return
+        self.reset(state)
+
+    def _compact(self, root: int) -> None:
+        """Moves the subtree under `root` to the front of the arrays (breadth first,
+        keeping every child block contiguous)."""
+        if root == 0:
+            return
+        order = [root]                      # old node numbers in their new order
+        new_first: List[int] = []
+        i = 0
+        while i < len(order):
+            old = order[i]
+            n = self.n_children[old]
+            new_first.append(len(order) if n else 0)
+            first = self.first_child[old]
+            order.extend(range(first, first + n))
+            i += 1
+        for column in (self.visits, self.wins, self.n_children, self.outcome, self.moves, self.movers):
+            column[:len(order)] = array(column.typecode, [column[o] for o in order])
+        self.first_child[:len(order)] = array("i", new_first)
+        self.size = len(order)
+        self._played = 0
+
+    # ---------- search ----------
+
+    def _run(self, deadline: Optional[float], iterations: Optional[int]) -> None:
+        if deadline is None and iterations is None:
+            iterations = DEFAULT_ITERATIONS
+        done = 0
+        clock = time.perf_counter
+        while iterations is None or done < iterations:
+            if deadline is not None and not done & 7 and clock() >= deadline:
+                break
+            self._iterate()
+            done += 1
+        self.iterations = done
+
+    def _iterate(self) -> None:
+        visits, wins, first_child, n_children = self.visits, self.wins, self.first_child, self.n_children
+        moves, movers, next_state = self.moves, self.movers, self.game.next_state
+        c = self.exploration
+        node = 0
+        path = [0]
+        state = self.root_state
+        # selection, replaying the moves down to the chosen leaf
+        while n_children[node] and not self.outcome[node]:
+            first = first_child[node]
+            log_n = math.log(visits[node])
+            best, best_score = first, -1.0
+            for child in range(first, first + n_children[node]):
+                v = visits[child]
+                if v == 0:
+                    best = child
+                    break
+                score = wins[child] / v + c * math.sqrt(log_n / v)
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            path.append(node)
+            state = next_state(state, moves[node], _PLAYER[movers[node]])
+
+        # expansion (a leaf is expanded on its second visit) and simulation
+        outcome = self.outcome[node]
+        if not outcome:
+            if visits[node] or node == 0:
+                child_state = self._expand(node, state)
+                if child_state is not None:
+                    node, state = first_child[node], child_state
+                    path.append(node)
+                    outcome = self.outcome[node]
+            if not outcome:
+                outcome = _OUTCOME[self._rollout(state)]
+
+        # backpropagation
+        for n in path:
+            visits[n] += 1
+            if outcome == _DRAW:
+                wins[n] += 0.5
+            elif movers[n] == outcome:
+                wins[n] += 1.0
+
+    def _new_node(self, state: Any, move: Move, mover: int) -> int:
+        i = self.size
+        self.size += 1
+        self.visits[i] = 0
+        self.wins[i] = 0.0
+        self.first_child[i] = 0
+        self.n_children[i] = 0
+        self.moves[i] = move
+        self.movers[i] = mover
+        game = self.game
+        self.outcome[i] = _OUTCOME[game.winner(state)] if game.is_terminal(state) else _OPEN
+        return i
+
+    def _expand(self, node: int, state: Any) -> Any:
+        """Adds the children of `node` (whose position is `state`) and returns the
+        first child's state, or None when there is no room or no legal move."""
+        player = state.to_move
+        legal = self.game.legal_moves(state, player)
+        if not legal or self.size + len(legal) > self.capacity:
+            return None
+        self.first_child[node] = self.size
+        self.n_children[node] = len(legal)
+        next_state = self.game.next_state
+        mover = _OUTCOME[player]
+        first = None
+        for move in legal:
+            child_state = next_state(state, move, player)
+            if first is None:
+                first = child_state
+            self._new_node(child_state, move, mover)
+        return first
+
+    def _rollout(self, state: Any) -> Optional[Player]:
+        game = self.game
+        choice = self._rng.choice
+        is_terminal, legal_moves, next_state = game.is_terminal, game.legal_moves, game.next_state
+        for _ in range(self.max_rollout_moves):
+            if is_terminal(state):
+                return game.winner(state)
+            player = state.to_move
+            state = next_state(state, choice(legal_moves(state, player)), player)
+        return game.winner(state) if is_terminal(state) else None
+
+    def _most_visited_move(self, legal: List[Move]) -> Move:
+        first, n = self.first_child[0], self.n_children[0]
+        if not n:
+            return legal[0]
+        best = max(range(first, first + n), key=lambda c: (self.visits[c], self.wins[c]))
+        self._played = best
+        return self.moves[best]
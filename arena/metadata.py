@@ -0,0 +1,129 @@
+"""In-memory registry of game and bot metadata.
+
+Loaded once and served from memory; at most every `check_interval` seconds the
+registry stats the games directory and metadata.json and reloads only if an
+mtime or size changed. Every view carries an ETag so endpoints can answer
+If-None-Match with 304.
+
+The games are the ones the game plugin registry (arena.games) discovered, so
+/games never lists a game that cannot be played; a change in the games
+directory makes the plugin registry discover again.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging_config import logger
+from .filestorage import GAMES_DIR, BOTS_METADATA, list_all_bots
+from .games import GAME_REGISTRY, GameRegistry
+
+CHECK_INTERVAL = float(os.environ.get("ARENA_METADATA_CHECK_INTERVAL", "1.0"))
+
+
+def _etag(data: Any) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return '"' + hashlib.sha1(raw).hexdigest()[:20] + '"'
+
+
+@dataclass
+class _Snapshot:
+    signature: Tuple = ()
+    games: List[Dict[str, Any]] = field(default_factory=list)
+    games_etag: str = '""'
+    bots_by_game: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    bots_etag: Dict[str, str] = field(default_factory=dict)
+    meta_by_id: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+
+class MetadataRegistry:
+    def __init__(self, games_dir: str = GAMES_DIR, bots_metadata: str = BOTS_METADATA,
+                 check_interval: float = CHECK_INTERVAL, game_registry: Optional[GameRegistry] = None):
+        self.games_dir = games_dir
+        if game_registry is None:
+            game_registry = GAME_REGISTRY if games_dir == GAMES_DIR else GameRegistry(games_dir)
+        self.game_registry = game_registry
+        self.bots_metadata = bots_metadata
+        self.check_interval = check_interval
+        self._snap: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _signature(self) -> Tuple:
+        files = []
+        try:
+            with os.scandir(self.games_dir) as it:
+                for e in it:
+                    if e.name.endswith(".json"):
+                        st = e.stat()
+                        files.append((e.name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            pass
+        try:
+            st = os.stat(self.bots_metadata)
+            bots_sig: Tuple = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            bots_sig = ()
+        return tuple(sorted(files)), bots_sig
+
+    def _load(self, signature: Tuple) -> _Snapshot:
+        if self._snap is not None and signature[0] != self._snap.signature[0]:
+            self.game_registry.reload()  # game files changed since the last snapshot
+        games = [spec.meta for spec in self.game_registry.specs().values()]
+        bots_by_game: Dict[str, List[Dict[str, Any]]] = {}
+        for b in list_all_bots():
+            bots_by_game.setdefault(b.get("game"), []).append(b)
+        return _Snapshot(
+            signature=signature,
+            games=games,
+            games_etag=_etag(games),
+            bots_by_game=bots_by_game,
+            bots_etag={g: _etag(bots) for g, bots in bots_by_game.items()},
+            meta_by_id={g: {b["id"]: b for b in bots} for g, bots in bots_by_game.items()},
+        )
+
+    def _current(self) -> _Snapshot:
+        now = time.monotonic()
+        snap = self._snap
+        if snap is not None and now - self._checked_at < self.check_interval:
+            return snap
+        with self._lock:
+            if self._snap is not None and now - self._checked_at < self.check_interval:
+                return self._snap
+            signature = self._signature()
+            if self._snap is None or signature != self._snap.signature:
+                self._snap = self._load(signature)
+                logger.info(f"Metadata loaded: {len(self._snap.games)} games, "
+                            f"{sum(len(b) for b in self._snap.bots_by_game.values())} bots")
+            self._checked_at = now
+            return self._snap
+
+    def reload(self) -> None:
+        with self._lock:
+            self.game_registry.reload()
+            self._snap = self._load(self._signature())
+            self._checked_at = time.monotonic()
+
+    def games(self) -> Tuple[List[Dict[str, Any]], str]:
+        snap = self._current()
+        return snap.games, snap.games_etag
+
+    def bots(self, game_code: str) -> Tuple[List[Dict[str, Any]], str]:
+        snap = self._current()
+        return snap.bots_by_game.get(game_code, []), snap.bots_etag.get(game_code, _etag([]))
+
+    def game(self, game_code: str) -> Optional[Dict[str, Any]]:
+        return next((g for g in self._current().games if g.get("code") == game_code), None)
+
+    def bot_index(self, game_code: str) -> Dict[str, Dict[str, Any]]:
+        return self._current().meta_by_id.get(game_code, {})
+
+    def all_bots(self) -> List[Dict[str, Any]]:
+        return [b for bots in self._current().bots_by_game.values() for b in bots]
+
+
+METADATA = MetadataRegistry()
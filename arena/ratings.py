@@ -0,0 +1,190 @@
+"""Elo and Glicko-2 ratings, updated one match at a time.
+
+Every match is treated as its own Glicko-2 rating period, so an update is O(1)
+and only needs the two players' current ratings. The leaderboard stores call
+`update_ratings` and `update_head_to_head` inside the same transaction that
+applies the win/loss counts.
+
+Ratings can be rebuilt from the match log in one streaming pass:
+    python -m arena.ratings rebuild [--game tic_tac_toe]
+"""
+from __future__ import annotations
+import argparse
+import math
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .core import Player
+
+ELO_START = 1500.0
+ELO_K = 32.0
+GLICKO_START_RD = 350.0
+GLICKO_START_VOL = 0.06
+GLICKO_TAU = 0.5           # constrains volatility changes
+_GLICKO_SCALE = 173.7178   # Glicko -> Glicko-2 scale
+_EPS = 1e-6
+
+MatchResult = Tuple[str, str, str]  # (bot playing X, bot playing O, winner "X"/"O"/"draw")
+
+
+@dataclass
+class Rating:
+    elo: float = ELO_START
+    rating: float = ELO_START         # Glicko-2, on the familiar Glicko scale
+    rd: float = GLICKO_START_RD
+    volatility: float = GLICKO_START_VOL
+    games: int = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        d = asdict(self)
+        for k in ("elo", "rating", "rd"):
+            d[k] = round(d[k], 1)
+        d["volatility"] = round(d["volatility"], 6)
+        return d
+
+
+def scores(winner: str) -> Tuple[float, float]:
+    """(score of X, score of O) for a match result."""
+    if winner == Player.X.value:
+        return 1.0, 0.0
+    if winner == Player.O.value:
+        return 0.0, 1.0
+    return 0.5, 0.5
+
+
+def elo_update(ra: float, rb: float, score_a: float, k: float = ELO_K) -> Tuple[float, float]:
+    expected_a = 1.0 / (1.0 + 10 ** ((rb - ra) / 400.0))
+    change = k * (score_a - expected_a)
+    return ra + change, rb - change
+
+
+def _g(phi: float) -> float:
+    return 1.0 / math.sqrt(1.0 + 3.0 * phi * phi / (math.pi * math.pi))
+
+
+def _new_volatility(phi: float, sigma: float, delta: float, v: float, tau: float) -> float:
+    # Illinois algorithm (step 5 of Glickman's Glicko-2 paper)
+    a = math.log(sigma * sigma)
+
+    def f(x: float) -> float:
+        ex = math.exp(x)
+        return (ex * (delta * delta - phi * phi - v - ex) / (2.0 * (phi * phi + v + ex) ** 2)
+                - (x - a) / (tau * tau))
+
+    big_a = a
+    if delta * delta > phi * phi + v:
+        big_b = math.log(delta * delta - phi * phi - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        big_b = a - k * tau
+    fa, fb = f(big_a), f(big_b)
+    while abs(big_b - big_a) > _EPS:
+        c = big_a + (big_a - big_b) * fa / (fb - fa)
+        fc = f(c)
+        if fc * fb <= 0:
+            big_a, fa = big_b, fb
+        else:
+            fa /= 2.0
+        big_b, fb = c, fc
+    return math.exp(big_a / 2.0)
+
+
+def glicko2_update(player: Rating, opponent: Rating, score: float,
+                   tau: float = GLICKO_TAU) -> Tuple[float, float, float]:
+    """New (rating, rd, volatility) of `player` after one game against `opponent`."""
+    mu = (player.rating - ELO_START) / _GLICKO_SCALE
+    phi = player.rd / _GLICKO_SCALE
+    mu_j = (opponent.rating - ELO_START) / _GLICKO_SCALE
+    g = _g(opponent.rd / _GLICKO_SCALE)
+    expected = 1.0 / (1.0 + math.exp(-g * (mu - mu_j)))
+    v = 1.0 / (g * g * expected * (1.0 - expected))
+    delta = v * g * (score - expected)
+    sigma = _new_volatility(phi, player.volatility, delta, v, tau)
+    phi_star = math.sqrt(phi * phi + sigma * sigma)
+    phi_new = 1.0 / math.sqrt(1.0 / (phi_star * phi_star) + 1.0 / v)
+    mu_new = mu + phi_new * phi_new * g * (score - expected)
+    return mu_new * _GLICKO_SCALE + ELO_START, phi_new * _GLICKO_SCALE, sigma
+
+
+def update_ratings(ratings: Dict[str, Rating], bot0: str, bot1: str, winner: str) -> None:
+    """Applies one match to `ratings` in place (missing bots start at defaults).
+    Mirror matches carry no information and are ignored."""
+    if bot0 == bot1:
+        return
+    r0 = ratings.setdefault(bot0, Rating())
+    r1 = ratings.setdefault(bot1, Rating())
+    s0, s1 = scores(winner)
+    r0.elo, r1.elo = elo_update(r0.elo, r1.elo, s0)
+    g0 = glicko2_update(r0, r1, s0)
+    g1 = glicko2_update(r1, r0, s1)
+    r0.rating, r0.rd, r0.volatility = g0
+    r1.rating, r1.rd, r1.volatility = g1
+    r0.games += 1
+    r1.games += 1
+
+
+def matchup_key(bot0: str, bot1: str) -> Tuple[str, str]:
+    return (bot0, bot1) if bot0 <= bot1 else (bot1, bot0)
+
+
+def update_head_to_head(h2h: Dict[Tuple[str, str], List[int]], bot0: str, bot1: str, winner: str) -> None:
+    """h2h maps (bot_a, bot_b) with bot_a < bot_b to [wins_a, wins_b, draws]."""
+    if bot0 == bot1:
+        return
+    key = matchup_key(bot0, bot1)
+    row = h2h.setdefault(key, [0, 0, 0])
+    if winner == Player.X.value:
+        row[0 if key[0] == bot0 else 1] += 1
+    elif winner == Player.O.value:
+        row[0 if key[0] == bot1 else 1] += 1
+    else:
+        row[2] += 1
+
+
+def head_to_head_rows(h2h: Dict[Tuple[str, str], List[int]]) -> List[Dict[str, object]]:
+    return [
+        {"bot_a": a, "bot_b": b, "wins_a": r[0], "wins_b": r[1], "draws": r[2], "games": sum(r)}
+        for (a, b), r in sorted(h2h.items())
+    ]
+
+
+def ranked(ratings: Dict[str, Rating]) -> List[Dict[str, object]]:
+    """Ratings as rows sorted by Glicko-2 rating, best first."""
+    rows = [{"bot": bot, **r.to_dict()} for bot, r in ratings.items()]
+    rows.sort(key=lambda row: row["rating"], reverse=True)
+    return rows
+
+
+def replay(results: Iterable[MatchResult]) -> Tuple[Dict[str, Rating], Dict[Tuple[str, str], List[int]]]:
+    """Ratings and head-to-head tables from a stream of match results."""
+    ratings: Dict[str, Rating] = {}
+    h2h: Dict[Tuple[str, str], List[int]] = {}
+    for bot0, bot1, winner in results:
+        update_ratings(ratings, bot0, bot1, winner)
+        update_head_to_head(h2h, bot0, bot1, winner)
+    return ratings, h2h
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .leaderboard import get_store
+    from .matchstore import get_match_store
+
+    parser = argparse.ArgumentParser(description="Rating maintenance.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="recompute ratings and head-to-head tables from the match log")
+    p_rebuild.add_argument("--game")
+    args = parser.parse_args(argv)
+
+    match_store = get_match_store()
+    games = [args.game] if args.game else sorted({e["game"] for e in match_store.iter_index() if e.get("game")})
+    store = get_store()
+    for game in games:
+        results = ((e["bot0"], e["bot1"], e["winner"]) for e in match_store.iter_index(game=game))
+        n = store.rebuild_ratings(game, results)
+        print(f"{game}: rebuilt ratings from {n} matches")
+
+
+if __name__ == "__main__":
+    main()
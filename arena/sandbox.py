@@ -0,0 +1,319 @@
+"""Sandboxed bot runner: bots run in a warm pool of worker processes.
+
+Each worker applies resource limits (CPU seconds per move, address space)
+before serving requests, loads bots once and keeps them cached. Requests
+travel over a pipe as marshal-encoded tuples (plain ints and strings, no
+pickling of game objects). Replies come from untrusted code, so they have a
+fixed format instead: a struct-packed status and int move, and anything else
+counts as an error. A worker that misses its deadline, crashes or
+hits a limit is killed and replaced; healthy workers are recycled after
+`max_moves` moves so leaks in bot code cannot accumulate.
+
+Enable for the API with ARENA_BOT_SANDBOX=1. Resource limits need the Unix
+`resource` module; elsewhere workers still isolate bots but run unlimited.
+"""
+from __future__ import annotations
+import marshal
+import multiprocessing as mp
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .logging_config import logger
+from .controllers import IsolatedBot, load_bot_callable
+from .core import Player, Move
+from .timecontrol import MoveContext, wants_context
+
+SANDBOX_ENABLED = os.environ.get("ARENA_BOT_SANDBOX", "0") == "1"
+SANDBOX_WORKERS = int(os.environ.get("ARENA_SANDBOX_WORKERS", str(os.cpu_count() or 2)))
+SANDBOX_CPU_SECONDS = int(os.environ.get("ARENA_SANDBOX_CPU_SECONDS", "2"))     # per move
+SANDBOX_MEMORY_MB = int(os.environ.get("ARENA_SANDBOX_MEMORY_MB", "1024"))      # address space
+SANDBOX_MAX_MOVES = int(os.environ.get("ARENA_SANDBOX_MAX_MOVES", "5000"))      # recycle after
+STARTUP_TIMEOUT = 30.0  # seconds for a new worker to import and warm up its bots
+
+# reply status codes
+OK, ERROR, INVALID, MEMORY = 0, 1, 2, 3
+_STATUS = {OK: "ok", ERROR: "error", INVALID: "invalid", MEMORY: "memory"}
+_REPLY = struct.Struct("<Bq")  # status, move (0 unless OK)
+
+
+def _reply(status: int, move: int = 0) -> bytes:
+    return _REPLY.pack(status, move)
+
+
+def _parse_reply(data: bytes) -> Optional[Tuple[int, int]]:
+    """(status, move), or None if `data` is not a reply a worker sends."""
+    if len(data) != _REPLY.size:
+        return None
+    status, move = _REPLY.unpack(data)
+    return (status, move) if status in _STATUS else None
+
+
+# ---------- worker process ----------
+
+def _limit_cpu(seconds: int) -> None:
+    # RLIMIT_CPU is cumulative, so move the soft limit to "used so far + budget";
+    # exceeding it delivers SIGXCPU, which terminates the worker
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn: Any, cpu_seconds: int, memory_mb: int, warm: Sequence[Tuple[str, str]]) -> None:
+    from .games import GAME_REGISTRY
+
+    for bots_dir, file_name in warm:
+        try:
+            load_bot_callable(bots_dir, file_name)
+        except Exception:
+            pass
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    games: Dict[str, Any] = {}
+    conn.send_bytes(b"")  # ready
+
+    while True:
+        try:
+            req = marshal.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+        bots_dir, file_name, game_code, board, to_move, winner, moves_played, line, legal, player, ctx = req
+        try:
+            if resource is not None and cpu_seconds > 0:
+                _limit_cpu(cpu_seconds)
+            fn = load_bot_callable(bots_dir, file_name)
+            game = games.get(game_code)
+            if game is None:
+                game = games[game_code] = GAME_REGISTRY[game_code]()
+            state = game.make_state(board, Player(to_move), Player(winner) if winner else None,
+                                    moves_played, line).copy()  # bots get a mutable State
+            if ctx is not None and wants_context(fn):
+                move = fn(state, list(legal), Player(player), game, MoveContext.from_wire(ctx))
+            else:
+                move = fn(state, list(legal), Player(player), game)
+            if type(move) is not int:
+                reply = _reply(INVALID)
+            else:
+                try:
+                    reply = _reply(OK, move)
+                except struct.error:  # outside the int64 range
+                    reply = _reply(INVALID)
+        except MemoryError:
+            conn.send_bytes(_reply(MEMORY))
+            return  # heap may be in a bad state: let the parent replace us
+        except Exception:
+            reply = _reply(ERROR)
+        conn.send_bytes(reply)
+
+
+# ---------- parent side ----------
+
+class _Worker:
+    def __init__(self, ctx: Any, cpu_seconds: int, memory_mb: int, warm: Sequence[Tuple[str, str]]):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, cpu_seconds, memory_mb, list(warm)),
+                                daemon=True, name="arena-bot-sandbox")
+        self.proc.start()
+        child.close()
+        self.moves = 0
+        self.ready = False
+        self.dead = False
+
+    def wait_ready(self, timeout: float = STARTUP_TIMEOUT) -> bool:
+        if not self.ready and not self.dead:
+            try:
+                if self.conn.poll(timeout):
+                    self.conn.recv_bytes()
+                    self.ready = True
+            except (EOFError, OSError):
+                pass
+            if not self.ready:
+                self.kill()
+        return self.ready
+
+    def call(self, request: tuple, timeout: float) -> Tuple[Optional[Move], float, str]:
+        """Returns (move, elapsed seconds, status); the clock starts once the worker is ready."""
+        if not self.wait_ready():
+            return None, 0.0, "killed"
+        self.moves += 1
+        start = time.perf_counter()
+        try:
+            self.conn.send_bytes(marshal.dumps(request))
+            if not self.conn.poll(timeout):
+                self.kill()
+                return None, time.perf_counter() - start, "timeout"
+            data = self.conn.recv_bytes(_REPLY.size)  # a longer reply is refused unread
+        except EOFError:
+            self.kill()  # died mid-move: CPU limit (SIGXCPU) or a crash
+            return None, time.perf_counter() - start, "killed"
+        except OSError:
+            self.kill()  # oversized reply (or a broken pipe): the worker is not trusted again
+            return None, time.perf_counter() - start, "error"
+        reply = _parse_reply(data)
+        if reply is None:
+            self.kill()
+            return None, time.perf_counter() - start, "error"
+        status, move = reply
+        if status == MEMORY:
+            self.kill()
+        return (move if status == OK else None), time.perf_counter() - start, _STATUS[status]
+
+    def kill(self) -> None:
+        self.dead = True
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(timeout=1)
+        self.conn.close()
+
+
+class SandboxPool:
+    def __init__(self, size: int = SANDBOX_WORKERS, cpu_seconds: int = SANDBOX_CPU_SECONDS,
+                 memory_mb: int = SANDBOX_MEMORY_MB, max_moves: int = SANDBOX_MAX_MOVES,
+                 warm: Sequence[Tuple[str, str]] = ()):
+        if "forkserver" in mp.get_all_start_methods():
+            # workers fork from a clean single-threaded server process that has
+            # already imported the arena, so a (re)spawn costs a fork, not an import
+            self._ctx = mp.get_context("forkserver")
+            self._ctx.set_forkserver_preload(["arena.sandbox", "arena.games"])
+        else:
+            self._ctx = mp.get_context("spawn")
+        self.size = size
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_moves = max_moves
+        self.warm = list(warm)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+        self._closed = False
+        self.recycled = 0
+
+    def start(self) -> None:
+        workers = [self._spawn() for _ in range(self.size)]
+        workers = [w for w in workers if w.wait_ready()]
+        with self._lock:
+            self._idle.extend(workers)
+        logger.info(f"Bot sandbox started: {self.size} workers, {self.cpu_seconds}s CPU/move, "
+                    f"{self.memory_mb} MB, recycle after {self.max_moves} moves")
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.cpu_seconds, self.memory_mb, self.warm)
+
+    def _acquire(self) -> _Worker:
+        self._available.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._spawn()
+
+    def _release(self, worker: _Worker) -> None:
+        if worker.dead or worker.moves >= self.max_moves:
+            # replace off the caller's path; until then _acquire spawns on demand
+            self._available.release()
+            threading.Thread(target=self._recycle, args=(worker,), daemon=True).start()
+            return
+        with self._lock:
+            self._idle.append(worker)
+        self._available.release()
+
+    def _recycle(self, worker: _Worker) -> None:
+        if not worker.dead:
+            worker.kill()
+        self.recycled += 1
+        if self._closed:
+            return
+        try:
+            fresh = self._spawn()
+            if not fresh.wait_ready():
+                return  # _acquire spawns on demand meanwhile
+        except Exception as e:
+            logger.error(f"Could not replace sandbox worker: {e}")
+            return
+        with self._lock:
+            if self._closed:
+                fresh.kill()
+                return
+            self._idle.append(fresh)
+
+    def call(self, bots_dir: str, file_name: str, args: tuple, timeout: float) -> Tuple[Optional[Move], float, str]:
+        state, legal, player, game = args[:4]
+        ctx = args[4] if len(args) > 4 else None
+        request = (
+            bots_dir, file_name, game.code,
+            list(state.board), state.to_move.value, state.winner.value if state.winner else None,
+            state.moves_played, list(state.winning_line) if state.winning_line else None,
+            list(legal), player.value, ctx.to_wire() if ctx is not None else None,
+        )
+        worker = self._acquire()
+        try:
+            move, elapsed, status = worker.call(request, timeout)
+        finally:
+            self._release(worker)
+        if status not in ("ok", "timeout"):
+            logger.warning("Sandboxed bot {} failed a move: {}", file_name, status)
+        return move, elapsed, status
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for w in workers:
+            w.kill()
+
+
+class SandboxedBot(IsolatedBot):
+    """A bot file executed in the sandbox pool instead of the server process."""
+
+    def __init__(self, pool: SandboxPool, bots_dir: str, file_name: str, default_timeout: float = 0.5):
+        self.pool = pool
+        self.bots_dir = bots_dir
+        self.file_name = file_name
+        self.default_timeout = default_timeout
+
+    def call(self, args: tuple, timeout: float) -> Tuple[Optional[Move], float, str]:
+        return self.pool.call(self.bots_dir, self.file_name, args, timeout)
+
+    def __call__(self, state: Any, legal_moves: List[Move], player: Player, game: Any,
+                 ctx: Optional[MoveContext] = None) -> Optional[Move]:
+        timeout = ctx.budget if ctx is not None else self.default_timeout
+        return self.call((state, legal_moves, player, game, ctx), timeout)[0]
+
+
+_POOL: Optional[SandboxPool] = None
+
+
+def get_sandbox_pool(warm: Sequence[Tuple[str, str]] = ()) -> SandboxPool:
+    global _POOL
+    if _POOL is None:
+        _POOL = SandboxPool(warm=warm)
+        _POOL.start()
+    return _POOL
+
+
+def load_bot(bots_dir: str, file_name: str) -> Any:
+    """A bot the way the API runs it: in the sandbox pool with ARENA_BOT_SANDBOX=1,
+    otherwise loaded into this process."""
+    if SANDBOX_ENABLED:
+        if not os.path.exists(os.path.join(bots_dir, file_name)):
+            raise RuntimeError(f"Cannot load bot from {file_name}")
+        return SandboxedBot(get_sandbox_pool(), bots_dir, file_name)
+    return load_bot_callable(bots_dir, file_name)
+
+
+def shutdown_sandbox_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
@@ -0,0 +1,230 @@
+"""Game-tree search for bots: negamax with alpha-beta pruning and a bounded
+transposition table. Works with any Game subclass.
+
+    from arena.search import Negamax
+    SEARCH = Negamax(game)                    # module level: the table survives between moves
+    def choose_move(state, legal_moves, player, game):
+        return SEARCH.best_move(state, player)
+
+Scores are from the point of view of the side to move: WIN_SCORE minus the
+number of plies to the win (so quicker wins are preferred), 0 for a draw, and
+`evaluate(state, player)` at the depth limit for depth-limited searches.
+"""
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, NamedTuple, Optional, Tuple
+
+from .core import Player, Move
+from .game_base import Game
+
+WIN_SCORE = 1_000_000
+_MATE_BOUND = WIN_SCORE - 10_000  # |score| above this is a forced win/loss
+UNLIMITED = 1 << 30
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    flag: int
+    value: int
+    move: Optional[Move]
+
+
+class TranspositionTable:
+    """Bounded LRU map from state key to TTEntry."""
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, TTEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[TTEntry]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._data.move_to_end(key)
+        except KeyError:  # evicted by another thread sharing this table
+            pass
+        return entry
+
+    def put(self, key: Hashable, entry: TTEntry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            try:
+                self._data.popitem(last=False)
+            except KeyError:
+                break
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = 0
+
+
+def default_key(state: Any) -> Hashable:
+    """Hashable states are their own key; list-board States are keyed on their contents."""
+    if type(state).__hash__ is not None:
+        return state
+    return (tuple(state.board), state.to_move, state.winner)
+
+
+def _to_tt(value: int, ply: int) -> int:
+    # forced-win scores are stored relative to the node, not the root
+    if value > _MATE_BOUND:
+        return value + ply
+    if value < -_MATE_BOUND:
+        return value - ply
+    return value
+
+
+def _from_tt(value: int, ply: int) -> int:
+    if value > _MATE_BOUND:
+        return value - ply
+    if value < -_MATE_BOUND:
+        return value + ply
+    return value
+
+
+class Negamax:
+    def __init__(
+        self,
+        game: Game,
+        key: Callable[[Any], Hashable] = default_key,
+        max_entries: int = 1_000_000,
+        max_depth: Optional[int] = None,
+        evaluate: Optional[Callable[[Any, Player], int]] = None,
+    ):
+        self.game = game
+        self.key = key
+        self.tt = TranspositionTable(max_entries)
+        self.max_depth = max_depth
+        self.evaluate = evaluate
+        self.nodes = 0
+        self._deadline: Optional[float] = None
+        self._hit_horizon = False  # did the current subtree stop at the depth limit?
+
+    # ---------- public API ----------
+
+    def search(self, state: Any, player: Player, depth: Optional[int] = None) -> Tuple[Optional[Move], int]:
+        """Searches to `depth` plies (default: max_depth, or the whole tree) and
+        returns (best move, score)."""
+        depth = depth or self.max_depth or UNLIMITED
+        self._hit_horizon = False
+        legal = self.game.legal_moves(state, player)
+        if not legal:
+            return None, self._negamax(state, player, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move, best = legal[0], -WIN_SCORE - 1
+        for move in self._ordered(legal, self.tt.get(self.key(state))):
+            value = self._child_value(state, move, player, depth, alpha, beta, 0)
+            if value > best:
+                best, best_move = value, move
+            alpha = max(alpha, value)
+        return best_move, best
+
+    def best_move(self, state: Any, player: Player, deadline: Optional[float] = None) -> Optional[Move]:
+        """Best move for `player`. With a deadline (time.perf_counter() value),
+        deepens iteratively and returns the move of the last completed depth."""
+        if deadline is None:
+            return self.search(state, player)[0]
+        limit = self.max_depth or UNLIMITED
+        best: Optional[Move] = None
+        self._deadline = deadline
+        try:
+            depth = 1
+            while depth <= limit:
+                move, score = self.search(state, player, depth)
+                best = move
+                if abs(score) > _MATE_BOUND or not self._hit_horizon:
+                    break  # forced result or whole tree searched: deeper cannot change it
+                depth += 1
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+        if best is None:
+            legal = self.game.legal_moves(state, player)
+            best = legal[0] if legal else None
+        return best
+
+    # ---------- internals ----------
+
+    @staticmethod
+    def _ordered(legal: List[Move], entry: Optional[TTEntry]) -> List[Move]:
+        if entry is not None and entry.move is not None and entry.move in legal:
+            return [entry.move] + [m for m in legal if m != entry.move]
+        return legal
+
+    def _child_value(self, state: Any, move: Move, player: Player, depth: int,
+                     alpha: int, beta: int, ply: int) -> int:
+        child = self.game.next_state(state, move, player)
+        nxt = player.other if self.game.is_terminal(child) else child.to_move
+        if nxt == player:  # same side moves again: no sign flip
+            return self._negamax(child, player, depth - 1, alpha, beta, ply + 1)
+        return -self._negamax(child, nxt, depth - 1, -beta, -alpha, ply + 1)
+
+    def _negamax(self, state: Any, player: Player, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+        game = self.game
+        if game.is_terminal(state):
+            w = game.winner(state)
+            if w is None:
+                return 0
+            return WIN_SCORE - ply if w == player else -(WIN_SCORE - ply)
+        if depth <= 0:
+            self._hit_horizon = True
+            return self.evaluate(state, player) if self.evaluate else 0
+
+        key = self.key(state)
+        entry = self.tt.get(key)
+        if entry is not None and entry.depth >= depth:
+            if entry.depth < UNLIMITED:
+                self._hit_horizon = True  # value may come from a depth-limited search
+            value = _from_tt(entry.value, ply)
+            if entry.flag == EXACT:
+                return value
+            if entry.flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        alpha_orig = alpha
+        outer_horizon, self._hit_horizon = self._hit_horizon, False
+        best, best_move = -WIN_SCORE - 1, None
+        for move in self._ordered(game.legal_moves(state, player), entry):
+            value = self._child_value(state, move, player, depth, alpha, beta, ply)
+            if value > best:
+                best, best_move = value, move
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        # a subtree searched to the end is valid for any depth
+        stored_depth = depth if self._hit_horizon else UNLIMITED
+        self._hit_horizon = outer_horizon or self._hit_horizon
+        self.tt.put(key, TTEntry(stored_depth, flag, _to_tt(best, ply), best_move))
+        return best
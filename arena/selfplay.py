@@ -0,0 +1,267 @@
+"""Self-play dataset generation for training learned bots.
+
+Plays matches between arena bots across worker processes and writes one
+sample per move: the position the mover saw (`Game.encode_state`, which must
+be fixed-width, e.g. 10 bytes for tic-tac-toe), the move as an action index,
+the mover and the final outcome from the mover's side.
+
+Samples are stored in chunk files (`chunk_000000.npy`, ...) holding a NumPy
+structured array, so a dataset can be memory-mapped without loading it:
+
+    state    uint8[width]   encoded position before the move
+    action   int16          Game.move_to_action(move)
+    player   int8           arena.batch.X / O
+    outcome  int8           1 win, 0 draw, -1 loss for `player`
+
+`manifest.json` lists the chunks with their sample and result counts and
+is rewritten as chunks complete. Each worker writes its own chunks, so
+only a few counters travel back to the driver.
+
+    python -m arena.selfplay --game tic_tac_toe --games 100000 --bots random_ttt corner_bot
+    python -m arena.selfplay --game eleven_sticks --games 50000 --inline --out /data/sticks
+
+Matches run through MatchController (the time control is enforced) unless
+`--inline` calls the bots directly, which is several times faster and fine
+for trusted bots; they still receive the time control's move context.
+Requires numpy.
+"""
+from __future__ import annotations
+import argparse
+import datetime
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .logging_config import logger
+from .batch import PLAYER_CODES, require_numpy
+from .controllers import MatchController, load_bot_callable
+from .core import Player
+from .filestorage import DATA_DIR, BOTS_DIR, list_bots, read_json, write_json_atomic
+from .games import GAME_REGISTRY
+from .metadata import METADATA
+from .timecontrol import TimeControl, parse as parse_time_control, resolve as resolve_time_control, wants_context
+
+FORMAT = "arena-selfplay"
+VERSION = 1
+SELFPLAY_DIR = os.path.join(DATA_DIR, "selfplay")
+MANIFEST = "manifest.json"
+
+
+def sample_dtype(width: int) -> Any:
+    np = require_numpy()
+    return np.dtype([("state", np.uint8, (width,)), ("action", np.int16),
+                     ("player", np.int8), ("outcome", np.int8)])
+
+
+def state_width(game: Any) -> int:
+    """Width of the game's state encoding; it must be the same for every position."""
+    state = game.initial_state()
+    width = len(game.encode_state(state))
+    move = game.legal_moves(state, state.to_move)[0]
+    if len(game.encode_state(game.next_state(state, move, state.to_move))) != width:
+        raise ValueError(f"{type(game).__name__}.encode_state is not fixed-width")
+    return width
+
+
+# ---------- playing ----------
+
+def _inline_moves(game: Any, bots: Dict[Player, Callable],
+                  time_control: TimeControl) -> Iterator[Tuple[Any, Any, Player]]:
+    """(state, move, player) for each move of one match, calling the bots directly."""
+    clocks = {p: time_control.new_clock() for p in bots}
+    state = game.initial_state()
+    ply = 0
+    while not game.is_terminal(state):
+        player = state.to_move
+        legal = game.legal_moves(state, player)
+        if not legal:
+            break
+        fn = bots[player]
+        args = (state.copy(), legal.copy(), player, game)
+        start = time.perf_counter()
+        try:
+            move = fn(*args, clocks[player].context(ply)) if wants_context(fn) else fn(*args)
+        except Exception:
+            move = None
+        clocks[player].charge(time.perf_counter() - start)
+        ply += 1
+        if move not in legal:
+            move = legal[0]  # same fallback as the controller
+        yield state, move, player
+        state = game.next_state(state, move, player)
+
+
+def _controller_moves(game: Any, bots: Dict[Player, Callable], time_control: TimeControl,
+                      bot_ids: Tuple[str, str]) -> Iterator[Tuple[Any, Any, Player]]:
+    controller = MatchController(game, bots[Player.X], bots[Player.O], bot_ids=bot_ids, time_control=time_control)
+    state = game.initial_state()
+    for record in controller.iter_moves():
+        player = Player(record["player"])
+        yield state, record["move"], player
+        state = game.next_state(state, record["move"], player)
+
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(game_code: str, bot_files: Dict[str, str], time_control: str, inline: bool) -> None:
+    game = GAME_REGISTRY[game_code]()
+    _WORKER["game"] = game
+    _WORKER["width"] = state_width(game)
+    _WORKER["bots"] = {bid: load_bot_callable(BOTS_DIR, f) for bid, f in bot_files.items()}
+    _WORKER["time_control"] = parse_time_control(time_control)
+    _WORKER["inline"] = inline
+
+
+def _generate_chunk(index: int, games: int, seed: int, out_dir: str) -> Dict[str, Any]:
+    np = require_numpy()
+    game, width, bots = _WORKER["game"], _WORKER["width"], _WORKER["bots"]
+    bot_ids = sorted(bots)
+    # bots draw from the global random module: seed it per chunk so forked
+    # workers do not replay the same games
+    rng = random.Random(seed * 1_000_003 + index)
+    random.seed(rng.random())
+
+    encode, to_action = game.encode_state, game.move_to_action
+    states: List[bytes] = []
+    actions: List[int] = []
+    players: List[int] = []
+    outcomes: List[int] = []
+    results = {"X": 0, "O": 0, "draw": 0}
+    for _ in range(games):
+        b0, b1 = rng.choice(bot_ids), rng.choice(bot_ids)
+        pair = {Player.X: bots[b0], Player.O: bots[b1]}
+        tc = _WORKER["time_control"]
+        moves = (_inline_moves(game, pair, tc) if _WORKER["inline"]
+                 else _controller_moves(game, pair, tc, (b0, b1)))
+        first = len(players)
+        final = None
+        for state, move, player in moves:
+            states.append(encode(state))
+            actions.append(to_action(move))
+            players.append(PLAYER_CODES[player])
+            final = (state, move, player)
+        if final is None:
+            continue
+        state, move, player = final
+        winner = game.winner(game.next_state(state, move, player))
+        results[winner.value if winner else "draw"] += 1
+        won = PLAYER_CODES[winner] if winner else 0
+        outcomes.extend(0 if not won else (1 if p == won else -1) for p in players[first:])
+
+    data = np.empty(len(players), dtype=sample_dtype(width))
+    if len(players):
+        data["state"] = np.frombuffer(b"".join(states), dtype=np.uint8).reshape(-1, width)
+    data["action"] = actions
+    data["player"] = players
+    data["outcome"] = outcomes
+    name = f"chunk_{index:06d}.npy"
+    tmp = os.path.join(out_dir, f".{name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, data)
+    os.replace(tmp, os.path.join(out_dir, name))
+    return {"file": name, "samples": len(players), "games": games, "results": results,
+            "bytes": os.path.getsize(os.path.join(out_dir, name))}
+
+
+# ---------- driver ----------
+
+def generate(game_code: str, games: int, out_dir: str, bots: Optional[List[str]] = None,
+             games_per_chunk: int = 10_000, workers: Optional[int] = None, seed: int = 0,
+             inline: bool = False, time_control: Optional[str] = None) -> Dict[str, Any]:
+    """Plays `games` matches and writes the dataset to `out_dir`; returns the manifest."""
+    require_numpy()
+    if game_code not in GAME_REGISTRY:
+        raise ValueError(f"Game {game_code} not supported")
+    time_control = resolve_time_control(time_control, METADATA.game(game_code)).spec
+    if games < 1 or games_per_chunk < 1:
+        raise ValueError("games and games_per_chunk must be >= 1")
+    meta_by_id = {b["id"]: b for b in list_bots(game_code)}
+    bots = bots or sorted(meta_by_id)
+    unknown = [b for b in bots if b not in meta_by_id]
+    if unknown:
+        raise ValueError(f"Unknown bot id(s): {', '.join(unknown)}")
+    if os.path.exists(os.path.join(out_dir, MANIFEST)):
+        raise ValueError(f"{out_dir} already holds a dataset")
+    os.makedirs(out_dir, exist_ok=True)
+
+    bot_files = {b: meta_by_id[b]["file"] for b in bots}
+    width = state_width(GAME_REGISTRY[game_code]())
+    n_chunks = math.ceil(games / games_per_chunk)
+    tasks = [(i, min(games_per_chunk, games - i * games_per_chunk), seed, out_dir) for i in range(n_chunks)]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = min(workers, n_chunks)
+
+    manifest: Dict[str, Any] = {
+        "format": FORMAT, "version": VERSION, "game": game_code, "bots": bots,
+        "mode": "inline" if inline else "controller", "time_control": time_control, "seed": seed,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "state_width": width, "dtype": sample_dtype(width).descr,
+        "chunks": [], "games": 0, "samples": 0, "bytes": 0,
+        "results": {"X": 0, "O": 0, "draw": 0}, "elapsed_s": None, "samples_per_s": None,
+    }
+    logger.info(f"Self-play start: game={game_code} games={games} chunks={n_chunks} workers={workers} → {out_dir}")
+    started = time.perf_counter()
+
+    def collect(chunks: Iterator[Dict[str, Any]]) -> None:
+        for chunk in chunks:
+            manifest["chunks"].append(chunk)
+            for key in ("games", "samples", "bytes"):
+                manifest[key] += chunk[key]
+            for key, n in chunk["results"].items():
+                manifest["results"][key] += n
+            manifest["elapsed_s"] = round(time.perf_counter() - started, 3)
+            manifest["samples_per_s"] = round(manifest["samples"] / max(manifest["elapsed_s"], 1e-9))
+            write_json_atomic(os.path.join(out_dir, MANIFEST), manifest)
+            logger.debug(f"Self-play chunk {chunk['file']}: {chunk['samples']} samples")
+
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(game_code, bot_files, time_control, inline)) as pool:
+            collect(pool.map(_generate_chunk, *zip(*tasks)))
+    else:
+        _init_worker(game_code, bot_files, time_control, inline)
+        collect(_generate_chunk(*t) for t in tasks)
+
+    logger.success(
+        f"Self-play finished: {manifest['games']} games, {manifest['samples']} samples, "
+        f"{manifest['bytes'] / 1e6:.1f} MB in {manifest['elapsed_s']:.2f}s ({manifest['samples_per_s']} samples/s)"
+    )
+    return manifest
+
+
+def load(out_dir: str, mmap: bool = True) -> Tuple[Dict[str, Any], List[Any]]:
+    """(manifest, chunk arrays), memory-mapped unless mmap=False."""
+    np = require_numpy()
+    manifest = read_json(os.path.join(out_dir, MANIFEST), None)
+    if not manifest or manifest.get("format") != FORMAT:
+        raise ValueError(f"{out_dir} is not a self-play dataset")
+    mode = "r" if mmap else None
+    return manifest, [np.load(os.path.join(out_dir, c["file"]), mmap_mode=mode) for c in manifest["chunks"]]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a self-play training dataset.")
+    parser.add_argument("--game", required=True)
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--bots", nargs="*", help="bot ids drawn for each side of every game (default: all)")
+    parser.add_argument("--out", help="output directory (default: arena_data/selfplay/<game>_<time>)")
+    parser.add_argument("--games-per-chunk", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None, help="0 plays inline in this process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inline", action="store_true", help="call bots directly, without enforcing the clock")
+    parser.add_argument("--time-control", default=None, help="fixed:S, fischer:S+INC or nodes:N[/S]")
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.join(SELFPLAY_DIR, f"{args.game}_{datetime.datetime.now():%Y%m%d_%H%M%S}")
+    manifest = generate(args.game, args.games, out, bots=args.bots, games_per_chunk=args.games_per_chunk,
+                        workers=args.workers, seed=args.seed, inline=args.inline, time_control=args.time_control)
+    print(f"{manifest['samples']} samples from {manifest['games']} games in {len(manifest['chunks'])} chunks "
+          f"({manifest['bytes'] / 1e6:.1f} MB, {manifest['samples_per_s']} samples/s) → {out}")
+
+
+if __name__ == "__main__":
+    main()
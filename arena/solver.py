@@ -0,0 +1,292 @@
+"""Strong solver for small games by retrograde analysis.
+
+`solve(game)` enumerates every position reachable from `initial_state()` via
+`legal_moves`/`next_state`, then propagates results backwards from the
+terminal positions: a position is won as soon as one move reaches a position
+won for its mover, lost once every move reaches a position lost for it, and a
+draw otherwise. Positions are processed in order of distance to the end, so the
+stored move wins as fast as possible and loses as slowly as possible. Positions
+that never resolve (cycles) are draws.
+
+The table maps `game.encode_state(state)` to (outcome, best move, plies to the
+end) and is persisted as a compact binary file; `best_move(state)` is one dict
+lookup. Moves must be ints in [-1, 32767].
+
+    TABLE = load_or_solve(TicTacToe())          # arena_data/solved/tic_tac_toe.bin
+    def choose_move(state, legal_moves, player, game):
+        return TABLE.best_move(state)
+
+Every table records a fingerprint of the game (code, `rules_version` and the
+encodings and moves of its first positions) and its number of positions;
+load_or_solve solves again when either does not match, so a table left over
+from older rules or another `encode_state` is not reused. Bump the game's
+`rules_version` for rule changes the first positions do not show.
+
+CLI:
+    python -m arena.solver tic_tac_toe [--out path]
+
+Scaling path. The in-memory enumeration suits games up to a few million
+positions (tic-tac-toe: 5,478; eleven_sticks: 22). Connect-4 (about 4.5e12
+positions) needs a different layout, not a different API: rank positions with a
+perfect hash so the key is an index instead of stored bytes, pack the outcome
+into 2 bits per position in a memory-mapped file (best moves are recomputed by
+probing the children's outcomes), solve level by level (by number of pieces)
+so only two levels are in memory at once, and ship a shallow opening book plus
+search (arena.search) instead of the full table.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import struct
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging_config import logger
+from .core import Player, Move
+from .game_base import Game
+from .batch import NONE, PLAYER_CODES, CODE_PLAYERS
+from .filestorage import DATA_DIR
+
+SOLVED_DIR = os.path.join(DATA_DIR, "solved")
+
+_MAGIC = b"ARSOLVE2"
+_HEADER = struct.Struct("<8sHI8s")    # magic, game code length, number of positions, game fingerprint
+_ENTRY = struct.Struct("<BhH")        # outcome, best move (-1 = none), plies to the end
+UNKNOWN_DISTANCE = 0xFFFF
+FINGERPRINT_POSITIONS = 256           # positions (breadth-first) hashed into the fingerprint
+
+Entry = Tuple[int, int, int]  # (outcome: NONE/X/O, best move, plies to the end)
+
+
+def fingerprint(game: Game) -> bytes:
+    """8-byte digest of the game code, its rules_version and the encodings and
+    legal moves of its first FINGERPRINT_POSITIONS positions (breadth-first)."""
+    h = hashlib.sha256()
+    h.update(f"{game.code}|{game.rules_version}".encode())
+    start = game.initial_state()
+    queue, seen = deque([start]), {game.encode_state(start)}
+    while queue and len(seen) <= FINGERPRINT_POSITIONS:
+        state = queue.popleft()
+        key = game.encode_state(state)
+        h.update(bytes([len(key)]) + key)
+        if game.is_terminal(state):
+            h.update(b"T")
+            continue
+        for move in game.legal_moves(state, state.to_move):
+            child = game.next_state(state, move, state.to_move)
+            h.update(repr(move).encode())
+            child_key = game.encode_state(child)
+            if child_key not in seen:
+                seen.add(child_key)
+                queue.append(child)
+    return h.digest()[:8]
+
+
+class SolvedTable:
+    def __init__(self, game_code: str, entries: Dict[bytes, Entry], encode: Any = None,
+                 fingerprint: bytes = b"", positions: Optional[int] = None):
+        self.game_code = game_code
+        self.entries = entries
+        self._encode = encode
+        self.fingerprint = fingerprint
+        self.positions = len(entries) if positions is None else positions  # as recorded in the file
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def bind(self, game: Game) -> "SolvedTable":
+        self._encode = game.encode_state
+        return self
+
+    def lookup(self, state: Any) -> Optional[Entry]:
+        return self.entries.get(self._encode(state))
+
+    def best_move(self, state: Any) -> Optional[Move]:
+        entry = self.entries.get(self._encode(state))
+        if entry is None or entry[1] < 0:
+            return None
+        return entry[1]
+
+    def outcome(self, state: Any) -> Optional[Player]:
+        """Winner under perfect play (None for a draw); raises KeyError for unknown positions."""
+        return CODE_PLAYERS.get(self.entries[self._encode(state)][0])
+
+    # ---------- persistence ----------
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        code = self.game_code.encode()
+        parts = [_HEADER.pack(_MAGIC, len(code), len(self.entries), self.fingerprint), code]
+        for key, (outcome, move, dist) in self.entries.items():
+            parts.append(bytes([len(key)]) + key + _ENTRY.pack(outcome, move, dist))
+        tmp = f"{path}.{os.getpid()}.tmp"  # bot processes may solve concurrently
+        with open(tmp, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SolvedTable":
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, code_len, count, digest = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a solved-game table (or has an older format)")
+        pos = _HEADER.size
+        code = data[pos:pos + code_len].decode()
+        pos += code_len
+        entries: Dict[bytes, Entry] = {}
+        unpack = _ENTRY.unpack_from
+        try:
+            for _ in range(count):
+                n = data[pos]
+                key = data[pos + 1:pos + 1 + n]
+                pos += 1 + n
+                entries[key] = unpack(data, pos)
+                pos += _ENTRY.size
+        except (IndexError, struct.error):
+            pass  # truncated: reported below
+        if pos != len(data) or len(entries) != count:
+            raise ValueError(f"{path} holds {len(entries)} positions, its header says {count}")
+        return cls(code, entries, fingerprint=digest, positions=count)
+
+
+def _better(a: Entry, b: Optional[Entry]) -> bool:
+    # preference among non-winning options: draw, then the slowest loss
+    if b is None:
+        return True
+    a_draw, b_draw = a[0] == NONE, b[0] == NONE
+    if a_draw != b_draw:
+        return a_draw
+    return not a_draw and a[2] > b[2]
+
+
+def solve(game: Game) -> SolvedTable:
+    started = time.perf_counter()
+    encode = game.encode_state
+
+    # enumerate reachable positions; edges are stored as predecessor lists
+    root = game.initial_state()
+    ids: Dict[bytes, int] = {encode(root): 0}
+    keys: List[bytes] = [encode(root)]
+    movers: List[int] = []
+    remaining: List[int] = []          # unresolved moves per position
+    preds: List[List[Tuple[int, Move]]] = [[]]
+    outcome: List[Optional[int]] = []
+    dist: List[int] = []
+    best: List[int] = []
+    terminal: List[int] = []
+
+    frontier = deque([root])
+    while frontier:
+        state = frontier.popleft()
+        i = len(movers)
+        movers.append(PLAYER_CODES[state.to_move])
+        dist.append(0)
+        best.append(-1)
+        if game.is_terminal(state):
+            w = game.winner(state)
+            outcome.append(PLAYER_CODES[w] if w else NONE)
+            remaining.append(0)
+            terminal.append(i)
+            continue
+        outcome.append(None)
+        moves = game.legal_moves(state, state.to_move)
+        remaining.append(len(moves))
+        for move in moves:
+            child = game.next_state(state, move, state.to_move)
+            key = encode(child)
+            j = ids.get(key)
+            if j is None:
+                j = ids[key] = len(keys)
+                keys.append(key)
+                preds.append([])
+                frontier.append(child)
+            preds[j].append((i, move))
+    n = len(keys)
+
+    # retrograde propagation, closest to the end first
+    fallback: List[Optional[Entry]] = [None] * n
+    queue = deque(terminal)
+    while queue:
+        j = queue.popleft()
+        res = outcome[j]
+        for i, move in preds[j]:
+            if outcome[i] is not None:
+                continue
+            if res == movers[i]:
+                outcome[i], best[i], dist[i] = res, move, dist[j] + 1
+                queue.append(i)
+                continue
+            option = (res, move, dist[j] + 1)
+            if _better(option, fallback[i]):
+                fallback[i] = option
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                outcome[i], best[i], dist[i] = fallback[i]
+                queue.append(i)
+
+    unresolved = 0
+    for i in range(n):
+        if outcome[i] is None:  # only on cycles: neither side can force a result
+            unresolved += 1
+            outcome[i], dist[i] = NONE, UNKNOWN_DISTANCE
+            best[i] = fallback[i][1] if fallback[i] and fallback[i][0] == NONE else -1
+    if unresolved:
+        # a draw by repetition: play any move that is not a forced loss
+        for j in range(n):
+            if dist[j] == UNKNOWN_DISTANCE:
+                for i, move in preds[j]:
+                    if dist[i] == UNKNOWN_DISTANCE and best[i] < 0:
+                        best[i] = move
+
+    entries = {keys[i]: (outcome[i], best[i], dist[i]) for i in range(n)}
+    logger.info(
+        f"Solved {game.code}: {n} positions ({len(terminal)} terminal) in "
+        f"{time.perf_counter() - started:.2f}s, root outcome "
+        f"{CODE_PLAYERS.get(entries[keys[0]][0], 'draw')}"
+    )
+    return SolvedTable(game.code, entries, encode, fingerprint(game))
+
+
+def table_path(game_code: str) -> str:
+    return os.path.join(SOLVED_DIR, f"{game_code}.bin")
+
+
+def load_or_solve(game: Game, path: Optional[str] = None) -> SolvedTable:
+    """Loads the game's table from disk, solving and saving it on first use or
+    when the stored table was built for another version of the game."""
+    path = path or table_path(game.code)
+    if os.path.exists(path):
+        try:
+            table = SolvedTable.load(path)
+            if table.game_code == game.code and table.fingerprint == fingerprint(game):
+                return table.bind(game)
+            logger.info(f"Solved table {path} was built for another version of {game.code}; solving again")
+        except (OSError, ValueError, IndexError, struct.error) as e:
+            logger.warning(f"Ignoring unreadable solved table {path}: {e}")
+    table = solve(game)
+    try:
+        table.save(path)
+    except OSError as e:
+        logger.warning(f"Could not save solved table {path}: {e}")
+    return table
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .games import GAME_REGISTRY
+
+    parser = argparse.ArgumentParser(description="Solve a game by retrograde analysis.")
+    parser.add_argument("game", choices=sorted(GAME_REGISTRY))
+    parser.add_argument("--out", default=None, help="table path (default: arena_data/solved/<game>.bin)")
+    args = parser.parse_args(argv)
+
+    table = solve(GAME_REGISTRY[args.game]())
+    path = table.save(args.out or table_path(args.game))
+    print(f"{len(table)} positions written to {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,44 @@
+
+import argparse
+import os
+from typing import List, Optional
+
 import uvicorn
 from .logging_config import logger
+from .writer import FLUSH_MS, MAX_BATCH, start_writer
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the arena API server.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("ARENA_WORKERS", "1")),
+                        help="API worker processes; more than 1 starts a result writer process")
+    parser.add_argument("--flush-ms", type=float, default=FLUSH_MS,
+                        help="how long the result writer collects matches before committing a batch")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="matches per writer batch at most")
+    args = parser.parse_args(argv)
 
-def main():
     logger.info("Starting Arena with loguru logging")
-    uvicorn.run(
-        "arena.api_server:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=False,
-        log_config=None,   # desativa logger padrão do uvicorn
-    )
+    writer = None
+    if args.workers > 1:
+        # workers inherit the writer's address and key through the environment
+        writer, address, authkey = start_writer(args.flush_ms / 1000, args.max_batch)
+        os.environ["ARENA_WRITER_ADDRESS"] = address
+        os.environ["ARENA_WRITER_AUTHKEY"] = authkey
+        logger.info(f"Serving with {args.workers} workers, results written by process {writer.pid}")
+    try:
+        uvicorn.run(
+            "arena.api_server:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            reload=False,
+            log_config=None,   # desativa logger padrão do uvicorn
+        )
+    finally:
+        if writer is not None:
+            writer.terminate()  # SIGTERM: the writer commits what it holds, then exits
+            writer.join(timeout=30)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+"""Time controls for matches and the per-move context bots can receive.
+
+A time control is written as a short spec string:
+
+    fixed:0.5          0.5 s per move (a bare number means the same)
+    fischer:5+0.1      5 s on each side's clock, 0.1 s added after every move
+    nodes:20000        a 20000-node/iteration budget per move, with the
+    nodes:20000/2      default (or given) time cap in seconds as a backstop
+
+The effective control of a match is, in order: the one requested for the
+match (`/play?tc=...`, tournament `time_control`), the game's
+`"time_control"` key in arena_data/games/<game>.json, then
+ARENA_TIME_CONTROL (default fixed:0.5). Controls requested by clients are
+refused when a single move could take longer than ARENA_MAX_MOVE_SECONDS
+(default 10), so a request cannot hold a match slot for hours.
+
+Each side gets a Clock. Before a move the controller asks it for a
+MoveContext (the hard budget enforced on the bot, deadlines and what is left
+on the clock). After the move it charges the time used and records the
+returned clock state on the move.
+
+Bots whose choose_move takes a fifth argument receive the MoveContext:
+
+    def choose_move(state, legal_moves, player, game, ctx):
+        return SEARCH.best_move(state, player, deadline=ctx.soft_deadline, iterations=ctx.nodes)
+
+Four-argument bots are called exactly as before.
+"""
+from __future__ import annotations
+import inspect
+import math
+import os
+import time
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_SPEC = os.environ.get("ARENA_TIME_CONTROL", "fixed:0.5")
+MAX_MOVE_SECONDS = float(os.environ.get("ARENA_MAX_MOVE_SECONDS", "10"))  # for requested controls
+SOFT_FRACTION = 0.8      # share of a per-move budget a bot is advised to use
+MOVES_TO_GO = 20         # Fischer: the remaining time is spread over this many moves
+NODES_TIME_CAP = 5.0     # default backstop for node budgets, in seconds
+_EXPECTED = "expected fixed:S, fischer:S+INC or nodes:N[/S]"
+
+
+@dataclass(frozen=True)
+class MoveContext:
+    time_control: str           # spec of the match's time control
+    budget: float               # hard limit for this move; the move is replaced after it
+    deadline: float             # time.perf_counter() value of that limit
+    soft_deadline: float        # advised time.perf_counter() value to answer by
+    remaining: Optional[float]  # time left on a Fischer clock before this move
+    increment: float            # Fischer increment added after the move
+    nodes: Optional[int]        # node/iteration budget for node-count controls
+    ply: int                    # moves already played in the match
+
+    @classmethod
+    def start(cls, time_control: str, budget: float, soft_budget: float, remaining: Optional[float] = None,
+              increment: float = 0.0, nodes: Optional[int] = None, ply: int = 0) -> "MoveContext":
+        """Context whose deadlines count from now."""
+        now = time.perf_counter()
+        return cls(time_control, budget, now + budget, now + soft_budget, remaining, increment, nodes, ply)
+
+    def to_wire(self) -> Tuple:
+        """Plain tuple for another process; deadlines travel as the time left."""
+        now = time.perf_counter()
+        return (self.time_control, max(0.0, self.deadline - now), max(0.0, self.soft_deadline - now),
+                self.remaining, self.increment, self.nodes, self.ply)
+
+    @classmethod
+    def from_wire(cls, wire: Tuple) -> "MoveContext":
+        return cls.start(*wire)
+
+
+class Clock(ABC):
+    @abstractmethod
+    def context(self, ply: int) -> MoveContext: ...
+
+    @abstractmethod
+    def charge(self, elapsed: float) -> Dict[str, Any]:
+        """Accounts a finished move and returns the clock state to record with it."""
+
+
+class TimeControl(ABC):
+    spec: str
+    longest_move: float  # hard limit of the longest move a clock can allow, in seconds
+
+    @abstractmethod
+    def new_clock(self) -> Clock: ...
+
+    def __str__(self) -> str:
+        return self.spec
+
+
+class FixedTime(TimeControl):
+    def __init__(self, per_move: float = 0.5):
+        if not (math.isfinite(per_move) and per_move > 0):
+            raise ValueError("per-move time must be a positive number of seconds")
+        self.per_move = per_move
+        self.longest_move = per_move
+        self.spec = f"fixed:{per_move:g}"
+
+    def new_clock(self) -> Clock:
+        return _FixedClock(self)
+
+
+class _FixedClock(Clock):
+    def __init__(self, tc: FixedTime):
+        self.tc = tc
+
+    def context(self, ply: int) -> MoveContext:
+        return MoveContext.start(self.tc.spec, self.tc.per_move, self.tc.per_move * SOFT_FRACTION, ply=ply)
+
+    def charge(self, elapsed: float) -> Dict[str, Any]:
+        return {"budget": self.tc.per_move}
+
+
+class Fischer(TimeControl):
+    def __init__(self, initial: float, increment: float = 0.0):
+        if not (math.isfinite(initial) and math.isfinite(increment) and initial > 0 and increment >= 0):
+            raise ValueError("Fischer clock needs a positive initial time and a non-negative increment")
+        self.initial = initial
+        self.increment = increment
+        self.longest_move = initial + increment  # the clock only grows past this by saving time
+        self.spec = f"fischer:{initial:g}+{increment:g}"
+
+    def new_clock(self) -> Clock:
+        return _FischerClock(self)
+
+
+class _FischerClock(Clock):
+    def __init__(self, tc: Fischer):
+        self.tc = tc
+        self.remaining = tc.initial
+        self._budget = tc.initial
+
+    def context(self, ply: int) -> MoveContext:
+        # the whole clock is the hard limit; the advice spreads it over the game
+        self._budget = self.remaining
+        soft = min(self.remaining * SOFT_FRACTION, self.remaining / MOVES_TO_GO + self.tc.increment * SOFT_FRACTION)
+        return MoveContext.start(self.tc.spec, self.remaining, soft, self.remaining, self.tc.increment, ply=ply)
+
+    def charge(self, elapsed: float) -> Dict[str, Any]:
+        self.remaining = max(0.0, self.remaining - elapsed) + self.tc.increment
+        return {"budget": round(self._budget, 4), "remaining": round(self.remaining, 4)}
+
+
+class NodeBudget(TimeControl):
+    def __init__(self, nodes: int, time_cap: float = NODES_TIME_CAP):
+        if nodes < 1 or not (math.isfinite(time_cap) and time_cap > 0):
+            raise ValueError("node budget needs nodes >= 1 and a positive time cap")
+        self.nodes = nodes
+        self.time_cap = time_cap
+        self.longest_move = time_cap
+        self.spec = f"nodes:{nodes}/{time_cap:g}"
+
+    def new_clock(self) -> Clock:
+        return _NodeClock(self)
+
+
+class _NodeClock(Clock):
+    def __init__(self, tc: NodeBudget):
+        self.tc = tc
+
+    def context(self, ply: int) -> MoveContext:
+        return MoveContext.start(self.tc.spec, self.tc.time_cap, self.tc.time_cap * SOFT_FRACTION,
+                                 nodes=self.tc.nodes, ply=ply)
+
+    def charge(self, elapsed: float) -> Dict[str, Any]:
+        return {"budget": self.tc.time_cap, "nodes": self.tc.nodes}
+
+
+def parse(spec: str) -> TimeControl:
+    """TimeControl for a spec string (see the module docstring); raises ValueError."""
+    kind, _, arg = spec.strip().partition(":")
+    try:
+        if not arg:
+            return FixedTime(float(kind))
+        if kind == "fixed":
+            return FixedTime(float(arg))
+        if kind == "fischer":
+            initial, _, inc = arg.partition("+")
+            return Fischer(float(initial), float(inc or 0))
+        if kind == "nodes":
+            nodes, _, cap = arg.partition("/")
+            return NodeBudget(int(nodes), float(cap) if cap else NODES_TIME_CAP)
+    except ValueError as e:
+        raise ValueError(f"Invalid time control {spec!r} ({e}), {_EXPECTED}") from None
+    raise ValueError(f"Invalid time control {spec!r}, {_EXPECTED}")
+
+
+def parse_request(spec: str, limit: float = MAX_MOVE_SECONDS) -> TimeControl:
+    """parse() for a client-supplied spec: also raises ValueError when a move
+    could take longer than `limit` seconds."""
+    tc = parse(spec)
+    if tc.longest_move > limit:
+        raise ValueError(f"Time control {tc.spec} allows {tc.longest_move:g} s for a move, "
+                         f"the server allows at most {limit:g} s")
+    return tc
+
+
+def resolve(requested: Optional[str] = None, game_meta: Optional[Dict[str, Any]] = None,
+            limit: Optional[float] = None) -> TimeControl:
+    """The match's control: the requested one, else the game's default, else
+    ARENA_TIME_CONTROL. With `limit` the requested one goes through parse_request."""
+    if requested:
+        return parse(requested) if limit is None else parse_request(requested, limit)
+    if game_meta and game_meta.get("time_control"):
+        return parse(str(game_meta["time_control"]))
+    return parse(DEFAULT_SPEC)
+
+
+# weak keys: a hot-reloaded bot module's old functions (and globals) must not be kept alive
+_ARITY_CACHE: "weakref.WeakKeyDictionary[Any, bool]" = weakref.WeakKeyDictionary()
+
+
+def wants_context(fn: Callable) -> bool:
+    """True if the bot callable accepts a fifth (context) argument."""
+    try:
+        return _ARITY_CACHE[fn]
+    except (KeyError, TypeError):
+        pass
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        result = False
+    else:
+        positional = [p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+        result = len(positional) >= 5 or any(p.kind == p.VAR_POSITIONAL for p in params)
+    try:
+        _ARITY_CACHE[fn] = result
+    except TypeError:
+        pass  # not hashable or not weak-referenceable
+    return result
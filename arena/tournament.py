@@ -0,0 +1,376 @@
+"""Batch tournaments: many matches between a set of bots, sharded over a process pool.
+
+Matches are played in worker processes that load the game and every bot once
+(at pool start-up); with ARENA_BOT_SANDBOX=1 the bots run in the sandbox pool
+and the matches in threads instead. A few chunks per worker are in flight at
+a time. Workers send back the games they played, in order: full match records
+when committing, only (bot0, bot1, winner) otherwise. With commit=True each
+chunk is appended to the match log as it arrives and the leaderboard and
+ratings are updated in a single batch, in the order the games were played,
+when the tournament is over. Behind a result writer (multi-worker serving)
+the chunks go to the writer instead, which stores and counts them in the
+same order.
+
+CLI usage:
+    python -m arena.tournament --game tic_tac_toe --format swiss --repetitions 1000
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import math
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .logging_config import logger
+from .controllers import MatchController
+from .filestorage import list_bots, BOTS_DIR
+from .leaderboard import get_store
+from .matchstore import get_match_store
+from .metadata import METADATA
+from .sandbox import SANDBOX_ENABLED, load_bot
+from .timecontrol import parse as parse_time_control, resolve as resolve_time_control
+from .writer import get_writer_client
+from .core import Player
+from .games import GAME_REGISTRY
+
+FORMATS = ("round_robin", "double_round_robin", "swiss")
+# upper bounds for tournaments requested through the API
+MAX_REPETITIONS = int(os.environ.get("ARENA_TOURNAMENT_MAX_REPETITIONS", "1000"))
+MAX_ROUNDS = int(os.environ.get("ARENA_TOURNAMENT_MAX_ROUNDS", "64"))
+MAX_WORKERS = os.cpu_count() or 1
+_RESULT_INDEX = {Player.X.value: 0, Player.O.value: 1, "draw": 2}
+
+Pairing = Tuple[str, str]  # (bot playing X, bot playing O)
+GameResult = Tuple[str, str, str]  # (bot0, bot1, winner)
+
+
+@dataclass
+class TournamentSpec:
+    game: str
+    bots: List[str]
+    format: str = "round_robin"
+    repetitions: int = 1
+    rounds: Optional[int] = None        # swiss only; defaults to ceil(log2(len(bots)))
+    workers: Optional[int] = None       # None = os.cpu_count(), 0 = play inline
+    chunk_size: Optional[int] = None    # matches per task sent to a worker
+    time_limit: Optional[float] = None  # shorthand for time_control="fixed:<seconds>"
+    time_control: Optional[str] = None  # default: the game's time_control, then ARENA_TIME_CONTROL
+
+    def effective_time_control(self) -> str:
+        requested = self.time_control or (f"fixed:{self.time_limit:g}" if self.time_limit else None)
+        return resolve_time_control(requested, METADATA.game(self.game)).spec
+
+    def validate(self) -> None:
+        if self.game not in GAME_REGISTRY:
+            raise ValueError(f"Game {self.game} not supported")
+        GAME_REGISTRY[self.game]  # raises GamePluginError here rather than in every worker
+        self.effective_time_control()  # raises ValueError on a bad spec
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown format {self.format}, expected one of {FORMATS}")
+        if len(set(self.bots)) != len(self.bots):
+            raise ValueError("Duplicate bot ids in tournament")
+        if len(self.bots) < 2:
+            raise ValueError("A tournament needs at least two bots")
+        if self.repetitions < 1:
+            raise ValueError("repetitions must be >= 1")
+        known = {b["id"] for b in list_bots(self.game)}
+        unknown = [b for b in self.bots if b not in known]
+        if unknown:
+            raise ValueError(f"Unknown bot id(s): {', '.join(unknown)}")
+
+
+@dataclass
+class TournamentResult:
+    spec: TournamentSpec
+    # (bot0, bot1) -> [bot0 wins, bot1 wins, draws]
+    pairs: Dict[Pairing, List[int]] = field(default_factory=lambda: defaultdict(lambda: [0, 0, 0]))
+    byes: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # (bot0, bot1, winner) of every game in the order played; kept only when committing
+    results: List[GameResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def matches(self) -> int:
+        return sum(sum(c) for c in self.pairs.values())
+
+    def add(self, games: List[GameResult], keep: bool = False) -> None:
+        for b0, b1, winner in games:
+            self.pairs[(b0, b1)][_RESULT_INDEX[winner]] += 1
+        if keep:
+            self.results.extend(games)
+
+    def leaderboard_deltas(self) -> Dict[str, Dict[str, int]]:
+        deltas: Dict[str, Dict[str, int]] = {}
+        for (b0, b1), (w0, w1, d) in self.pairs.items():
+            for bot, wins, losses in ((b0, w0, w1), (b1, w1, w0)):
+                s = deltas.setdefault(bot, {"wins": 0, "losses": 0, "draws": 0, "games": 0})
+                s["wins"] += wins
+                s["losses"] += losses
+                s["draws"] += d
+                s["games"] += wins + losses + d
+        return deltas
+
+    def match_results(self) -> List[GameResult]:
+        """Individual (bot0, bot1, winner) results in the order they were played."""
+        return list(self.results)
+
+    def points(self) -> Dict[str, float]:
+        pts = {b: float(self.byes.get(b, 0)) for b in self.spec.bots}
+        for bot, s in self.leaderboard_deltas().items():
+            pts[bot] += s["wins"] + 0.5 * s["draws"]
+        return pts
+
+    def standings(self) -> List[Dict[str, Any]]:
+        deltas = self.leaderboard_deltas()
+        pts = self.points()
+        rows = []
+        for bot in self.spec.bots:
+            s = deltas.get(bot, {"wins": 0, "losses": 0, "draws": 0, "games": 0})
+            rows.append({"bot": bot, "points": pts[bot], **s,
+                         "win_rate": s["wins"] / s["games"] if s["games"] else 0.0})
+        rows.sort(key=lambda r: (-r["points"], -r["win_rate"], r["bot"]))
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "game": self.spec.game,
+            "format": self.spec.format,
+            "repetitions": self.spec.repetitions,
+            "time_control": self.spec.effective_time_control(),
+            "matches": self.matches,
+            "elapsed": round(self.elapsed, 3),
+            "standings": self.standings(),
+            "pairs": [
+                {"bot0": b0, "bot1": b1, "bot0_wins": c[0], "bot1_wins": c[1], "draws": c[2]}
+                for (b0, b1), c in sorted(self.pairs.items())
+            ],
+        }
+
+
+# ---------- Pairings ----------
+
+def round_robin(bots: List[str], repetitions: int) -> List[Pairing]:
+    pairs = [(a, b) for i, a in enumerate(bots) for b in bots[i + 1:]]
+    return [p for p in pairs for _ in range(repetitions)]
+
+
+def double_round_robin(bots: List[str], repetitions: int) -> List[Pairing]:
+    pairs = round_robin(bots, repetitions)
+    return pairs + [(b, a) for a, b in pairs]
+
+
+def swiss_round(bots: List[str], points: Dict[str, float], played: set,
+                repetitions: int) -> Tuple[List[Pairing], Optional[str]]:
+    """Pair bots with similar scores, avoiding rematches where possible.
+    Each pairing is played `repetitions` times with alternating sides."""
+    order = sorted(bots, key=lambda b: (-points.get(b, 0.0), b))
+    bye = None
+    if len(order) % 2:
+        # lowest ranked bot that has not had a bye yet sits out
+        bye = next((b for b in reversed(order) if (b, None) not in played), order[-1])
+        order.remove(bye)
+        played.add((bye, None))
+
+    pairs: List[Pairing] = []
+    while order:
+        a = order.pop(0)
+        opp = next((b for b in order if frozenset((a, b)) not in played), order[0])
+        order.remove(opp)
+        played.add(frozenset((a, opp)))
+        for i in range(repetitions):
+            pairs.append((a, opp) if i % 2 == 0 else (opp, a))
+    return pairs, bye
+
+
+# ---------- Worker side ----------
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _make_worker(game_code: str, bot_files: Dict[str, str], time_control: str) -> Dict[str, Any]:
+    # bots are built like the API builds them, so ARENA_BOT_SANDBOX applies here too
+    return {
+        "game": GAME_REGISTRY[game_code](),
+        "bots": {bid: load_bot(BOTS_DIR, f) for bid, f in bot_files.items()},
+        "time_control": parse_time_control(time_control),
+    }
+
+
+def _init_worker(game_code: str, bot_files: Dict[str, str], time_control: str) -> None:
+    _WORKER.update(_make_worker(game_code, bot_files, time_control))
+
+
+def _play_chunk(pairs: List[Pairing], full: bool, worker: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """Plays the pairings in order and returns one match-log record per game,
+    or just its (bot0, bot1, winner) when `full` is false. `worker` is the
+    game and bots to use; worker processes use the ones set up by _init_worker."""
+    worker = worker or _WORKER
+    game = worker["game"]
+    bots = worker["bots"]
+    records: List[Any] = []
+    for b0, b1 in pairs:
+        controller = MatchController(game, bots[b0], bots[b1], bot_ids=(b0, b1),
+                                     time_control=worker["time_control"])
+        result = controller.run()
+        if not full:
+            records.append((b0, b1, result["winner"]))
+            continue
+        records.append({
+            "ts": time.time(), "game": game.code, "bot0": b0, "bot1": b1, "winner": result["winner"],
+            "moves": result["moves"], "final_board": list(result["final_state"].board),
+            "winning_line": result["winning_line"], "fallbacks": result["fallbacks"],
+            "time_control": result["time_control"], "source": "tournament",
+        })
+    return records
+
+
+# ---------- Driver ----------
+
+def _chunks(pairs: List[Pairing], size: int) -> List[List[Pairing]]:
+    return [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+
+def _played_chunks(chunks: List[List[Pairing]], pool: Optional[Executor], in_flight: int,
+                   full: bool, worker: Optional[Dict[str, Any]]) -> Iterator[List[Any]]:
+    """Yields each chunk's games in schedule order, with at most `in_flight`
+    chunks submitted to the pool at a time."""
+    if pool is None:
+        for chunk in chunks:
+            yield _play_chunk(chunk, full, worker)
+        return
+    todo = iter(chunks)
+    futures: deque = deque(pool.submit(_play_chunk, c, full, worker) for c in itertools.islice(todo, in_flight))
+    while futures:
+        games = futures.popleft().result()
+        chunk = next(todo, None)
+        if chunk is not None:
+            futures.append(pool.submit(_play_chunk, chunk, full, worker))
+        yield games
+
+
+class _Run:
+    """How a tournament is played and where its games go."""
+
+    def __init__(self, pool: Optional[Executor], worker: Optional[Dict[str, Any]],
+                 chunk_size: int, in_flight: int, commit: bool):
+        self.pool = pool
+        self.worker = worker          # None when the pool's processes set up their own
+        self.chunk_size = chunk_size
+        self.in_flight = in_flight
+        self.commit = commit
+        # multi-worker serving: the result writer stores and counts the games
+        self.writer = get_writer_client() if commit else None
+
+
+def _run_pairs(pairs: List[Pairing], result: TournamentResult, run: _Run) -> None:
+    chunks = _chunks(pairs, run.chunk_size)
+    for records in _played_chunks(chunks, run.pool, run.in_flight, run.commit, run.worker):
+        if run.writer is not None:
+            run.writer.record_many(records)
+        elif run.commit:
+            get_match_store().append_many(records)
+        if run.commit:
+            records = [(r["bot0"], r["bot1"], r["winner"]) for r in records]
+        result.add(records, keep=run.commit)
+
+
+def run_tournament(spec: TournamentSpec, commit: bool = True) -> TournamentResult:
+    spec.validate()
+    meta_by_id = {b["id"]: b for b in list_bots(spec.game)}
+    bot_files = {b: meta_by_id[b]["file"] for b in spec.bots}
+    time_control = spec.effective_time_control()
+
+    n_bots = len(spec.bots)
+    if spec.format == "round_robin":
+        schedule = [round_robin(spec.bots, spec.repetitions)]
+    elif spec.format == "double_round_robin":
+        schedule = [double_round_robin(spec.bots, spec.repetitions)]
+    else:
+        schedule = None  # swiss pairings depend on previous rounds
+    rounds = spec.rounds or max(1, math.ceil(math.log2(n_bots)))
+    total = len(schedule[0]) if schedule else rounds * (n_bots // 2) * spec.repetitions
+
+    workers = (os.cpu_count() or 1) if spec.workers is None else spec.workers
+    chunk_size = spec.chunk_size or max(1, min(1000, math.ceil(total / max(1, workers * 4))))
+    in_flight = max(1, workers) * 2  # keeps every worker busy without queueing the whole schedule
+    logger.info(
+        f"Tournament start: game={spec.game} format={spec.format} bots={n_bots} "
+        f"matches={total} workers={workers} time_control={time_control}"
+    )
+
+    result = TournamentResult(spec)
+    started = time.perf_counter()
+    pool: Optional[Executor] = None
+    worker = None
+    if workers > 0 and SANDBOX_ENABLED:
+        # bots run in this process's sandbox pool: threads are enough to keep it busy
+        worker = _make_worker(spec.game, bot_files, time_control)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arena-tournament")
+    elif workers > 0:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(spec.game, bot_files, time_control),
+        )
+    else:
+        worker = _make_worker(spec.game, bot_files, time_control)
+    run = _Run(pool, worker, chunk_size, in_flight, commit)
+    try:
+        if schedule is not None:
+            _run_pairs(schedule[0], result, run)
+        else:
+            played: set = set()
+            for r in range(rounds):
+                pairs, bye = swiss_round(spec.bots, result.points(), played, spec.repetitions)
+                if bye is not None:
+                    result.byes[bye] += spec.repetitions
+                _run_pairs(pairs, result, run)
+                logger.debug(f"Swiss round {r + 1}/{rounds} done ({len(pairs)} matches)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    result.elapsed = time.perf_counter() - started
+
+    logger.success(
+        f"Tournament finished: {result.matches} matches in {result.elapsed:.2f}s "
+        f"({result.matches / max(result.elapsed, 1e-9):.0f} matches/s)"
+    )
+    if commit and run.writer is None:
+        get_store().record_results(spec.game, result.match_results())
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a batch tournament between arena bots.")
+    parser.add_argument("--game", required=True)
+    parser.add_argument("--bots", nargs="*", help="bot ids from metadata.json (default: all bots of the game)")
+    parser.add_argument("--format", choices=FORMATS, default="round_robin")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=None, help="number of swiss rounds")
+    parser.add_argument("--workers", type=int, default=None, help="0 plays inline in this process")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per move (fixed:<seconds>)")
+    parser.add_argument("--time-control", default=None, help="fixed:S, fischer:S+INC or nodes:N[/S]")
+    parser.add_argument("--no-commit", action="store_true", help="do not update the leaderboard")
+    args = parser.parse_args(argv)
+
+    bots = args.bots or [b["id"] for b in list_bots(args.game)]
+    spec = TournamentSpec(
+        game=args.game, bots=bots, format=args.format, repetitions=args.repetitions,
+        rounds=args.rounds, workers=args.workers, chunk_size=args.chunk_size,
+        time_limit=args.time_limit, time_control=args.time_control,
+    )
+    result = run_tournament(spec, commit=not args.no_commit)
+
+    print(f"{'bot':<24}{'points':>10}{'games':>8}{'wins':>8}{'draws':>8}{'losses':>8}")
+    for row in result.standings():
+        print(f"{row['bot']:<24}{row['points']:>10.1f}{row['games']:>8}{row['wins']:>8}"
+              f"{row['draws']:>8}{row['losses']:>8}")
+
+
+if __name__ == "__main__":
+    main()
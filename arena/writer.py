@@ -0,0 +1,246 @@
+"""Result writer process for multi-worker serving.
+
+With `python -m arena.start_server --workers N` the API runs in N uvicorn
+processes, and every finished match is handed to one writer process instead
+of being written by the worker that played it. The writer listens on a
+localhost multiprocessing.connection socket (authenticated with a per-start
+key), collects matches for up to ARENA_WRITER_FLUSH_MS milliseconds or
+ARENA_WRITER_MAX_BATCH matches, then commits the whole batch: one match-log
+append (`MatchStore.append_many`) and one leaderboard/ratings transaction
+per game (`record_results`), in arrival order. Each worker waits for the
+batch holding its match and gets the match id back, so `/play` still returns
+a stored match. Errors are reported per game: if one game's leaderboard
+transaction fails, its matches are still stored and keep their ids.
+
+Workers find the writer through ARENA_WRITER_ADDRESS (host:port) and
+ARENA_WRITER_AUTHKEY (hex), which start_server sets before starting them.
+Without ARENA_WRITER_ADDRESS matches are written in-process as before.
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import os
+import queue
+import secrets
+import signal
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging_config import logger, debug_sampled
+
+WRITER_ADDRESS = os.environ.get("ARENA_WRITER_ADDRESS", "")
+WRITER_AUTHKEY = os.environ.get("ARENA_WRITER_AUTHKEY", "")
+FLUSH_MS = float(os.environ.get("ARENA_WRITER_FLUSH_MS", "20"))
+MAX_BATCH = int(os.environ.get("ARENA_WRITER_MAX_BATCH", "500"))
+STARTUP_TIMEOUT = 30.0
+BACKLOG = 128  # every thread of every API worker opens its own connection, often at once
+
+Pending = Tuple[Connection, Dict[str, Any]]
+
+
+# ---------- writer process ----------
+
+class ResultWriter:
+    """Accepts match payloads from API workers and commits them in batches."""
+
+    def __init__(self, listener: Listener, flush_interval: float = FLUSH_MS / 1000, max_batch: int = MAX_BATCH):
+        self.listener = listener
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: "queue.SimpleQueue[Optional[Pending]]" = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self.batches = 0
+        self.matches = 0
+
+    def serve_forever(self) -> None:
+        threading.Thread(target=self._accept_loop, daemon=True, name="arena-writer-accept").start()
+        while True:
+            first = self._pending.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                break
+        self._drain()
+        logger.info("Result writer stopped after {} matches in {} batches", self.matches, self.batches)
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            self._stopping.set()
+            self._pending.put(None)
+
+    def _drain(self) -> None:
+        # matches that arrived after the stop request are still written
+        batch: List[Pending] = []
+        while True:
+            try:
+                item = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        if batch:
+            self._flush(batch)
+
+    def _accept_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                if self._stopping.is_set():
+                    return
+                logger.warning("Result writer rejected a connection")
+                continue
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True, name="arena-writer-conn").start()
+
+    def _read_loop(self, conn: Connection) -> None:
+        while True:
+            try:
+                payload = conn.recv()
+            except (EOFError, OSError):
+                conn.close()
+                return
+            self._pending.put((conn, payload))
+
+    def _flush(self, batch: List[Pending]) -> None:
+        from .leaderboard import get_store
+        from .matchstore import get_match_store
+
+        payloads = [p for _, p in batch]
+        errors: List[Optional[str]] = [None] * len(batch)
+        try:
+            ids: List[Optional[str]] = list(get_match_store().append_many(payloads))
+        except Exception as e:
+            logger.exception("Result writer failed to store a batch of {} matches", len(batch))
+            ids, errors = [None] * len(batch), [str(e)] * len(batch)
+        else:
+            # one leaderboard transaction per game: a failure only affects that game's
+            # matches, which stay stored (and get their id) but are not counted
+            by_game: Dict[str, List[int]] = {}
+            for i, p in enumerate(payloads):
+                by_game.setdefault(p["game"], []).append(i)
+            store = get_store()
+            for game, rows in by_game.items():
+                try:
+                    store.record_results(game, [(payloads[i]["bot0"], payloads[i]["bot1"], payloads[i]["winner"])
+                                                for i in rows])
+                except Exception as e:
+                    logger.exception("Result writer stored {} {} matches but could not count them", len(rows), game)
+                    for i in rows:
+                        errors[i] = f"match stored but not counted: {e}"
+        self.batches += 1
+        self.matches += len(batch)
+        debug_sampled("Result writer committed {} match(es) (batch {})", len(batch), self.batches)
+        for (conn, _), match_id, error in zip(batch, ids, errors):
+            try:
+                conn.send((match_id, error))
+            except (OSError, ValueError):
+                pass  # the worker went away; its match is stored anyway
+
+
+def _writer_main(ready: Connection, authkey: bytes, flush_interval: float, max_batch: int) -> None:
+    listener = Listener(("127.0.0.1", 0), backlog=BACKLOG, authkey=authkey)
+    writer = ResultWriter(listener, flush_interval, max_batch)
+    signal.signal(signal.SIGTERM, lambda *_: writer.stop())
+    # Ctrl-C reaches the whole process group: keep writing while the uvicorn
+    # workers finish their matches; start_server sends SIGTERM once they are gone
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    host, port = listener.address
+    ready.send(f"{host}:{port}")
+    ready.close()
+    logger.info("Result writer listening on {}:{} (flush {:.0f} ms, batches up to {})",
+                host, port, flush_interval * 1000, max_batch)
+    try:
+        writer.serve_forever()
+    finally:
+        listener.close()
+
+
+def start_writer(flush_interval: float = FLUSH_MS / 1000,
+                 max_batch: int = MAX_BATCH) -> Tuple[mp.Process, str, str]:
+    """Starts the writer process; returns (process, address, hex authkey)."""
+    authkey = secrets.token_hex(16)
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_writer_main, args=(child, bytes.fromhex(authkey), flush_interval, max_batch),
+                       name="arena-result-writer")
+    proc.start()
+    child.close()
+    if not parent.poll(STARTUP_TIMEOUT):
+        proc.kill()
+        raise RuntimeError("Result writer did not start")
+    address = parent.recv()
+    parent.close()
+    return proc, address, authkey
+
+
+# ---------- API worker side ----------
+
+class WriterClient:
+    """One connection per thread to the writer; `record` blocks until the batch
+    holding the match is committed."""
+
+    def __init__(self, address: str, authkey: str):
+        host, _, port = address.rpartition(":")
+        self.address = (host, int(port))
+        self.authkey = bytes.fromhex(authkey)
+        self._local = threading.local()
+
+    def _conn(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record(self, payload: Dict[str, Any]) -> str:
+        """Sends a finished match (with game, bot0, bot1, winner) and returns its id.
+        Raises RuntimeError if the match was not stored; a stored match whose
+        leaderboard update failed is logged and still returns its id."""
+        return self.record_many([payload])[0]
+
+    def record_many(self, payloads: List[Dict[str, Any]]) -> List[str]:
+        """Like record for several matches, sent back to back so they can share
+        batches; they are counted in the order given."""
+        conn = self._conn()
+        try:
+            for payload in payloads:
+                conn.send(payload)
+            replies = [conn.recv() for _ in payloads]
+        except (EOFError, OSError):
+            self._local.conn = None
+            conn.close()
+            raise RuntimeError("Result writer is not reachable") from None
+        ids = []
+        for payload, (match_id, error) in zip(payloads, replies):
+            if match_id is None:
+                raise RuntimeError(f"Result writer failed: {error}")
+            if error is not None:
+                logger.error("Match {} ({}): {}", match_id, payload.get("game"), error)
+            ids.append(match_id)
+        return ids
+
+
+_CLIENT: Optional[WriterClient] = None
+
+
+def get_writer_client() -> Optional[WriterClient]:
+    """The writer client if this process serves behind a writer (ARENA_WRITER_ADDRESS), else None."""
+    global _CLIENT
+    if _CLIENT is None and WRITER_ADDRESS:
+        _CLIENT = WriterClient(WRITER_ADDRESS, WRITER_AUTHKEY)
+    return _CLIENT
@@ -1,8 +1,11 @@
-import random
+# Estratégia ótima: deixar múltiplo de 4 mais 1 para o adversário.
+# A tabela resolvida (arena.solver) dá a jogada ótima de cada posição em O(1).
+
+from arena.games.eleven_sticks import ElevenSticks
+from arena.solver import load_or_solve
+
+TABLE = load_or_solve(ElevenSticks())
 
 def choose_move(state, legal_moves, player, game):
-    # Estratégia ótima: deixar múltiplo de 4 para o adversário
-    target = (state.sticks - 1) % 4
-    if target == 0 or target not in legal_moves:
-        return random.choice(legal_moves)
-    return target
+    move = TABLE.best_move(state)
+    return move if move in legal_moves else legal_moves[0]
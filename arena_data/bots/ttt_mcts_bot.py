@@ -0,0 +1,21 @@
+# MCTS Tic-Tac-Toe Bot: Monte Carlo tree search with random rollouts (arena.mcts)
+# Searches until the soft deadline of the match's time control (or its node
+# budget) and keeps the tree between its moves in the same match.
+
+import time
+
+from arena.games.tic_tac_toe import TicTacToe
+from arena.mcts import MCTS
+
+TIME_BUDGET = 0.1      # seconds per move when called without a move context
+MAX_ITERATIONS = 5000  # enough to play tic-tac-toe well; stops early on easy positions
+
+SEARCH = MCTS(TicTacToe())
+
+def choose_move(state, legal_moves, player, game, ctx=None):
+    if ctx is None:
+        deadline, iterations = time.perf_counter() + TIME_BUDGET, MAX_ITERATIONS
+    else:
+        deadline, iterations = ctx.soft_deadline, min(ctx.nodes or MAX_ITERATIONS, MAX_ITERATIONS)
+    move = SEARCH.best_move(state, player, deadline=deadline, iterations=iterations)
+    return move if move in legal_moves else legal_moves[0]
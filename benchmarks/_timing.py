@@ -0,0 +1,49 @@
+from __future__ import annotations
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], Any], *, unit: str = "op", repeat: int = 5, min_time: float = 0.05,
+            number: Optional[int] = None) -> Dict[str, float]:
+    """Times fn() like timeit: calibrates the loop count so one run takes at
+    least `min_time`, then keeps the best and median of `repeat` runs."""
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if time.perf_counter() - start >= min_time or number >= 1 << 24:
+                break
+            number *= 2
+    per_op: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_op.append((time.perf_counter() - start) / number)
+    best = min(per_op)
+    return {
+        "unit": unit,
+        "ops_per_s": 1.0 / best if best > 0 else float("inf"),
+        "best_us": best * 1e6,
+        "median_us": statistics.median(per_op) * 1e6,
+        "loops": number * repeat,
+    }
+
+
+def latency(samples_s: List[float], unit: str = "call") -> Dict[str, float]:
+    """Distribution of individually timed calls (seconds)."""
+    ordered = sorted(samples_s)
+    n = len(ordered)
+    mean = sum(ordered) / n
+    return {
+        "unit": unit,
+        "ops_per_s": 1.0 / mean if mean > 0 else float("inf"),
+        "mean_us": mean * 1e6,
+        "p50_us": ordered[n // 2] * 1e6,
+        "p99_us": ordered[min(n - 1, int(n * 0.99))] * 1e6,
+        "max_us": ordered[-1] * 1e6,
+        "loops": n,
+    }
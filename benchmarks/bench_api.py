@@ -0,0 +1,38 @@
+"""In-process /play throughput through the ASGI test client (no network), with
+the leaderboard and match log redirected to a temporary directory."""
+from __future__ import annotations
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from ._timing import latency
+from .bench_storage import isolated_stores
+
+MATCHUPS = [
+    ("tic_tac_toe", "random_ttt", "corner_bot"),
+    ("tic_tac_toe", "perfect_bot", "random_ttt"),
+    ("eleven_sticks", "random_stick", "perfect_stick_bot"),
+]
+
+
+def run(requests: int = 300) -> List[Dict[str, Any]]:
+    from fastapi.testclient import TestClient
+    from arena.api_server import app
+
+    rows: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp, isolated_stores(tmp), TestClient(app) as client:
+        for game, bot0, bot1 in MATCHUPS:
+            params = {"game": game, "bot0": bot0, "bot1": bot1}
+            client.get("/play", params=params).raise_for_status()  # warm up
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                client.get("/play", params=params).raise_for_status()
+                samples.append(time.perf_counter() - start)
+            rows.append({"name": f"GET /play[{game}:{bot0}-{bot1}]", **latency(samples, unit="request")})
+    return rows
+
+
+if __name__ == "__main__":
+    from .run import main
+    main(["--only", "api"])
@@ -0,0 +1,39 @@
+"""Decision latency of every bot in metadata.json, called directly on sampled positions."""
+from __future__ import annotations
+import time
+from typing import Any, Dict, List
+
+from arena.controllers import load_bot_callable
+from arena.filestorage import BOTS_DIR, list_all_bots
+from arena.games import GAME_REGISTRY
+
+from ._timing import latency
+from .bench_games import _sample_states
+
+
+def run(positions: int = 300) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    states_by_game: Dict[str, List[Any]] = {}
+    for meta in list_all_bots():
+        GameClass = GAME_REGISTRY.get(meta.get("game"))
+        if GameClass is None:
+            continue
+        game = GameClass()
+        states = states_by_game.get(game.code)
+        if states is None:
+            states = states_by_game[game.code] = _sample_states(game, positions)
+        fn = load_bot_callable(BOTS_DIR, meta["file"])
+        samples = []
+        for state in states:
+            legal = game.legal_moves(state, state.to_move)
+            args = (state.copy(), list(legal), state.to_move, game)
+            start = time.perf_counter()
+            fn(*args)
+            samples.append(time.perf_counter() - start)
+        rows.append({"name": f"bot[{meta['id']}]", **latency(samples, unit="move")})
+    return rows
+
+
+if __name__ == "__main__":
+    from .run import main
+    main(["--only", "bots"])
@@ -0,0 +1,29 @@
+"""MatchController.run with trivial bots: the per-move thread hand-off and state copy overhead."""
+from __future__ import annotations
+from typing import Any, Dict, List
+
+from arena.controllers import MatchController
+from arena.games.tic_tac_toe import TicTacToe
+from arena.games.eleven_sticks import ElevenSticks
+
+from ._timing import measure
+
+
+def first_legal(state, legal_moves, player, game):
+    return legal_moves[0]
+
+
+def run() -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for game in (TicTacToe(), ElevenSticks()):
+        controller = MatchController(game, first_legal, first_legal, time_limit=0.5)
+        moves = len(controller.run()["moves"])
+        row = measure(controller.run, unit="match")
+        row["moves_per_match"] = moves
+        rows.append({"name": f"controller.run[{game.code}]", **row})
+    return rows
+
+
+if __name__ == "__main__":
+    from .run import main
+    main(["--only", "controller"])
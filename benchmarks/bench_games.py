@@ -0,0 +1,61 @@
+"""Game rule throughput: next_state, legal_moves and win detection, in states per second."""
+from __future__ import annotations
+import random
+from typing import Any, Dict, List
+
+from arena.games.tic_tac_toe import TicTacToe
+from arena.games.tic_tac_toe_bitboard import BitboardTicTacToe
+from arena.games.eleven_sticks import ElevenSticks
+
+from ._timing import measure
+
+
+def _sample_states(game: Any, n: int, seed: int = 0) -> List[Any]:
+    """Non-terminal states visited by random playouts."""
+    rng = random.Random(seed)
+    states: List[Any] = []
+    while len(states) < n:
+        state = game.initial_state()
+        while not game.is_terminal(state) and len(states) < n:
+            states.append(state)
+            state = game.next_state(state, rng.choice(game.legal_moves(state, state.to_move)), state.to_move)
+    return states
+
+
+def _cycle(items: List[Any]):
+    # endless iteration without modulo arithmetic in the timed loop
+    while True:
+        yield from items
+
+
+def _bench_next_state(game: Any, states: List[Any]) -> Dict[str, float]:
+    pairs = [(s, game.legal_moves(s, s.to_move)[0], s.to_move) for s in states]
+    it = _cycle(pairs)
+    next_state = game.next_state
+    return measure(lambda: next_state(*next(it)), unit="state")
+
+
+def run() -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    ttt = TicTacToe()
+    ttt_states = _sample_states(ttt, 500)
+
+    rows.append({"name": "tic_tac_toe.next_state", **_bench_next_state(ttt, ttt_states)})
+    it = _cycle([(s, s.to_move) for s in ttt_states])
+    rows.append({"name": "tic_tac_toe.legal_moves", **measure(lambda: ttt.legal_moves(*next(it)), unit="state")})
+    boards = _cycle([list(s.board) for s in ttt_states])
+    rows.append({"name": "tic_tac_toe._check_winner",
+                 **measure(lambda: ttt._check_winner(next(boards)), unit="state")})
+
+    bb = BitboardTicTacToe()
+    rows.append({"name": "tic_tac_toe_bitboard.next_state",
+                 **_bench_next_state(bb, [bb.from_state(s) for s in ttt_states])})
+
+    es = ElevenSticks()
+    rows.append({"name": "eleven_sticks.next_state", **_bench_next_state(es, _sample_states(es, 200))})
+    return rows
+
+
+if __name__ == "__main__":
+    from .run import main
+    main(["--only", "games"])
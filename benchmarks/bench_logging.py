@@ -0,0 +1,95 @@
+"""Logging overhead on the /play request path, per logging profile.
+
+Replays the log calls one /play request makes (the pre-profile f-string
+sequence and the current one) against each profile, with the console sink
+sent to /dev/null and the file sink to a temporary file, and compares that
+with the cost of playing the match itself.
+
+    python -m benchmarks.bench_logging [-n 2000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from arena.logging_config import logger, configure, debug_sampled
+from arena.controllers import MatchController
+from arena.games.tic_tac_toe import TicTacToe
+
+
+def legacy_request_logs(i: int) -> None:
+    # what a /play request logged before profiles: five eagerly formatted records
+    logger.info(f"New match: tic_tac_toe | random_ttt (X) vs corner_bot (O)")
+    logger.debug(f"Leaderboard delta applied: game=tic_tac_toe, bots={['random_ttt', 'corner_bot']}")
+    logger.success(f"Match finished: Winner=X")
+    logger.info(f"Saved match log: game=tic_tac_toe, bots=random_ttt vs corner_bot → winner=X")
+    logger.debug(f"Match log saved as 1:{i}")
+
+
+def request_logs(i: int) -> None:
+    # the current /play sequence: sampled DEBUG plus one INFO record
+    debug_sampled("New match: {} | {} (X) vs {} (O)", "tic_tac_toe", "random_ttt", "corner_bot")
+    debug_sampled("Recorded {} match(es): game={}", 1, "tic_tac_toe")
+    debug_sampled("Saved match log {}: game={}, bots={} vs {} → winner={}",
+                  f"1:{i}", "tic_tac_toe", "random_ttt", "corner_bot", "X")
+    logger.info("Match finished: {} | {} (X) vs {} (O) → {} [{}]",
+                "tic_tac_toe", "random_ttt", "corner_bot", "X", f"1:{i}")
+
+
+def _time_per_call(fn: Callable[[int], None], n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n
+
+
+def _match_cost(n: int) -> float:
+    import random
+    game = TicTacToe()
+
+    def bot(state, legal, player, g):
+        return random.choice(legal)
+
+    def play(_: int) -> None:
+        MatchController(game, bot, bot, time_limit=0.5).run()
+    return _time_per_call(play, n)
+
+
+def run(n: int = 2000) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        log_file = os.path.join(tmp, "arena.log")
+        configure("prod", sink=devnull, level="CRITICAL", file=False)
+        match_s = _match_cost(max(1, n // 10))
+        setups = [
+            ("off", dict(profile="prod", level="CRITICAL", file=False)),
+            ("dev", dict(profile="dev")),
+            ("prod", dict(profile="prod")),
+        ]
+        for name, kw in setups:
+            configure(sink=devnull, log_file=log_file, **kw)
+            for label, fn in (("legacy", legacy_request_logs), ("current", request_logs)):
+                fn(0)  # warm up
+                per_req = _time_per_call(fn, n)
+                rows.append({"profile": name, "calls": label, "us_per_request": per_req * 1e6,
+                             "log_share": per_req / (per_req + match_s)})
+        logger.complete()
+        configure()  # back to the environment's profile, before devnull closes
+    rows.append({"profile": "-", "calls": "match only", "us_per_request": match_s * 1e6, "log_share": 0.0})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="requests per measurement")
+    args = parser.parse_args(argv)
+    rows = run(args.n)
+    print(f"{'profile':<8}{'log calls':<12}{'us/request':>12}{'log share':>18}")
+    for r in rows:
+        print(f"{r['profile']:<8}{r['calls']:<12}{r['us_per_request']:>12.1f}{r['log_share']:>17.1%}")
+
+
+if __name__ == "__main__":
+    main()
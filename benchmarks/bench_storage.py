@@ -0,0 +1,83 @@
+"""Per-match write cost of the leaderboard and the match log as history grows.
+
+Each size gets a fresh temporary store pre-filled with that many matches;
+the timed calls are the module-level update_leaderboard/record_match and
+save_match_log the server uses, pointed at the temporary stores.
+"""
+from __future__ import annotations
+import contextlib
+import os
+import random
+import tempfile
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from arena import leaderboard, matchstore
+from arena.filestorage import save_match_log, update_leaderboard
+from arena.leaderboard import SQLiteLeaderboardStore, record_match
+from arena.matchstore import MatchStore
+
+from ._timing import measure
+
+SIZES = (1_000, 10_000, 100_000)
+BOTS = [f"bot{i}" for i in range(8)]
+GAME = "tic_tac_toe"
+
+
+@contextlib.contextmanager
+def isolated_stores(root: str) -> Iterator[Tuple[SQLiteLeaderboardStore, MatchStore]]:
+    """Swaps the process-wide leaderboard and match-log stores for ones under `root`."""
+    saved = leaderboard._STORE, matchstore._STORE
+    lb = SQLiteLeaderboardStore(path=os.path.join(root, "leaderboard.db"), import_from=None)
+    ms = MatchStore(root=os.path.join(root, "match_log"))
+    leaderboard._STORE, matchstore._STORE = lb, ms
+    try:
+        yield lb, ms
+    finally:
+        leaderboard._STORE, matchstore._STORE = saved
+
+
+def _random_match(rng: random.Random) -> Dict[str, Any]:
+    bot0, bot1 = rng.sample(BOTS, 2)
+    return {
+        "game": GAME, "bot0": bot0, "bot1": bot1, "winner": rng.choice(("X", "O", "draw")),
+        "moves": [[rng.randrange(9), p] for p in "XOXOXOXOX"],
+        "final_board": ["X", "O", "X", "O", "X", "O", "X", "O", "X"], "winning_line": [],
+    }
+
+
+def prefill(lb: SQLiteLeaderboardStore, ms: MatchStore, n: int, seed: int = 0, batch: int = 5000) -> None:
+    rng = random.Random(seed)
+    for start in range(0, n, batch):
+        payloads = [_random_match(rng) for _ in range(min(batch, n - start))]
+        ms.append_many(payloads)
+        lb.record_results(GAME, [(p["bot0"], p["bot1"], p["winner"]) for p in payloads])
+
+
+def run(sizes: Sequence[int] = SIZES) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp, isolated_stores(tmp) as (lb, ms):
+            prefill(lb, ms, n)
+            rng = random.Random(n)
+            matches = [_random_match(rng) for _ in range(256)]
+            it = iter(matches * 10_000)
+
+            def one_result() -> None:
+                update_leaderboard(GAME, rng.choice(BOTS), rng.choice(("win", "loss", "draw")))
+
+            def one_match() -> None:
+                m = next(it)
+                record_match(GAME, m["bot0"], m["bot1"], m["winner"])
+
+            def one_log() -> None:
+                save_match_log(next(it))
+
+            rows.append({"name": f"update_leaderboard[{n}]", **measure(one_result, unit="write", repeat=3)})
+            rows.append({"name": f"record_match[{n}]", **measure(one_match, unit="match", repeat=3)})
+            rows.append({"name": f"save_match_log[{n}]", **measure(one_log, unit="match", repeat=3)})
+    return rows
+
+
+if __name__ == "__main__":
+    from .run import main
+    main(["--only", "storage"])
@@ -0,0 +1,100 @@
+"""Runs the benchmark suite and optionally saves or compares the results.
+
+    python -m benchmarks.run                          # everything
+    python -m benchmarks.run --only games,controller  # some groups
+    python -m benchmarks.run --json before.json       # save a baseline
+    python -m benchmarks.run --compare before.json    # ratios against it
+
+Groups: games, controller, bots, storage, api, logging. Throughput is
+ops/s (higher is better); for the compare column >1.00x means faster.
+"""
+from __future__ import annotations
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+GROUPS = ("games", "controller", "bots", "storage", "api", "logging")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _logging_rows() -> List[Dict[str, Any]]:
+    from .bench_logging import run
+    return [
+        {"name": f"logging[{r['profile']}:{r['calls']}]", "unit": "request",
+         "ops_per_s": 1e6 / r["us_per_request"], "best_us": r["us_per_request"]}
+        for r in run()
+    ]
+
+
+def run_groups(groups: List[str]) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for group in groups:
+        if group == "logging":
+            rows = _logging_rows()
+        else:
+            rows = importlib.import_module(f"{__package__}.bench_{group}").run()
+        for row in rows:
+            results.append({"group": group, **row})
+            _print_row(results[-1])
+    return results
+
+
+def _print_row(row: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    us = row.get("best_us", row.get("mean_us", 0.0))
+    line = f"{row['group']:<11}{row['name']:<54}{row['ops_per_s']:>14,.1f} {row['unit']}/s{us:>12.2f} us"
+    if "p99_us" in row:
+        line += f"  p99 {row['p99_us']:.2f} us"
+    if baseline:
+        line += f"  {row['ops_per_s'] / baseline['ops_per_s']:>6.2f}x"
+    print(line, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default=",".join(GROUPS), help="comma-separated groups to run")
+    parser.add_argument("--json", dest="json_out", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON written by an earlier --json run")
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = sorted(set(groups) - set(GROUPS))
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    results = run_groups(groups)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {(r["group"], r["name"]): r for r in json.load(f)["results"]}
+        print(f"\nCompared with {args.compare}:")
+        for row in results:
+            base = baseline.get((row["group"], row["name"]))
+            if base:
+                _print_row(row, base)
+
+    if args.json_out:
+        meta = {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
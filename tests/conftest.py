@@ -0,0 +1,34 @@
+import os
+import sys
+
+# quiet, synchronous-enough logging for tests; must be set before arena is imported
+os.environ.setdefault("ARENA_LOG_PROFILE", "prod")
+os.environ.setdefault("ARENA_LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from arena import leaderboard, matchstore
+from arena.leaderboard import SQLiteLeaderboardStore
+from arena.matchstore import MatchStore
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """Swaps the process-wide leaderboard and match-log stores for empty ones under tmp_path."""
+    saved = leaderboard._STORE, matchstore._STORE
+    lb = SQLiteLeaderboardStore(path=str(tmp_path / "leaderboard.db"), import_from=None)
+    ms = MatchStore(root=str(tmp_path / "match_log"))
+    leaderboard._STORE, matchstore._STORE = lb, ms
+    try:
+        yield lb, ms
+    finally:
+        leaderboard._STORE, matchstore._STORE = saved
+
+
+def make_match(bot0, bot1, winner, game="tic_tac_toe", ts=None):
+    record = {"game": game, "bot0": bot0, "bot1": bot1, "winner": winner,
+              "moves": [], "final_board": [""] * 9, "winning_line": []}
+    if ts is not None:
+        record["ts"] = ts
+    return record
@@ -0,0 +1,74 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from arena import leaderboard, matchstore
+from arena.backup import iter_backup, restore
+from arena.leaderboard import SQLiteLeaderboardStore
+from arena.matchstore import MatchStore
+
+from conftest import make_match
+
+
+def _archive(**kwargs) -> bytes:
+    # from_segment skips the legacy per-file logs of the real data directory
+    return b"".join(iter_backup(from_segment=1, chunk_size=256, **kwargs))
+
+
+def _fresh_stores(tmp_path, name):
+    leaderboard._STORE = SQLiteLeaderboardStore(path=str(tmp_path / f"{name}.db"), import_from=None)
+    matchstore._STORE = MatchStore(root=str(tmp_path / name))
+    return leaderboard._STORE, matchstore._STORE
+
+
+def test_round_trip(stores, tmp_path):
+    _, ms = stores
+    ms.append_many([make_match("a", "b", "X", ts=100.0), make_match("b", "a", "draw", ts=101.0),
+                    make_match("a", "b", "O", ts=102.0, game="eleven_sticks")])
+    data = _archive()
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        lines = zf.read("matches.jsonl").splitlines()
+    assert manifest["matches"] == 3 and len(lines) == 3
+    assert manifest["games"] == ["eleven_sticks", "tic_tac_toe"]
+    assert manifest["last_segment"] == 1
+
+    lb2, ms2 = _fresh_stores(tmp_path, "restored")
+    summary = restore(io.BytesIO(data))
+    assert (summary["imported"], summary["skipped"]) == (3, 0)
+    assert [(m["bot0"], m["winner"]) for m in ms2.iter_matches()] == [("a", "X"), ("b", "draw"), ("a", "O")]
+    assert lb2.get("tic_tac_toe")["a"]["wins"] == 1
+
+
+def test_restore_skips_matches_already_present(stores):
+    lb, ms = stores
+    ms.append_many([make_match("a", "b", "X", ts=100.0)])
+    data = _archive()
+    summary = restore(io.BytesIO(data))
+    assert (summary["imported"], summary["skipped"]) == (0, 1)
+    assert len(list(ms.iter_matches())) == 1
+    assert lb.get("tic_tac_toe") == {}  # nothing new was counted
+
+
+def test_incremental_backup_only_holds_newer_matches(stores):
+    _, ms = stores
+    ms.append_many([make_match("a", "b", "X", ts=100.0), make_match("a", "b", "O", ts=200.0)])
+    with zipfile.ZipFile(io.BytesIO(_archive(since=150.0))) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        records = [json.loads(line) for line in zf.read("matches.jsonl").splitlines()]
+    assert manifest["kind"] == "incremental"
+    assert [r["ts"] for r in records] == [200.0]
+
+
+def test_invalid_archives_are_rejected_before_writing(stores):
+    _, ms = stores
+    with pytest.raises(ValueError):
+        restore(io.BytesIO(b"not a zip"))
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("matches.jsonl", json.dumps(make_match("a", "b", "X", ts=1.0)) + "\n")
+    with pytest.raises(ValueError):
+        restore(io.BytesIO(buf.getvalue()))  # no manifest
+    assert list(ms.iter_matches()) == []
@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from arena.batch import bot_policy, require_batch, simulate
+from arena.core import Player
+from arena.games.eleven_sticks import ElevenSticks
+from arena.games.tic_tac_toe import TicTacToe
+
+
+@pytest.mark.parametrize("game", [TicTacToe(), ElevenSticks()])
+def test_random_games_all_finish(game):
+    res = simulate(game, 500, rng=np.random.default_rng(0))
+    assert res["X"] + res["O"] + res["draw"] == res["games"] == 500
+
+
+def test_batch_matches_the_scalar_rules():
+    game = TicTacToe()
+    batch = game.initial_states(3)
+    for action in (4, 0, 8):
+        batch = game.step(batch, np.full(3, action))
+    state = game.batch_to_state(batch, 1)
+    assert state.board == ("O", "", "", "", "X", "", "", "", "X") and state.to_move == Player.O
+    assert game.legal_mask(batch)[0].tolist() == [c == "" for c in state.board]
+
+
+def test_bot_policy_calls_the_bot_only_where_it_moves():
+    game = TicTacToe()
+    calls = []
+
+    def bot(state, legal_moves, player, game):
+        calls.append(player)
+        return legal_moves[0]
+    res = simulate(game, 50, {Player.X: bot_policy(game, bot)}, np.random.default_rng(0))
+    assert set(calls) == {Player.X}
+    assert res["games"] == 50
+    assert len(calls) <= 50 * 5  # X moves at most five times a game
+
+
+def test_games_without_batch_support_are_refused():
+    class NoBatch(ElevenSticks):
+        supports_batch = False
+    with pytest.raises(ValueError):
+        require_batch(NoBatch())
+    with pytest.raises(ValueError):
+        simulate(NoBatch(), 10)
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from arena.controllers import WORKER_POOL, BotWorker, MatchController
+from arena.games.tic_tac_toe import TicTacToe
+
+
+def first_legal(state, legal_moves, player, game):
+    return legal_moves[0]
+
+
+def test_match_between_bots_completes():
+    result = MatchController(TicTacToe(), first_legal, first_legal).run()
+    assert result["winner"] == "X"          # 0, 1, 2, ... fills the top row first
+    assert sum(result["fallbacks"].values()) == 0
+
+
+def test_worker_reports_errors_and_timeouts():
+    worker = BotWorker()
+    assert worker.call(lambda: 7, (), 1.0)[::2] == (7, "ok")
+    assert worker.call(lambda: 1 / 0, (), 1.0)[2] == "error"
+    assert isinstance(worker.last_error, ZeroDivisionError)
+
+    def spin():
+        while True:
+            pass
+    move, elapsed, status = worker.call(spin, (), 0.05)
+    assert (move, status) == (None, "timeout")
+    assert worker.call(lambda: 8, (), 1.0)[::2] == (8, "ok")  # the worker survived the cancellation
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_pool_is_usable_in_a_forked_child():
+    WORKER_POOL.release(WORKER_POOL.acquire())  # leave an idle worker to inherit
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = WORKER_POOL.acquire().call(lambda: 4, (), 1.0)[2] == "ok"
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_bots_get_a_mutable_copy_of_frozen_states():
+    def scribbler(state, legal_moves, player, game):
+        state.board[legal_moves[0]] = player.value  # an older bot that edits the board it is given
+        return legal_moves[0]
+
+    game = TicTacToe()
+    assert game.frozen_states
+    result = MatchController(game, scribbler, first_legal, bot_ids=("scribbler", "first")).run()
+    assert sum(result["fallbacks"].values()) == 0
+    assert result["winner"] == "X"
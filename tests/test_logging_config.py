@@ -0,0 +1,53 @@
+import io
+import os
+import time
+
+import pytest
+
+from arena import logging_config
+from arena.logging_config import configure, debug_sampled, logger
+
+
+@pytest.fixture
+def captured():
+    stream = io.StringIO()
+    configure("prod", sink=stream, json=False, sample=3, level="DEBUG")
+    try:
+        yield stream
+    finally:
+        configure()
+
+
+def _wait_for(stream, text, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if text in stream.getvalue():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_background_sink_writes_and_sampling_thins_debug(captured):
+    for i in range(6):
+        debug_sampled("hot path {}", i)
+    logger.info("done")
+    assert _wait_for(captured, "done")
+    assert captured.getvalue().count("hot path") == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_background_sink_is_restarted_in_forked_children(tmp_path):
+    path = tmp_path / "log.txt"
+    with open(path, "w") as f:
+        configure("prod", sink=f, json=False, level="INFO")   # the writer thread lives in this process
+        try:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    logger.info("from the child")
+                    logger.remove()                        # stop(): drains the child's queue
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+        finally:
+            configure()
+    assert "from the child" in path.read_text()
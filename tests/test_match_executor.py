@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+
+from arena.match_executor import BoundedExecutor, Saturated
+
+
+def _blocker():
+    gate = threading.Event()
+    started = threading.Event()
+
+    def job():
+        started.set()
+        gate.wait(5)
+        return "done"
+    return job, started, gate
+
+
+async def _until(predicate, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_submit_rejects_beyond_capacity():
+    async def main():
+        ex = BoundedExecutor(max_workers=1, queue_depth=1)
+        job, _, gate = _blocker()
+        tasks = [asyncio.create_task(ex.submit(job)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated):
+            await ex.submit(job)
+        gate.set()
+        assert await asyncio.gather(*tasks) == ["done", "done"]
+        await _until(lambda: ex.pending == 0)
+        ex.shutdown()
+    asyncio.run(main())
+
+
+def test_cancelled_request_keeps_its_slot_until_the_thread_finishes():
+    async def main():
+        ex = BoundedExecutor(max_workers=1, queue_depth=0)
+        job, started, gate = _blocker()
+        task = asyncio.create_task(ex.submit(job))
+        await _until(started.is_set)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        assert ex.pending == 1          # the match is still being played
+        gate.set()
+        await _until(lambda: ex.pending == 0)
+        ex.shutdown()
+    asyncio.run(main())
+
+
+def test_cancelled_before_start_frees_the_slot():
+    async def main():
+        ex = BoundedExecutor(max_workers=1, queue_depth=1)
+        job, started, gate = _blocker()
+        running = asyncio.create_task(ex.submit(job))
+        await _until(started.is_set)
+        queued = asyncio.create_task(ex.submit(job))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await _until(lambda: ex.pending == 1)
+        gate.set()
+        await running
+        await _until(lambda: ex.pending == 0)
+        ex.shutdown()
+    asyncio.run(main())
+
+
+def test_reservation_is_released_once_after_its_last_call():
+    async def main():
+        ex = BoundedExecutor(max_workers=1, queue_depth=0)
+        slot = ex.reserve()
+        with pytest.raises(Saturated):
+            ex.reserve()
+        job, started, gate = _blocker()
+        call = asyncio.create_task(slot.run(job))
+        await _until(started.is_set)
+        call.cancel()
+        slot.close()
+        slot.close()
+        assert ex.pending == 1          # its last call is still running
+        gate.set()
+        await _until(lambda: ex.pending == 0)
+        ex.shutdown()
+    asyncio.run(main())
+
+
+def test_stream_that_never_starts_does_not_leak_its_slot():
+    import gc
+    from arena import api_server
+
+    before = api_server.MATCH_EXECUTOR.pending
+    response = asyncio.run(api_server.play_stream(game="tic_tac_toe", bot0="random_ttt", bot1="corner_bot", tc=None))
+    assert api_server.MATCH_EXECUTOR.pending == before + 1
+    del response
+    gc.collect()
+    assert api_server.MATCH_EXECUTOR.pending == before
@@ -0,0 +1,82 @@
+import pytest
+
+from conftest import make_match
+
+MATCHES = [
+    ("a", "b", "X"), ("b", "a", "X"), ("a", "c", "draw"),
+    ("c", "a", "O"), ("b", "c", "O"), ("a", "b", "O"),
+]
+
+
+@pytest.fixture
+def filled(stores):
+    _, ms = stores
+    ms.append_many([make_match(b0, b1, w, ts=1000.0 + i) for i, (b0, b1, w) in enumerate(MATCHES)])
+    return ms
+
+
+def _pages(ms, **filters):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = ms.query(cursor=cursor, **filters)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pagination_covers_every_match_once(filled):
+    pages = _pages(filled, limit=4)
+    assert [len(p) for p in pages] == [4, 2]
+    ts = [r["ts"] for p in pages for r in p]
+    assert ts == sorted(ts, reverse=True) and len(set(ts)) == len(MATCHES)
+    asc = [r["ts"] for p in _pages(filled, limit=4, order="asc") for r in p]
+    assert asc == sorted(ts)
+
+
+def test_exact_page_ends_without_a_cursor(filled):
+    rows, cursor = filled.query(limit=len(MATCHES))
+    assert len(rows) == len(MATCHES) and cursor is None
+
+
+def test_bot_filter_matches_either_side(filled):
+    rows = [r for p in _pages(filled, bot="c", limit=2) for r in p]
+    assert len(rows) == 3
+    assert all("c" in (r["bot0"], r["bot1"]) for r in rows)
+
+
+def test_result_and_opponent_are_relative_to_bot(filled):
+    wins, _ = filled.query(bot="a", result="win")
+    assert sorted((r["bot0"], r["bot1"], r["winner"]) for r in wins) == [("a", "b", "X"), ("c", "a", "O")]
+    losses, _ = filled.query(bot="a", opponent="b", result="loss")
+    assert sorted((r["bot0"], r["winner"]) for r in losses) == [("a", "O"), ("b", "X")]
+    draws, _ = filled.query(bot="a", result="draw")
+    assert [(r["bot0"], r["bot1"]) for r in draws] == [("a", "c")]
+
+
+def test_time_window_and_full_records(filled):
+    rows, _ = filled.query(since=1001.0, until=1003.0, order="asc", full=True)
+    assert [r["ts"] for r in rows] == [1001.0, 1002.0]
+    assert "moves" in rows[0]
+
+
+@pytest.mark.parametrize("filters", [
+    {"order": "sideways"}, {"limit": 0}, {"result": "win"}, {"bot": "a", "result": "maybe"}, {"cursor": "x"},
+])
+def test_invalid_queries_raise_value_error(filled, filters):
+    with pytest.raises(ValueError):
+        filled.query(**filters)
+
+
+def test_a_corrupt_index_line_is_skipped(filled):
+    seg = filled.segments()[-1]
+    path = filled._path(seg, ".idx")
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    lines[2] = b'{"id": "broken\n'
+    with open(path, "wb") as f:
+        f.writelines(lines)
+    entries = list(filled.iter_index())
+    assert len(entries) == len(MATCHES) - 1
+    assert len(list(filled.iter_matches())) == len(MATCHES) - 1
+    # the SQLite index is built from the segment data, so /matches still sees every match
+    assert len(filled.query(limit=50)[0]) == len(MATCHES)
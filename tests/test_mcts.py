@@ -0,0 +1,71 @@
+import time
+from array import array
+
+from arena.core import Player
+from arena.games.eleven_sticks import ElevenSticks
+from arena.games.tic_tac_toe import TicTacToe
+from arena.mcts import MCTS
+
+GAME = TicTacToe()
+
+
+def _state(board, to_move):
+    cells = ["" if c == "." else c for c in board]
+    return GAME.make_state(cells, to_move, moves_played=sum(1 for c in cells if c))
+
+
+def test_takes_an_immediate_win():
+    state = _state("XX.OO....", Player.X)
+    assert MCTS(GAME, seed=1).best_move(state, Player.X, iterations=500) == 2
+
+
+def test_blocks_the_opponent():
+    state = _state("OO.X.....", Player.X)
+    assert MCTS(GAME, seed=1).best_move(state, Player.X, iterations=2000) == 2
+
+
+def test_single_legal_move_needs_no_search():
+    search = MCTS(GAME, seed=1)
+    state = _state("XOXOOX.XO", Player.X)
+    assert search.best_move(state, Player.X, iterations=100) == 6
+    assert search.iterations == 0
+
+
+def test_reuses_the_subtree_after_our_move_and_the_reply():
+    search = MCTS(GAME, seed=1)
+    root = GAME.initial_state()
+    move = search.best_move(root, Player.X, iterations=2000)
+    reply = next(m for m in GAME.legal_moves(root, Player.X) if m != move)
+    after = GAME.next_state(GAME.next_state(root, move, Player.X), reply, Player.O)
+    search.best_move(after, Player.X, iterations=1)
+    assert search.visits[0] > 1  # statistics carried over from the first search
+
+
+def test_unrelated_position_starts_a_fresh_tree():
+    search = MCTS(GAME, seed=1)
+    search.best_move(GAME.initial_state(), Player.X, iterations=500)
+    search.best_move(_state("X...O...X", Player.O), Player.O, iterations=10)
+    assert search.visits[0] == 10
+
+
+def test_deadline_bounds_the_search_and_full_arrays_still_answer():
+    search = MCTS(GAME, capacity=64, seed=1)
+    start = time.perf_counter()
+    move = search.best_move(GAME.initial_state(), Player.X, deadline=start + 0.05)
+    assert time.perf_counter() - start < 0.5
+    assert move in range(9)
+    assert search.size <= 64
+
+
+def test_plays_other_games():
+    game = ElevenSticks()
+    state = game.initial_state()
+    move = MCTS(game, seed=1).best_move(state, state.to_move, iterations=3000)
+    assert move in game.legal_moves(state, state.to_move)
+
+
+def test_nodes_are_array_slots_only():
+    search = MCTS(GAME, seed=1)
+    search.best_move(GAME.initial_state(), Player.X, iterations=500)
+    per_node = [v for v in vars(search).values() if isinstance(v, (list, array)) and len(v) == search.capacity]
+    assert per_node and all(isinstance(v, array) for v in per_node)
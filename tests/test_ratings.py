@@ -0,0 +1,74 @@
+import pytest
+
+from arena.ratings import (ELO_START, GLICKO_START_RD, Rating, elo_update, head_to_head_rows, ranked, replay,
+                           scores, update_head_to_head, update_ratings)
+
+
+def test_scores():
+    assert scores("X") == (1.0, 0.0)
+    assert scores("O") == (0.0, 1.0)
+    assert scores("draw") == (0.5, 0.5)
+
+
+def test_elo_update_is_zero_sum():
+    a, b = elo_update(1500, 1500, 1.0)
+    assert a == pytest.approx(1516)
+    assert a + b == pytest.approx(3000)
+    # the favourite gains little for an expected win
+    fav, _ = elo_update(1800, 1400, 1.0)
+    assert 0 < fav - 1800 < 4
+
+
+def test_glicko_winner_goes_up_and_uncertainty_shrinks():
+    ratings = {}
+    update_ratings(ratings, "a", "b", "X")
+    a, b = ratings["a"], ratings["b"]
+    assert a.rating > ELO_START > b.rating
+    assert a.rating - ELO_START == pytest.approx(ELO_START - b.rating)
+    assert a.rd < GLICKO_START_RD and b.rd < GLICKO_START_RD
+    assert a.games == b.games == 1
+
+
+def test_draw_between_equals_changes_nothing_but_rd():
+    ratings = {}
+    update_ratings(ratings, "a", "b", "draw")
+    assert ratings["a"].rating == pytest.approx(ELO_START)
+    assert ratings["a"].elo == pytest.approx(ELO_START)
+    assert ratings["a"].rd < GLICKO_START_RD
+
+
+def test_mirror_matches_are_ignored():
+    ratings, h2h = {}, {}
+    update_ratings(ratings, "a", "a", "X")
+    update_head_to_head(h2h, "a", "a", "X")
+    assert ratings == {} and h2h == {}
+
+
+def test_head_to_head_is_keyed_by_sorted_pair():
+    h2h = {}
+    update_head_to_head(h2h, "b", "a", "X")     # b wins as X
+    update_head_to_head(h2h, "a", "b", "X")     # a wins as X
+    update_head_to_head(h2h, "a", "b", "O")     # b wins as O
+    update_head_to_head(h2h, "b", "a", "draw")
+    assert h2h == {("a", "b"): [1, 2, 1]}
+    assert head_to_head_rows(h2h) == [{"bot_a": "a", "bot_b": "b", "wins_a": 1, "wins_b": 2, "draws": 1, "games": 4}]
+
+
+def test_ranked_sorts_by_glicko_rating():
+    rows = ranked({"low": Rating(rating=1400), "high": Rating(rating=1700), "mid": Rating()})
+    assert [r["bot"] for r in rows] == ["high", "mid", "low"]
+
+
+def test_store_ratings_match_a_replay_of_the_same_results(stores):
+    lb, _ = stores
+    results = [("a", "b", "X"), ("b", "c", "draw"), ("c", "a", "O"), ("a", "c", "X"), ("b", "a", "O")]
+    lb.record_results("tic_tac_toe", results[:2])
+    lb.record_results("tic_tac_toe", results[2:])
+    expected, h2h = replay(results)
+    stored = lb.get_ratings("tic_tac_toe")
+    assert set(stored) == set(expected)
+    for bot, r in expected.items():
+        assert stored[bot].rating == pytest.approx(r.rating)
+        assert stored[bot].elo == pytest.approx(r.elo)
+        assert stored[bot].games == r.games
+    assert lb.get_head_to_head("tic_tac_toe") == h2h
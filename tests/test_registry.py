@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from arena.game_base import Game
+from arena.games import GAME_REGISTRY, GamePluginError, GameRegistry
+from arena.metadata import MetadataRegistry
+
+
+def _meta(tmp_path, code, **extra):
+    (tmp_path / f"{code}.json").write_text(json.dumps({"code": code, "name": code.title(), **extra}))
+
+
+@pytest.fixture
+def games_dir(tmp_path):
+    _meta(tmp_path, "tic_tac_toe")                                         # arena/games/tic_tac_toe.py
+    _meta(tmp_path, "sticks", module="arena.games.eleven_sticks:ElevenSticks")  # code mismatch
+    _meta(tmp_path, "broken", module="no_such_package.games")
+    _meta(tmp_path, "ghost")                                               # no implementation
+    (tmp_path / "bad.json").write_text(json.dumps({"code": "Bad Code", "name": "x"}))
+    return tmp_path
+
+
+def test_discovery_skips_unplayable_metadata_without_importing(games_dir):
+    registry = GameRegistry(str(games_dir))
+    assert sorted(registry) == ["broken", "sticks", "tic_tac_toe"]
+    assert "ghost" not in registry
+    assert registry.loaded("tic_tac_toe") is None
+
+
+def test_classes_load_lazily_and_are_validated(games_dir):
+    registry = GameRegistry(str(games_dir))
+    cls = registry["tic_tac_toe"]
+    assert issubclass(cls, Game) and registry.loaded("tic_tac_toe") is cls
+    with pytest.raises(GamePluginError, match="code"):
+        registry["sticks"]
+    with pytest.raises(GamePluginError, match="cannot import"):
+        registry["broken"]
+    errors = dict(registry.check())
+    assert errors["tic_tac_toe"] is None and errors["sticks"] and errors["broken"]
+
+
+def test_metadata_lists_the_registry_games(games_dir):
+    meta = MetadataRegistry(games_dir=str(games_dir), check_interval=0)
+    games, _ = meta.games()
+    assert [g["code"] for g in games] == ["broken", "sticks", "tic_tac_toe"]
+    _meta(games_dir, "eleven_sticks")
+    games, _ = meta.games()   # the directory changed: the registry discovers again
+    assert "eleven_sticks" in [g["code"] for g in games]
+
+
+def test_api_answers_503_for_broken_plugins_and_400_for_unknown_games(monkeypatch, games_dir):
+    from fastapi.testclient import TestClient
+    from arena import api_server
+
+    monkeypatch.setattr(api_server, "GAME_REGISTRY", GameRegistry(str(games_dir)))
+    client = TestClient(api_server.app)
+    params = {"bot0": "random_ttt", "bot1": "corner_bot"}
+    assert client.get("/play", params={"game": "broken", **params}).status_code == 503
+    assert client.get("/play", params={"game": "ghost", **params}).status_code == 400
+
+
+def test_default_registry_has_the_shipped_games():
+    assert {"tic_tac_toe", "eleven_sticks"} <= set(GAME_REGISTRY)
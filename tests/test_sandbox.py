@@ -0,0 +1,71 @@
+import marshal
+
+import pytest
+
+from arena import sandbox
+from arena.core import Player
+from arena.games.tic_tac_toe import TicTacToe
+
+BOTS = {
+    "first.py": "def choose_move(state, legal, player, game):\n    return legal[0]\n",
+    "text.py": "def choose_move(state, legal, player, game):\n    return str(legal[0])\n",
+    "huge.py": "def choose_move(state, legal, player, game):\n    return 2 ** 80\n",
+    # bot code can reach the worker's pipe and write its own reply ahead of the real one
+    "forged.py": (
+        "import gc, marshal\n"
+        "from multiprocessing.connection import Connection\n"
+        "PAYLOAD = b''\n"
+        "def choose_move(state, legal, player, game):\n"
+        "    for obj in gc.get_objects():\n"
+        "        if isinstance(obj, Connection):\n"
+        "            obj.send_bytes(PAYLOAD)\n"
+        "    return legal[0]\n"
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    p = sandbox.SandboxPool(size=1, max_moves=1000)
+    p.start()
+    yield p
+    p.shutdown()
+
+
+def _call(pool, bots_dir, name):
+    game = TicTacToe()
+    state = game.initial_state()
+    return pool.call(str(bots_dir), name, (state, game.legal_moves(state, Player.X), Player.X, game), 5.0)
+
+
+def _write_bots(tmp_path, payload=b""):
+    for name, source in BOTS.items():
+        (tmp_path / name).write_text(source.replace("PAYLOAD = b''", f"PAYLOAD = {payload!r}"))
+    return tmp_path
+
+
+def test_replies_are_fixed_size_status_and_int():
+    assert sandbox._parse_reply(sandbox._reply(sandbox.OK, 4)) == (sandbox.OK, 4)
+    assert sandbox._parse_reply(marshal.dumps((sandbox.OK, 4))) is None
+    assert sandbox._parse_reply(sandbox._REPLY.pack(99, 4)) is None
+
+
+def test_answers_that_are_not_ints_are_invalid(pool, tmp_path):
+    bots_dir = _write_bots(tmp_path)
+    assert _call(pool, bots_dir, "first.py")[::2] == (0, "ok")
+    assert _call(pool, bots_dir, "text.py")[::2] == (None, "invalid")
+    assert _call(pool, bots_dir, "huge.py")[::2] == (None, "invalid")
+
+
+@pytest.mark.parametrize("payload", [
+    marshal.dumps((0, 4)),          # the old reply format
+    b"\x00" * 10,                   # wrong size
+    b"x" * 100_000,                 # oversized, refused unread
+    b"\x07" + b"\x00" * 8,          # unknown status
+])
+def test_forged_replies_are_rejected_and_the_worker_replaced(pool, tmp_path, payload):
+    bots_dir = _write_bots(tmp_path, payload)
+    move, _, status = _call(pool, bots_dir, "forged.py")
+    assert (move, status) == (None, "error")
+    # the worker is replaced: a reused one would answer with the reply still in its pipe
+    assert _call(pool, bots_dir, "first.py")[::2] == (0, "ok")
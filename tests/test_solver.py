@@ -0,0 +1,59 @@
+import pytest
+
+from arena.core import Player
+from arena.games.eleven_sticks import ElevenSticks
+from arena.games.tic_tac_toe import TicTacToe
+from arena.solver import SolvedTable, fingerprint, load_or_solve, solve
+
+
+@pytest.fixture(scope="module")
+def ttt_table():
+    return solve(TicTacToe())
+
+
+def test_tic_tac_toe_is_a_draw(ttt_table):
+    game = TicTacToe()
+    assert len(ttt_table) == 5478
+    assert ttt_table.outcome(game.initial_state()) is None
+
+
+def test_best_move_wins_when_possible(ttt_table):
+    game = TicTacToe()
+    state = game.make_state(["X", "X", "", "O", "O", "", "", "", ""], Player.X, moves_played=4)
+    assert ttt_table.best_move(state) == 2
+
+
+def test_table_round_trips_through_disk(ttt_table, tmp_path):
+    path = ttt_table.save(str(tmp_path / "t.bin"))
+    loaded = SolvedTable.load(path)
+    assert loaded.entries == ttt_table.entries
+    assert loaded.fingerprint == fingerprint(TicTacToe()) and loaded.positions == 5478
+
+
+def test_load_or_solve_reuses_a_matching_table(tmp_path, monkeypatch):
+    path = str(tmp_path / "es.bin")
+    load_or_solve(ElevenSticks(), path)
+    monkeypatch.setattr("arena.solver.solve", lambda game: pytest.fail("solved again"))
+    assert len(load_or_solve(ElevenSticks(), path)) == 22
+
+
+def test_load_or_solve_rebuilds_for_other_rules(tmp_path):
+    class ElevenSticksV2(ElevenSticks):
+        rules_version = 2
+
+    path = str(tmp_path / "es.bin")
+    load_or_solve(ElevenSticks(), path)
+    assert SolvedTable.load(path).fingerprint == fingerprint(ElevenSticks())
+    load_or_solve(ElevenSticksV2(), path)
+    assert SolvedTable.load(path).fingerprint == fingerprint(ElevenSticksV2()) != fingerprint(ElevenSticks())
+
+
+def test_load_or_solve_rebuilds_truncated_tables(tmp_path):
+    path = str(tmp_path / "es.bin")
+    load_or_solve(ElevenSticks(), path)
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 5)  # one entry short of the header's count
+    with pytest.raises(ValueError):
+        SolvedTable.load(path)
+    assert len(load_or_solve(ElevenSticks(), path)) == 22
+    assert len(SolvedTable.load(path)) == 22
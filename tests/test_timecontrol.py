@@ -0,0 +1,99 @@
+import gc
+import math
+import time
+import weakref
+
+import pytest
+
+from arena.timecontrol import (Fischer, FixedTime, MoveContext, NodeBudget, parse, parse_request, resolve,
+                               wants_context)
+
+
+@pytest.mark.parametrize("spec, cls, canonical", [
+    ("fixed:0.5", FixedTime, "fixed:0.5"),
+    ("0.25", FixedTime, "fixed:0.25"),
+    ("fischer:5+0.1", Fischer, "fischer:5+0.1"),
+    ("fischer:3", Fischer, "fischer:3+0"),
+    ("nodes:20000", NodeBudget, "nodes:20000/5"),
+    ("nodes:100/2", NodeBudget, "nodes:100/2"),
+])
+def test_parse(spec, cls, canonical):
+    tc = parse(spec)
+    assert isinstance(tc, cls) and tc.spec == canonical
+    assert parse(tc.spec).spec == canonical
+
+
+@pytest.mark.parametrize("spec", [
+    "", "fast", "fixed:", "fixed:0", "fixed:-1", "fixed:inf", "nan", "fixed:nan", "fischer:inf+0",
+    "fischer:5+nan", "fischer:5+-1", "nodes:0", "nodes:1.5", "nodes:10/inf", "nodes:10/0", "bullet:1",
+])
+def test_parse_rejects(spec):
+    with pytest.raises(ValueError):
+        parse(spec)
+
+
+def test_parse_request_caps_the_longest_move():
+    assert parse_request("fixed:2", limit=10).spec == "fixed:2"
+    for spec in ("1e9", "fischer:9+2", "nodes:10/11"):
+        with pytest.raises(ValueError, match="at most"):
+            parse_request(spec, limit=10)
+
+
+def test_resolve_precedence():
+    meta = {"time_control": "fixed:2"}
+    assert resolve("fixed:1", meta).spec == "fixed:1"
+    assert resolve(None, meta).spec == "fixed:2"
+    assert resolve(None, None).spec == parse(resolve(None, {}).spec).spec  # ARENA_TIME_CONTROL
+    with pytest.raises(ValueError):
+        resolve("fixed:60", meta, limit=10)
+    assert resolve(None, {"time_control": "fixed:60"}, limit=10).spec == "fixed:60"  # the game's own is trusted
+
+
+def test_fixed_clock_gives_the_same_budget_every_move():
+    clock = FixedTime(0.5).new_clock()
+    ctx = clock.context(3)
+    assert ctx.budget == 0.5 and ctx.ply == 3 and ctx.remaining is None
+    assert ctx.soft_deadline < ctx.deadline
+    assert clock.charge(0.2) == {"budget": 0.5}
+
+
+def test_fischer_clock_spends_time_and_adds_the_increment():
+    clock = Fischer(5, 0.5).new_clock()
+    ctx = clock.context(0)
+    assert ctx.budget == 5 and ctx.remaining == 5 and ctx.increment == 0.5
+    assert ctx.soft_deadline - ctx.deadline < 0
+    assert clock.charge(1.0) == {"budget": 5, "remaining": 4.5}
+    assert clock.context(2).budget == 4.5
+    clock.charge(10.0)  # overran: the clock bottoms out, then gets the increment
+    assert clock.remaining == 0.5
+
+
+def test_node_budget_passes_nodes_and_a_time_cap():
+    ctx = NodeBudget(300, 2).new_clock().context(0)
+    assert ctx.nodes == 300 and ctx.budget == 2
+
+
+def test_move_context_survives_the_wire():
+    ctx = Fischer(5, 0.1).new_clock().context(4)
+    back = MoveContext.from_wire(ctx.to_wire())
+    assert (back.time_control, back.remaining, back.increment, back.ply) == ("fischer:5+0.1", 5, 0.1, 4)
+    assert math.isclose(back.deadline - time.perf_counter(), ctx.deadline - time.perf_counter(), abs_tol=0.05)
+
+
+def test_wants_context():
+    def four(state, legal, player, game): ...
+    def five(state, legal, player, game, ctx=None): ...
+    def star(*args): ...
+    assert not wants_context(four)
+    assert wants_context(five) and wants_context(star)
+    assert not wants_context(len)  # no signature available
+
+
+def test_wants_context_does_not_keep_bots_alive():
+    namespace = {}
+    exec("def choose_move(state, legal, player, game, ctx=None): ...", namespace)  # a (re)loaded bot module
+    assert wants_context(namespace["choose_move"])
+    ref = weakref.ref(namespace["choose_move"])
+    namespace.clear()
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,147 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from arena import sandbox, tournament
+
+from arena.ratings import replay
+from arena.tournament import TournamentSpec, run_tournament
+
+BOTS = ["random_ttt", "corner_bot"]
+
+
+def _spec(**kwargs):
+    return TournamentSpec(**{"game": "tic_tac_toe", "bots": BOTS, "workers": 0, "time_control": "fixed:0.5",
+                             **kwargs})
+
+
+def test_committed_games_go_to_the_match_log_in_play_order(stores):
+    lb, ms = stores
+    result = run_tournament(_spec(format="double_round_robin", repetitions=3))
+    logged = list(ms.iter_matches())
+    assert len(logged) == result.matches == 6
+    assert all(m["source"] == "tournament" and m["moves"] for m in logged)
+    sequence = [(m["bot0"], m["bot1"], m["winner"]) for m in logged]
+    assert result.match_results() == sequence
+
+    # the stored ratings are a replay of exactly that sequence
+    expected, h2h = replay(sequence)
+    stored = lb.get_ratings("tic_tac_toe")
+    for bot in BOTS:
+        assert stored[bot].rating == pytest.approx(expected[bot].rating)
+    assert lb.get_head_to_head("tic_tac_toe") == h2h
+
+
+def test_no_commit_writes_nothing(stores):
+    lb, ms = stores
+    result = run_tournament(_spec(repetitions=2), commit=False)
+    assert result.matches == 2
+    assert list(ms.iter_matches()) == []
+    assert lb.get("tic_tac_toe") == {}
+    assert result.match_results() == []
+
+
+@pytest.mark.parametrize("kwargs", [{"format": "knockout"}, {"time_control": "fixed:inf"}])
+def test_invalid_specs(stores, kwargs):
+    spec = TournamentSpec(**{"game": "tic_tac_toe", "bots": BOTS, "workers": 0, **kwargs})
+    with pytest.raises(ValueError):
+        run_tournament(spec)
+
+
+class _CountingPool:
+    """Plays each submitted chunk at once and records how many results were outstanding."""
+
+    def __init__(self):
+        self.outstanding = self.peak = 0
+
+    def submit(self, fn, *args):
+        self.outstanding += 1
+        self.peak = max(self.peak, self.outstanding)
+        future = Future()
+        future.set_result(fn(*args))
+        return _Outstanding(self, future)
+
+
+class _Outstanding:
+    def __init__(self, pool, future):
+        self.pool, self.future = pool, future
+
+    def result(self):
+        self.pool.outstanding -= 1
+        return self.future.result()
+
+
+def test_workers_send_slim_results_and_chunks_are_bounded():
+    worker = tournament._make_worker("tic_tac_toe", {"random_ttt": "random_bot.py"}, "fixed:0.5")
+    pairs = [("random_ttt", "random_ttt")] * 10
+    assert all(isinstance(g, tuple) and len(g) == 3 for g in tournament._play_chunk(pairs[:2], False, worker))
+    assert tournament._play_chunk(pairs[:1], True, worker)[0]["moves"]
+
+    pool = _CountingPool()
+    chunks = tournament._chunks(pairs, 1)
+    played = list(tournament._played_chunks(chunks, pool, in_flight=3, full=False, worker=worker))
+    assert len(played) == 10
+    assert pool.peak == 3
+
+
+def test_tournaments_respect_the_bot_sandbox(stores, monkeypatch):
+    pool = sandbox.SandboxPool(size=2)
+    pool.start()
+    monkeypatch.setattr(sandbox, "SANDBOX_ENABLED", True)
+    monkeypatch.setattr(tournament, "SANDBOX_ENABLED", True)
+    monkeypatch.setattr(sandbox, "get_sandbox_pool", lambda warm=(): pool)
+    try:
+        worker = tournament._make_worker("tic_tac_toe", {"random_ttt": "random_bot.py"}, "fixed:0.5")
+        assert isinstance(worker["bots"]["random_ttt"], sandbox.SandboxedBot)
+        result = run_tournament(_spec(repetitions=4, workers=2, chunk_size=1), commit=False)
+        moves = sum(w.moves for w in pool._idle)
+    finally:
+        pool.shutdown()
+    assert result.matches == 4
+    assert moves >= 4 * 5  # every move of every game was played in the sandbox
+
+
+@pytest.fixture
+def api(stores, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from arena import api_server
+    from arena.match_executor import BoundedExecutor
+
+    monkeypatch.setattr(api_server, "TOURNAMENTS_DIR", str(tmp_path / "tournaments"))
+    monkeypatch.setattr(api_server, "MATCH_EXECUTOR", BoundedExecutor(max_workers=1, queue_depth=0))
+    with TestClient(api_server.app) as client:
+        yield api_server, client
+
+
+def test_api_runs_tournaments_as_background_jobs(api):
+    api_server, client = api
+    body = {"game": "tic_tac_toe", "bots": BOTS, "repetitions": 3, "workers": 1, "time_control": "fixed:0.5"}
+    response = client.post("/tournaments", json=body)
+    assert response.status_code == 202
+    url = response.headers["location"]
+    assert response.json()["url"] == url
+
+    deadline = time.monotonic() + 30
+    while (job := client.get(url).json())["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert job["status"] == "done"
+    assert job["result"]["matches"] == 3
+    assert client.get("/tournaments/0123456789abcdef").status_code == 404
+    assert client.get("/tournaments/..%2Fleaderboard").status_code == 404
+
+
+def test_api_bounds_tournament_requests(api):
+    api_server, client = api
+    body = {"game": "tic_tac_toe", "bots": BOTS, "time_control": "fixed:0.5"}
+    assert client.post("/tournaments", json={**body, "repetitions": tournament.MAX_REPETITIONS + 1}).status_code == 422
+    assert client.post("/tournaments", json={**body, "workers": tournament.MAX_WORKERS + 1}).status_code == 422
+    assert client.post("/tournaments", json={**body, "workers": 0}).status_code == 422
+    assert client.post("/tournaments", json={**body, "bots": ["random_ttt", "nobody"]}).status_code == 400
+
+    slot = api_server.MATCH_EXECUTOR.reserve()  # the executor is full
+    try:
+        response = client.post("/tournaments", json={**body, "workers": 1})
+    finally:
+        slot.close()
+    assert response.status_code == 503 and "retry-after" in response.headers
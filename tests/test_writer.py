@@ -0,0 +1,80 @@
+import secrets
+import threading
+from multiprocessing.connection import Listener
+
+import pytest
+
+from arena.writer import BACKLOG, ResultWriter, WriterClient
+
+from conftest import make_match
+
+
+@pytest.fixture
+def writer(stores):
+    key = secrets.token_hex(16)
+    listener = Listener(("127.0.0.1", 0), backlog=BACKLOG, authkey=bytes.fromhex(key))
+    w = ResultWriter(listener, flush_interval=0.01, max_batch=50)
+    thread = threading.Thread(target=w.serve_forever, daemon=True)
+    thread.start()
+    host, port = listener.address
+    yield w, WriterClient(f"{host}:{port}", key)
+    w.stop()
+    thread.join(5)
+    listener.close()
+
+
+def test_matches_from_many_threads_are_stored_and_counted(writer, stores):
+    w, client = writer
+    lb, ms = stores
+    ids = []
+
+    def play(i):
+        ids.append(client.record(make_match("a", "b", "X" if i % 2 else "draw")))
+    threads = [threading.Thread(target=play, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(ids)) == 20 and all(ms.read(i) for i in ids)
+    assert lb.get("tic_tac_toe")["a"]["wins"] == 10
+    assert w.matches == 20 and w.batches < 20
+
+
+def test_a_failing_leaderboard_update_only_affects_its_game(writer, stores, monkeypatch):
+    _, client = writer
+    lb, ms = stores
+    record_results = lb.record_results
+
+    def flaky(game, results):
+        if game == "eleven_sticks":
+            raise RuntimeError("boom")
+        return record_results(game, results)
+    monkeypatch.setattr(lb, "record_results", flaky)
+
+    ok = client.record(make_match("a", "b", "X"))
+    stored_not_counted = client.record(make_match("a", "b", "X", game="eleven_sticks"))
+    assert ms.read(ok) and ms.read(stored_not_counted)  # both stored, both got an id
+    assert lb.get("tic_tac_toe")["a"]["wins"] == 1
+    assert lb.get("eleven_sticks") == {}
+
+
+def test_a_failing_append_is_an_error(writer, stores, monkeypatch):
+    _, client = writer
+    _, ms = stores
+    monkeypatch.setattr(ms, "append_many", lambda payloads: (_ for _ in ()).throw(OSError("disk full")))
+    with pytest.raises(RuntimeError, match="disk full"):
+        client.record(make_match("a", "b", "X"))
+
+
+def test_committed_tournaments_go_through_the_writer(writer, stores, monkeypatch):
+    from arena import tournament
+    w, client = writer
+    lb, ms = stores
+    monkeypatch.setattr(tournament, "get_writer_client", lambda: client)
+    spec = tournament.TournamentSpec(game="tic_tac_toe", bots=["random_ttt", "corner_bot"], workers=0,
+                                     repetitions=5, chunk_size=2, time_control="fixed:0.5")
+    result = tournament.run_tournament(spec)
+    assert w.matches == 5
+    logged = [(m["bot0"], m["bot1"], m["winner"]) for m in ms.iter_matches()]
+    assert logged == result.match_results()
+    assert sum(s["games"] for s in lb.get("tic_tac_toe").values()) == 10  # counted once, by the writer